@@ -2,7 +2,6 @@
 Data loading utilities for IMDb sentiment analysis dataset
 """
 
-from datasets import load_dataset
 import json
 import os
 from pathlib import Path
@@ -15,6 +14,9 @@ def load_imdb_dataset(cache_dir="./data/processed"):
     Returns:
         dict: Dictionary with 'train' and 'test' splits
     """
+    # Imported here: `datasets` is slow to import and only needed for downloads
+    from datasets import load_dataset
+    
     print("Loading IMDb dataset from HuggingFace...")
     dataset = load_dataset("imdb", cache_dir=cache_dir)
     
@@ -154,7 +154,12 @@ print(f"Label: {'Positive' if example['label'] == 1 else 'Negative'}")
 
 # COMMAND ----------
 
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import os
+import sys
+
+# In a repo checkout, make the project's src/ folder importable
+# (notebooks run from notebooks_simplified/)
+sys.path.append(os.path.abspath(".."))
 
 print("🤖 Loading AI model (FLAN-T5-Small)...")
 print("This will take 3-5 minutes...")
@@ -162,8 +167,16 @@ print("This will take 3-5 minutes...")
 model_name = "google/flan-t5-small"
 
 # Load tokenizer and model
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+try:
+    # Repo checkout: the registry calls from_pretrained once and hands back
+    # the same model on later calls instead of reloading it
+    from src.evaluation.model_registry import get_registry
+    model, tokenizer = get_registry().get(model_name)
+except ImportError:
+    # Notebook imported on its own (no src/ folder)
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
 
 print("\n✅ Model loaded successfully!")
 print(f"   Model: {model_name}")
@@ -25,15 +25,20 @@
 # COMMAND ----------
 
 # Reload packages
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 from datasets import load_dataset
+import os
 import random
+import sys
 
-# Load model
+# In a repo checkout, use the project's shared helpers (see Notebook 1)
+sys.path.append(os.path.abspath(".."))
+from src.evaluation.label_parser import parse_label
+
+# Load model (cached: re-running this cell does not reload it)
 print("Loading model...")
 model_name = "google/flan-t5-small"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+from src.evaluation.model_registry import get_registry
+model, tokenizer = get_registry().get(model_name)
 
 # Load data
 dataset = load_dataset("imdb", split="test")
@@ -82,13 +87,8 @@ def test_prompt_strategy(prompt_function, num_tests=10):
         outputs = model.generate(**inputs, max_length=10)
         result = tokenizer.decode(outputs[0], skip_special_tokens=True)
         
-        # Parse response
-        if "Positive" in result or "positive" in result:
-            predicted = "Positive"
-        elif "Negative" in result or "negative" in result:
-            predicted = "Negative"
-        else:
-            predicted = "Positive"  # Default
+        # Parse response ("Positive" if no label is found)
+        predicted = parse_label(result)
         
         # Check correctness
         is_correct = (predicted == true_label)
@@ -29,20 +29,25 @@
 # COMMAND ----------
 
 # Import libraries
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 from datasets import load_dataset
 from sklearn.metrics import accuracy_score, f1_score, confusion_matrix
 import pandas as pd
 import numpy as np
+import os
 import random
+import sys
 import time
 
+# In a repo checkout, use the project's shared helpers (see Notebook 1)
+sys.path.append(os.path.abspath(".."))
+from src.evaluation.label_parser import LabelParser
+
 print("Loading model and data...")
 
-# Load model
+# Load model (cached: re-running this cell does not reload it)
 model_name = "google/flan-t5-small"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+from src.evaluation.model_registry import get_registry
+model, tokenizer = get_registry().get(model_name)
 
 # Load competition dataset
 dataset = load_dataset("imdb", split="test")
@@ -185,7 +190,7 @@ def run_competition(prompt_function, dataset):
     print(f"Testing on {len(dataset)} reviews")
     print("=" * 70)
     
-    predictions = []
+    outputs = []
     true_labels = []
     start_time = time.time()
     
@@ -198,24 +203,22 @@ def run_competition(prompt_function, dataset):
         
         # Run model
         inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=512)
-        outputs = model.generate(**inputs, max_length=10, num_beams=1)
-        result = tokenizer.decode(outputs[0], skip_special_tokens=True)
-        
-        # Parse result
-        if "Positive" in result or "positive" in result:
-            pred = 1
-        elif "Negative" in result or "negative" in result:
-            pred = 0
-        else:
-            pred = 1  # Default to positive
+        generated = model.generate(**inputs, max_length=10, num_beams=1)
+        result = tokenizer.decode(generated[0], skip_special_tokens=True)
         
-        predictions.append(pred)
+        outputs.append(result)
         true_labels.append(true_label)
         
         # Progress update
         if (i + 1) % 20 == 0:
             print(f"   Processed {i+1}/{len(dataset)} reviews...")
     
+    # Parse all results at once ("Positive" if no label is found)
+    parser = LabelParser()
+    predictions = [1 if label == "Positive" else 0 for label in parser.parse_batch(outputs)]
+    if parser.fallbacks:
+        print(f"⚠️  {parser.fallbacks} answers had no Positive/Negative label (counted as Positive)")
+    
     # Calculate metrics
     accuracy = accuracy_score(true_labels, predictions)
     f1 = f1_score(true_labels, predictions)
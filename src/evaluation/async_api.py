@@ -0,0 +1,130 @@
+"""
+Async Evaluation API - Use the Evaluator from asyncio Services
+===============================================================
+
+`PromptEvaluator` methods block while the model runs. This wrapper runs
+each batch on a bounded thread pool so an asyncio app (e.g. the submission
+portal) can run many evaluations without blocking its event loop or
+starting a thread per request.
+
+Example:
+    evaluator = PromptEvaluator(batch_size=8)
+    evaluator.enable_inference_queue()      # lets workers share batches
+
+    async with AsyncPromptEvaluator(evaluator, max_workers=4) as async_evaluator:
+        await async_evaluator.aload()
+        metrics = await async_evaluator.aevaluate_student_prompt(module, "Alice")
+
+        async for record in async_evaluator.aiter_predictions(module, "Alice"):
+            print(record['index'], record['prediction'])
+
+Cancelling the awaiting task stops the evaluation after the batch that is
+currently on the model; no further batches are submitted.
+
+With PromptEvaluator(store_predictions=True), aevaluate_student_prompt
+keeps every example like the blocking evaluator does; write them out with
+evaluator.save_predictions().
+"""
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncPromptEvaluator:
+    """asyncio front end for a PromptEvaluator"""
+
+    def __init__(self, evaluator, max_workers=1):
+        """
+        Args:
+            evaluator: PromptEvaluator to run
+            max_workers: Threads running model calls. Keep at 1 unless the
+                evaluator has an inference queue, which makes concurrent
+                calls share batches instead of competing for the model.
+        """
+        self.evaluator = evaluator
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="async-evaluator")
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def aload(self):
+        """Load the model and test data without blocking the event loop."""
+        if self.evaluator.model is None:
+            await self._run(self.evaluator.load_model)
+        if self.evaluator.test_data is None:
+            await self._run(self.evaluator.load_test_data)
+
+    async def aiter_predictions(self, student_module, student_name, examples=None):
+        """
+        Stream per-example results as each batch finishes.
+
+        Args:
+            student_module: Imported student module
+            student_name: Student's name
+            examples: Test examples (defaults to the evaluator's test data)
+
+        Yields:
+            dict: Record with index, label, prediction, output and inference_time
+        """
+        examples = self.evaluator.test_data if examples is None else examples
+        batch_size = self.evaluator.batch_size
+
+        for batch_start in range(0, len(examples), batch_size):
+            batch = examples[batch_start:batch_start + batch_size]
+            records = await self._run(
+                self.evaluator.predict_batch, student_module, batch, student_name
+            )
+            for index, record in enumerate(records, start=batch_start):
+                record['index'] = index
+                yield record
+
+    async def aevaluate_student_prompt(self, student_module, student_name, progress=None):
+        """
+        Evaluate a single student's prompt without blocking the event loop.
+
+        Args:
+            student_module: Imported student module
+            student_name: Student's name
+            progress: Optional callback (done, total), plain or async,
+                called after every batch
+
+        Returns:
+            StudentResult: Evaluation results (same as evaluate_student_prompt)
+        """
+        total = len(self.evaluator.test_data)
+        predictions = []
+        true_labels = []
+        inference_times = []
+        outputs = []
+        prompts = []
+
+        async for record in self.aiter_predictions(student_module, student_name):
+            predictions.append(record['prediction'])
+            true_labels.append(record['label'])
+            inference_times.append(record['inference_time'])
+            outputs.append(record['output'])
+            prompts.append(record['prompt'])
+
+            done = len(predictions)
+            if progress is not None and (done % self.evaluator.batch_size == 0 or done == total):
+                result = progress(done, total)
+                if inspect.isawaitable(result):
+                    await result
+
+        return await self._run(
+            self.evaluator.summarize_predictions,
+            student_name, true_labels, predictions, inference_times, outputs, prompts
+        )
+
+    async def aclose(self):
+        """Shut down the worker threads once running batches finish."""
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
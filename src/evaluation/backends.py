@@ -0,0 +1,230 @@
+"""
+Inference Backends - Score Prompts on Remote Models
+====================================================
+
+`OpenAICompatibleBackend` sends prompts to a local inference server that
+speaks the OpenAI completions API (vLLM, llama.cpp server, TGI, Ollama, ...),
+so prompts can be compared on larger models than fit in the evaluator.
+
+Throughput comes from concurrency: prompts of a batch are sent in parallel
+over a pool of keep-alive connections, with an optional request rate limit
+and retries (exponential backoff with jitter) for transient errors.
+
+Example:
+    backend = OpenAICompatibleBackend("http://127.0.0.1:8000", model="qwen2.5-7b-instruct")
+    evaluator = PromptEvaluator(backend=backend, batch_size=32)
+    evaluator.evaluate_all_students()
+
+Retries, Retry-After and connection reuse are tested against a stub server
+on localhost in tests/test_backends.py.
+"""
+
+import http.client
+import json
+import queue
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+# Status codes worth retrying: rate limited or temporarily unavailable
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class BackendError(RuntimeError):
+    """A request to the inference server failed permanently"""
+
+
+class _RateLimiter:
+    """Token bucket allowing `rate` requests per second on average"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP connections shared by the worker threads"""
+
+    def __init__(self, base_url, size, timeout):
+        parts = urlsplit(base_url)
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path_prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def get(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self.connection_class(self.host, self.port, timeout=self.timeout)
+
+    def put(self, connection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class OpenAICompatibleBackend:
+    """Runs prompts on a server exposing the OpenAI /v1/completions API"""
+
+    def __init__(self, base_url, model, api_key=None, max_concurrency=8,
+                 requests_per_second=None, max_retries=4, timeout=60,
+                 backoff_base=0.5, backoff_cap=10.0):
+        """
+        Args:
+            base_url: Server address, e.g. "http://127.0.0.1:8000"
+            model: Model name the server should use
+            api_key: Optional bearer token
+            max_concurrency: Requests in flight at once (and pooled connections)
+            requests_per_second: Optional rate limit across all threads
+            max_retries: Retries for transient errors before giving up
+            timeout: Socket timeout per request in seconds
+            backoff_base: First retry delay in seconds (doubled each attempt)
+            backoff_cap: Longest retry delay in seconds
+        """
+        self.base_url = base_url
+        self.model = model
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._pool = _ConnectionPool(base_url, max_concurrency, timeout)
+        self._limiter = _RateLimiter(requests_per_second) if requests_per_second else None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix="backend")
+
+        self.requests_sent = 0
+        self.retries = 0
+        self._stats_lock = threading.Lock()
+
+    def _headers(self):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(self.backoff_cap, retry_after)
+        # "Full jitter": spread retries out so clients don't retry in lockstep
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _post(self, path, payload):
+        """POST JSON with retries; returns the decoded response body."""
+        body = json.dumps(payload)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if self._limiter is not None:
+                self._limiter.acquire()
+
+            connection = self._pool.get()
+            retry_after = None
+            try:
+                connection.request("POST", self._pool.path_prefix + path, body, self._headers())
+                response = connection.getresponse()
+                data = response.read()
+                with self._stats_lock:
+                    self.requests_sent += 1
+
+                if response.status == 200:
+                    if response.getheader("Connection", "").lower() == "close":
+                        connection.close()
+                    else:
+                        self._pool.put(connection)
+                    return json.loads(data)
+
+                self._pool.put(connection)
+                last_error = BackendError(
+                    f"HTTP {response.status} from {self.base_url}: {data[:200]!r}"
+                )
+                if response.status not in RETRYABLE_STATUS:
+                    raise last_error
+                header = response.getheader("Retry-After")
+                if header and header.replace(".", "", 1).isdigit():
+                    retry_after = float(header)
+
+            except (http.client.HTTPException, ConnectionError, socket.timeout) as e:
+                # Broken keep-alive connection: drop it and retry on a fresh one
+                connection.close()
+                last_error = e
+
+            if attempt < self.max_retries:
+                with self._stats_lock:
+                    self.retries += 1
+                time.sleep(self._backoff(attempt, retry_after))
+
+        raise BackendError(f"Request failed after {self.max_retries + 1} attempts: {last_error}")
+
+    def complete(self, prompt, max_tokens=10):
+        """
+        Run one prompt with greedy decoding.
+
+        Args:
+            prompt: Complete prompt string
+            max_tokens: Max tokens to generate
+
+        Returns:
+            str: Generated text
+        """
+        response = self._post("/v1/completions", {
+            'model': self.model,
+            'prompt': prompt,
+            'max_tokens': max_tokens,
+            'temperature': 0,
+        })
+        return response['choices'][0]['text'].strip()
+
+    def generate(self, prompts, max_length=10):
+        """
+        Run a batch of prompts concurrently.
+
+        Args:
+            prompts: List of complete prompt strings
+            max_length: Max tokens to generate per prompt
+
+        Returns:
+            list: Generated text for each prompt, in order
+        """
+        return list(self._executor.map(lambda prompt: self.complete(prompt, max_length), prompts))
+
+    def stats(self):
+        with self._stats_lock:
+            return {'requests_sent': self.requests_sent, 'retries': self.retries}
+
+    def close(self):
+        self._executor.shutdown()
+        self._pool.close()
+
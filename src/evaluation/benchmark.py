@@ -0,0 +1,156 @@
+"""
+Startup Benchmark - Track Import Time and Time-to-First-Prediction
+===================================================================
+
+Each measurement runs in a fresh interpreter so nothing is already
+imported or loaded. Results are printed and appended to
+results/benchmarks/startup.jsonl so regressions show up over time.
+
+Usage:
+    python src/evaluation/benchmark.py                      # imports only
+    python src/evaluation/benchmark.py --first-prediction   # + model load and one prediction
+"""
+
+import json
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent.parent
+
+# Modules whose import time we track
+IMPORT_TARGETS = [
+    "src.evaluation.metrics",
+    "data.load_data",
+    "src.evaluation.evaluator",
+]
+
+_IMPORT_SCRIPT = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("torch", "transformers", "sklearn", "matplotlib", "seaborn", "datasets", "pandas")
+         if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy_modules": heavy}}))
+"""
+
+_FIRST_PREDICTION_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from src.evaluation.evaluator import PromptEvaluator
+imported = time.perf_counter()
+evaluator = PromptEvaluator(model_name={model!r})
+evaluator.load_model()
+loaded = time.perf_counter()
+evaluator.run_inference("Classify this movie review as Positive or Negative. Review: Great film! Classification:")
+predicted = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "load_model": loaded - imported,
+    "first_prediction": predicted - loaded,
+    "total": predicted - start,
+}}))
+"""
+
+
+def _run(script):
+    """Run a script in a fresh interpreter and return its last line as JSON."""
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, cwd=REPO_ROOT
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_import_times(modules=IMPORT_TARGETS, repeats=3):
+    """
+    Measure cold import time of each module (best of `repeats`).
+
+    Args:
+        modules: Dotted module names
+        repeats: Fresh interpreters per module
+
+    Returns:
+        dict: module -> {'seconds', 'heavy_modules'}
+    """
+    results = {}
+    for module in modules:
+        runs = [_run(_IMPORT_SCRIPT.format(root=str(REPO_ROOT), module=module))
+                for _ in range(repeats)]
+        results[module] = min(runs, key=lambda run: run['seconds'])
+    return results
+
+
+def measure_first_prediction(model_name="google/flan-t5-base"):
+    """
+    Measure import, model load and first prediction in a fresh interpreter.
+
+    Args:
+        model_name: HuggingFace model to load
+
+    Returns:
+        dict: Seconds for each stage and the total
+    """
+    return _run(_FIRST_PREDICTION_SCRIPT.format(root=str(REPO_ROOT), model=model_name))
+
+
+def run_startup_benchmark(first_prediction=False, model_name="google/flan-t5-base",
+                          output_file="./results/benchmarks/startup.jsonl"):
+    """
+    Run the startup benchmark, print it and append it to the history file.
+
+    Args:
+        first_prediction: Also measure time-to-first-prediction (loads a model)
+        model_name: Model for the first-prediction measurement
+        output_file: JSON-lines history file
+
+    Returns:
+        dict: The benchmark record
+    """
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'imports': measure_import_times(),
+    }
+
+    print("=" * 70)
+    print("STARTUP BENCHMARK")
+    print("=" * 70)
+    print("\n📦 Cold import time:")
+    for module, run in record['imports'].items():
+        heavy = ", ".join(run['heavy_modules']) or "none"
+        print(f"   {module:30s} {run['seconds'] * 1000:8.1f} ms   heavy deps loaded: {heavy}")
+
+    if first_prediction:
+        record['model'] = model_name
+        record['first_prediction'] = measure_first_prediction(model_name)
+        print(f"\n⏱️  Time to first prediction ({model_name}):")
+        for stage, seconds in record['first_prediction'].items():
+            print(f"   {stage:20s} {seconds:8.2f} s")
+
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'a') as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"\n✅ Appended to: {output_file}")
+    print("=" * 70)
+
+    return record
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure evaluator startup time")
+    parser.add_argument('--first-prediction', action='store_true',
+                        help='Also load a model and time the first prediction')
+    parser.add_argument('--model', type=str, default='google/flan-t5-base',
+                        help='HuggingFace model name')
+    args = parser.parse_args()
+
+    run_startup_benchmark(first_prediction=args.first_prediction, model_name=args.model)
@@ -0,0 +1,12 @@
+"""
+Evaluation Settings Shared Across Modules
+==========================================
+
+Constants used by the evaluator and by the modules it loads (scheduler,
+preflight, planner, results). They live here rather than in evaluator.py:
+evaluator.py is usually run as a script, and importing it from another
+module would then load it a second time with separate globals.
+"""
+
+# Prompts are truncated to this many tokens before they reach the model
+MAX_INPUT_TOKENS = 512
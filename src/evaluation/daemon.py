@@ -0,0 +1,246 @@
+"""
+Evaluation Daemon - Keep the Model Warm Between Quick Tests
+============================================================
+
+Starting `evaluator.py` pays for interpreter startup, model loading and data
+loading on every run. The daemon does that once and then serves
+"evaluate this student module" requests over localhost HTTP, so repeated
+quick tests only pay for inference.
+
+Start the daemon (once):
+    python src/evaluation/daemon.py serve --model google/flan-t5-base
+
+Test a submission (as often as you like):
+    python src/evaluation/daemon.py test alice_example
+
+From Python / a notebook:
+    from src.evaluation.daemon import remote_quick_test
+    results = remote_quick_test('alice_example')
+
+The client side only uses the standard library, so it starts instantly.
+"""
+
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+
+STUDENT_PROMPTS_DIR = Path("./src/prompts/student_prompts")
+
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    daemon = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.daemon.health())
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/evaluate":
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            self._send_json(200, self.daemon.evaluate(request['student']))
+        except (KeyError, ValueError, FileNotFoundError) as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            # Errors in student code must not take the daemon down
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class EvaluationDaemon:
+    """Long-lived server holding a PromptEvaluator with model and data loaded"""
+
+    def __init__(self, evaluator, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Args:
+            evaluator: PromptEvaluator (model and data are loaded on start)
+            host: Interface to bind (localhost by default)
+            port: TCP port; 0 picks a free port
+        """
+        self.evaluator = evaluator
+        handler = type("DaemonHandler", (_DaemonHandler,), {"daemon": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.started_at = None
+        self.requests_served = 0
+        self._count_lock = threading.Lock()
+        # Evaluations run one at a time, even with an inference queue: they
+        # share the evaluator's batch size, output cache and monitor labels
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def health(self):
+        health = {
+            'status': 'ok',
+            'model': self.evaluator.model_name,
+            'examples': len(self.evaluator.test_data or []),
+            'uptime': time.time() - self.started_at if self.started_at else 0.0,
+            'requests_served': self.requests_served,
+        }
+        if self.evaluator.inference_queue is not None:
+            health['queue'] = self.evaluator.inference_queue.stats()
+        if self.evaluator.backend is None:
+            from src.evaluation.model_registry import get_registry
+            health['models'] = get_registry().stats()
+        return health
+
+    def evaluate(self, student):
+        """
+        Evaluate a student module, re-importing it so edits are picked up.
+
+        Args:
+            student: File name of the submission (without .py)
+
+        Returns:
+            dict: JSON-safe metrics plus timing information
+        """
+        from src.evaluation.evaluator import load_student_module, metrics_to_json
+
+        if not student.replace('_', '').isalnum():
+            raise ValueError(f"Invalid student name: {student!r}")
+        module_path = STUDENT_PROMPTS_DIR / f"{student}.py"
+        if not module_path.exists():
+            raise FileNotFoundError(f"No submission found at {module_path}")
+
+        start_time = time.time()
+        with self._lock:
+            with self.evaluator.phase("import_student", student=student):
+                module = load_student_module(module_path, student)
+            with self.evaluator.phase("evaluate_student", student=student):
+                metrics = self.evaluator.evaluate_student_prompt(module, student)
+        with self._count_lock:
+            self.requests_served += 1
+
+        return {
+            'student': student,
+            'metrics': metrics_to_json(metrics, include_confusion_matrix=True),
+            'elapsed': time.time() - start_time,
+        }
+
+    def serve_forever(self):
+        """Load model and data, then handle requests until interrupted."""
+        if self.evaluator.model is None:
+            self.evaluator.load_model()
+        if self.evaluator.test_data is None:
+            self.evaluator.load_test_data()
+
+        self.started_at = time.time()
+        print(f"\n🟢 Evaluation daemon listening on {self.url}")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Shutting down evaluation daemon")
+        finally:
+            self.httpd.server_close()
+
+
+def remote_quick_test(student_name, url=DEFAULT_URL, timeout=3600):
+    """
+    Run quick_test through a running evaluation daemon.
+
+    Args:
+        student_name: Name of the student file (without .py)
+        url: Base URL of the daemon
+        timeout: Seconds to wait for the evaluation
+
+    Returns:
+        dict: JSON-safe metrics for the student
+
+    Example:
+        remote_quick_test('john_doe')
+    """
+    request = urllib.request.Request(
+        f"{url}/evaluate",
+        data=json.dumps({'student': student_name}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            result = json.load(response)
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(json.load(e).get('error', str(e))) from None
+
+    metrics = result['metrics']
+    print(f"📊 {student_name}: accuracy {metrics['accuracy']:.4f}, "
+          f"F1 {metrics['f1_score']:.4f} ({result['elapsed']:.1f}s)")
+    return metrics
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resident evaluation daemon")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='Start the daemon')
+    serve_parser.add_argument('--model', type=str, default='google/flan-t5-base',
+                              help='HuggingFace model name')
+    serve_parser.add_argument('--full', action='store_true',
+                              help='Use the full test set instead of sample data')
+    serve_parser.add_argument('--batch-size', type=int, default=8,
+                              help='Number of prompts per generate call')
+    serve_parser.add_argument('--max-wait-ms', type=float, default=10,
+                              help='Time to wait for concurrent requests to fill a batch')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+
+    test_parser = subparsers.add_parser('test', help='Evaluate a submission via the daemon')
+    test_parser.add_argument('student', type=str, help='Student file name (without .py)')
+    test_parser.add_argument('--url', type=str, default=DEFAULT_URL)
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        from src.evaluation.evaluator import PromptEvaluator
+        evaluator = PromptEvaluator(
+            model_name=args.model, use_sample=not args.full,
+            batch_size=args.batch_size, cache_outputs=True
+        )
+        # Model calls go through the micro-batching queue (requests themselves
+        # are evaluated one at a time, see EvaluationDaemon)
+        evaluator.enable_inference_queue(
+            max_batch_size=args.batch_size, max_wait=args.max_wait_ms / 1000
+        )
+        EvaluationDaemon(evaluator, port=args.port).serve_forever()
+    else:
+        try:
+            remote_quick_test(args.student, url=args.url)
+        except urllib.error.URLError:
+            print(f"❌ No daemon running at {args.url}")
+            print("   Start one with: python src/evaluation/daemon.py serve")
+            sys.exit(1)
+        except RuntimeError as e:
+            # Error reported by the daemon (bad name, error in student code, ...)
+            print(f"❌ {args.student}: {e}")
+            sys.exit(1)
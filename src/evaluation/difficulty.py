@@ -0,0 +1,318 @@
+"""
+Example Difficulty Index - Which Reviews Are Hard, Across All Runs
+===================================================================
+
+Aggregates every stored prediction file (see prediction_store.py) into
+per-review counts: how many submissions ran the review, how many got it
+right, and how long the model took on it. Each file is folded in once,
+so the index updates incrementally as new results land; it is kept in
+results/predictions/difficulty_index.npz.
+
+Per review it exports:
+
+- miss_rate: share of submissions that got it wrong
+- mean_latency: mean inference seconds
+- relative_latency: latency relative to the same submission's median, so
+  slow prompts or machines don't make every review look slow
+- difficulty: miss_rate blended with the latency percentile
+
+strata() and stratified_sample() group reviews by difficulty for quick
+previews that should contain easy and hard reviews in the right mix.
+
+Example:
+    index = DifficultyIndex.load()
+    index.update()                          # fold in new prediction files
+    index.export_csv()                      # results/predictions/difficulty.csv
+    index.hardest(10)
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from src.evaluation.prediction_store import load_predictions
+
+PREDICTIONS_DIR = "./results/predictions"
+INDEX_FILE = "difficulty_index.npz"
+
+# Weight of the latency percentile in the difficulty score (the rest is miss_rate)
+LATENCY_WEIGHT = 0.2
+
+# Running sums kept per example
+_SUMS = {
+    'runs': np.uint32,
+    'correct': np.uint32,
+    'latency': np.float64,
+    'relative_latency': np.float64,
+}
+
+
+class DifficultyIndex:
+    """Per-example correctness and latency summed over stored runs"""
+
+    def __init__(self, split="test", path=None):
+        """
+        Args:
+            split: Data set the example ids refer to; prediction files of
+                other splits are skipped
+            path: Where the index is saved (default:
+                results/predictions/difficulty_index.npz, or
+                difficulty_index_<split>.npz for other splits)
+        """
+        self.split = split
+        if path is None:
+            name = INDEX_FILE if split == "test" else f"difficulty_index_{split}.npz"
+            path = Path(PREDICTIONS_DIR) / name
+        self.path = Path(path)
+        self.sources = []  # prediction files already folded in
+        self.sums = {name: np.zeros(0, dtype=dtype) for name, dtype in _SUMS.items()}
+
+    @classmethod
+    def load(cls, split="test", path=None):
+        """
+        Load the saved index, or start an empty one.
+
+        Returns:
+            DifficultyIndex: The index
+        """
+        index = cls(split, path)
+        if index.path.exists():
+            with np.load(index.path) as data:
+                index.sources = [str(source) for source in data['sources']]
+                index.sums = {name: data[name].astype(dtype) for name, dtype in _SUMS.items()}
+        return index
+
+    def save(self):
+        """Write the index next to the prediction files."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(self.path, split=np.array(self.split),
+                            sources=np.array(self.sources, dtype=str), **self.sums)
+        return self.path
+
+    def __len__(self):
+        return len(self.sums['runs'])
+
+    def _grow(self, size):
+        if size > len(self):
+            for name, values in self.sums.items():
+                self.sums[name] = np.concatenate([values, np.zeros(size - len(values), values.dtype)])
+
+    def add_table(self, table, source):
+        """
+        Fold one loaded prediction file into the sums.
+
+        Args:
+            table: PredictionTable from load_predictions
+            source: Name recorded so the file is not added twice
+
+        Returns:
+            bool: True if the table was added
+        """
+        if source in self.sources or table.split != self.split or not len(table):
+            return False
+
+        columns = table.columns
+        example_ids = columns['example_id']
+        self._grow(int(example_ids.max()) + 1)
+        size = len(self)
+
+        # Latency relative to each student's median in this run
+        latency = columns['latency'].astype(np.float64)
+        medians = np.zeros(len(table.student_names))
+        for code in np.unique(columns['student']):
+            medians[code] = np.median(latency[columns['student'] == code])
+        baseline = medians[columns['student']]
+        relative = np.divide(latency, baseline, out=np.ones_like(latency), where=baseline > 0)
+
+        self.sums['runs'] += np.bincount(example_ids, minlength=size).astype(np.uint32)
+        self.sums['correct'] += np.bincount(example_ids, weights=table.correct,
+                                            minlength=size).astype(np.uint32)
+        self.sums['latency'] += np.bincount(example_ids, weights=latency, minlength=size)
+        self.sums['relative_latency'] += np.bincount(example_ids, weights=relative, minlength=size)
+        self.sources.append(source)
+        return True
+
+    def update(self, predictions_dir=PREDICTIONS_DIR, save=True):
+        """
+        Fold in prediction files not seen before.
+
+        Args:
+            predictions_dir: Directory (or single .npz file) with prediction files
+            save: Save the index if anything was added
+
+        Returns:
+            int: Number of files added
+        """
+        predictions_dir = Path(predictions_dir)
+        if predictions_dir.is_file():
+            files = [predictions_dir]
+        else:
+            files = sorted(predictions_dir.glob("predictions_*.npz"))
+
+        added = 0
+        for predictions_file in files:
+            if predictions_file.name in self.sources:
+                continue
+            added += self.add_table(load_predictions(predictions_file), predictions_file.name)
+
+        if added and save:
+            self.save()
+        return added
+
+    def scores(self, latency_weight=LATENCY_WEIGHT):
+        """
+        Per-example difficulty scores.
+
+        Args:
+            latency_weight: Weight of the relative latency percentile in
+                'difficulty' (the rest is miss_rate)
+
+        Returns:
+            dict: Arrays indexed by example id: runs, miss_rate, mean_latency,
+                relative_latency, difficulty (NaN where no run has the example)
+        """
+        runs = self.sums['runs'].astype(np.float64)
+        seen = runs > 0
+
+        def mean(values):
+            return np.divide(values, runs, out=np.full(len(runs), np.nan), where=seen)
+
+        miss_rate = 1.0 - mean(self.sums['correct'].astype(np.float64))
+        relative_latency = mean(self.sums['relative_latency'])
+
+        # Percentile rank of relative latency among seen examples (0 = fastest)
+        latency_rank = np.full(len(runs), np.nan)
+        if seen.sum() > 1:
+            order = np.argsort(relative_latency[seen], kind='stable')
+            ranks = np.empty(len(order))
+            ranks[order] = np.arange(len(order)) / (len(order) - 1)
+            latency_rank[seen] = ranks
+        elif seen.any():
+            latency_rank[seen] = 0.0
+
+        return {
+            'runs': self.sums['runs'],
+            'miss_rate': miss_rate,
+            'mean_latency': mean(self.sums['latency']),
+            'relative_latency': relative_latency,
+            'difficulty': (1 - latency_weight) * miss_rate + latency_weight * latency_rank,
+        }
+
+    def hardest(self, n=10):
+        """
+        Returns:
+            list: (example_id, difficulty, miss_rate), hardest first
+        """
+        scores = self.scores()
+        difficulty = scores['difficulty']
+        order = np.argsort(np.where(np.isnan(difficulty), -np.inf, -difficulty), kind='stable')[:n]
+        return [(int(i), float(difficulty[i]), float(scores['miss_rate'][i]))
+                for i in order if not np.isnan(difficulty[i])]
+
+    def strata(self, bins=3, size=None):
+        """
+        Difficulty bin of each example, by quantile of the difficulty score.
+
+        Args:
+            bins: Number of bins (0 = easiest)
+            size: Number of examples in the data set (examples the index has
+                not seen get the middle bin)
+
+        Returns:
+            np.ndarray: Bin per example id
+        """
+        difficulty = self.scores()['difficulty']
+        size = len(difficulty) if size is None else size
+        strata = np.full(size, bins // 2, dtype=np.intp)
+        known = difficulty[:size]
+        seen = np.flatnonzero(~np.isnan(known))
+        if len(seen):
+            edges = np.quantile(known[seen], np.linspace(0, 1, bins + 1)[1:-1])
+            strata[seen] = np.searchsorted(edges, known[seen], side='right')
+        return strata
+
+    def stratified_sample(self, n, bins=3, size=None, seed=42):
+        """
+        Sample example ids with every difficulty bin represented in proportion.
+
+        Args:
+            n: Number of examples to sample
+            bins: Number of difficulty bins
+            size: Number of examples in the data set
+            seed: Random seed
+
+        Returns:
+            np.ndarray: Sorted example ids
+        """
+        return stratified_sample(self.strata(bins, size), n, seed)
+
+    def export_csv(self, path=None):
+        """
+        Write per-example scores as CSV.
+
+        Args:
+            path: Output file (default: difficulty.csv next to the index)
+
+        Returns:
+            Path: The written file
+        """
+        path = Path(path) if path is not None else self.path.with_name(
+            self.path.stem.replace("difficulty_index", "difficulty") + ".csv"
+        )
+        scores = self.scores()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            f.write("example_id,runs,miss_rate,mean_latency,relative_latency,difficulty\n")
+            for i in range(len(self)):
+                if scores['runs'][i]:
+                    f.write(f"{i},{scores['runs'][i]},{scores['miss_rate'][i]:.4f},"
+                            f"{scores['mean_latency'][i]:.5f},{scores['relative_latency'][i]:.4f},"
+                            f"{scores['difficulty'][i]:.4f}\n")
+        return path
+
+
+def stratified_sample(strata, n, seed=42):
+    """
+    Sample n indices so each stratum gets its proportional share.
+
+    Shares are rounded by largest remainder, so the total is exactly n.
+
+    Args:
+        strata: Stratum label per example (any hashable values)
+        n: Number of examples to sample
+        seed: Random seed
+
+    Returns:
+        np.ndarray: Sorted sampled indices
+    """
+    strata = np.asarray(strata)
+    n = min(n, len(strata))
+    labels, inverse, counts = np.unique(strata, return_inverse=True, return_counts=True)
+    quotas = counts * n / len(strata)
+    shares = np.floor(quotas).astype(int)
+    for i in np.argsort(-(quotas - shares), kind='stable')[:n - shares.sum()]:
+        shares[i] += 1
+
+    rng = np.random.default_rng(seed)
+    sampled = [rng.choice(np.flatnonzero(inverse == i), size=share, replace=False)
+               for i, share in enumerate(shares) if share]
+    return np.sort(np.concatenate(sampled)) if sampled else np.zeros(0, dtype=np.intp)
+
+
+def update_difficulty_index(predictions_file=None, split="test"):
+    """
+    Fold new prediction files into the saved index and export the scores.
+
+    Args:
+        predictions_file: One new file (default: every unseen file in
+            results/predictions)
+        split: Data set of the index
+
+    Returns:
+        DifficultyIndex: The updated index
+    """
+    index = DifficultyIndex.load(split)
+    if index.update(predictions_file or PREDICTIONS_DIR):
+        csv_file = index.export_csv()
+        print(f"✅ Example difficulty ({len(index.sources)} runs) saved to: {csv_file}")
+    return index
@@ -7,58 +7,190 @@ This script evaluates all submitted prompts against the test dataset.
 
 import os
 import sys
-import importlib
+import importlib.util
 import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 import json
+import numbers
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.evaluation.metrics import (
-    calculate_metrics, 
     print_metrics,
     compare_prompts,
     plot_confusion_matrix
 )
+from src.evaluation.config import MAX_INPUT_TOKENS
+from src.evaluation.tracing import TraceRecorder
+from src.evaluation.label_parser import DEFAULT_PARSER, parse_labels
+from src.evaluation.results import StudentResult, input_lengths
 from data.load_data import load_sample_data, get_test_split, load_imdb_dataset
 
 
+def load_student_module(module_path, module_name=None):
+    """
+    Import a student submission from its file path.
+    
+    Args:
+        module_path: Path to the student's .py file
+        module_name: Name to register the module under (defaults to file stem)
+        
+    Returns:
+        module: The imported student module
+    """
+    module_path = Path(module_path)
+    spec = importlib.util.spec_from_file_location(module_name or module_path.stem, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
 class PromptEvaluator:
     """Main evaluator for student prompts"""
     
-    def __init__(self, model_name="google/flan-t5-base", use_sample=True):
+    def __init__(self, model_name="google/flan-t5-base", use_sample=True,
+                 batch_size=1, tracer=None, monitor=None, cache_outputs=False,
+                 backend=None, prefix_cache=False, pipeline_workers=0,
+                 store_predictions=False):
         """
         Initialize the evaluator.
         
         Args:
             model_name: HuggingFace model to use
             use_sample: If True, use sample data; else use full test set
+            batch_size: Number of prompts sent to the model per generate call
+            tracer: Optional TraceRecorder for a timeline of the run
+            monitor: Optional EvaluationMonitor for live Prometheus metrics
+            cache_outputs: Reuse model outputs for prompts seen before
+                (safe because decoding is greedy)
+            backend: Optional remote backend (e.g. OpenAICompatibleBackend)
+                used instead of a local HuggingFace model
+            prefix_cache: For decoder-only models, compute the key/value
+                cache of each student's static prompt prefix once and reuse it
+            pipeline_workers: If > 0, build and tokenize prompts on this many
+                threads while the model runs (see src/evaluation/pipeline.py)
+            store_predictions: Keep every example's output, prediction,
+                latency and token counts and save them with the results
+                (see src/evaluation/prediction_store.py)
         """
         self.model_name = model_name
         self.use_sample = use_sample
+        self.batch_size = batch_size
+        self.tracer = tracer or TraceRecorder(enabled=False)
+        self.monitor = monitor
+        self.output_cache = {} if cache_outputs else None
+        self.inference_queue = None
+        self.backend = backend
+        self.use_prefix_cache = prefix_cache
+        self.prefix_cache = None
+        self.pipeline_workers = pipeline_workers
+        self.prediction_store = None
+        if store_predictions:
+            from src.evaluation.prediction_store import PredictionStore
+            self.prediction_store = PredictionStore(split="sample" if use_sample else "test")
         self.model = None
         self.tokenizer = None
+        self.is_encoder_decoder = True
         self.test_data = None
+        self.test_example_ids = None  # ids in the full data set when test_data is a subset
         
         print(f"🚀 Initializing Prompt Evaluator")
         print(f"   Model: {model_name}")
         print(f"   Mode: {'Sample Data' if use_sample else 'Full Test Set'}")
     
+    def enable_inference_queue(self, max_batch_size=16, max_wait=0.01, max_pending_per_client=64):
+        """
+        Route inference through a shared micro-batching queue.
+        
+        Use this when several threads (e.g. daemon requests) evaluate at the
+        same time: their prompts are coalesced into batches for one model.
+        
+        Args:
+            max_batch_size: Largest batch sent to the model
+            max_wait: Seconds to wait for a batch to fill
+            max_pending_per_client: Backpressure limit per client
+            
+        Returns:
+            InferenceQueue: The running queue
+        """
+        from src.evaluation.inference_queue import InferenceQueue
+        
+        self.inference_queue = InferenceQueue(
+            self.generate_batch,
+            max_batch_size=max_batch_size,
+            max_wait=max_wait,
+            max_pending_per_client=max_pending_per_client,
+            monitor=self.monitor
+        ).start()
+        return self.inference_queue
+    
+    @contextmanager
+    def phase(self, name, **args):
+        """Trace a block of work and record its latency on the monitor"""
+        start_time = time.time()
+        with self.tracer.span(name, **args):
+            yield
+        if self.monitor is not None:
+            self.monitor.phase_latency.observe(time.time() - start_time, phase=name)
+    
     def load_model(self):
         """Load the LLM model"""
-        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+        if self.backend is not None:
+            print(f"\n🌐 Using remote backend: {self.backend.base_url} ({self.backend.model})")
+            return
+        
+        from src.evaluation.model_registry import get_registry
         
         print(f"\n📥 Loading model: {self.model_name}")
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+        with self.phase("load_model", model=self.model_name):
+            # Shared, LRU-cached models: switching back to a model is free
+            self.model, self.tokenizer = get_registry().get(self.model_name)
+            self.is_encoder_decoder = self.model.config.is_encoder_decoder
         print("✅ Model loaded successfully")
+        
+        if self.use_prefix_cache:
+            if self.is_encoder_decoder:
+                print("⚠️  Prefix cache only applies to decoder-only models, ignoring it")
+            else:
+                from src.evaluation.prefix_cache import PrefixKVCache
+                self.prefix_cache = PrefixKVCache(
+                    self.model, self.tokenizer, max_input_tokens=MAX_INPUT_TOKENS
+                )
+    
+    def unload_model(self, evict=True):
+        """
+        Release the model (e.g. before loading another one).
+        
+        Args:
+            evict: Also drop it from the process-wide model registry so its
+                memory is freed; False keeps it cached for later reuse
+        """
+        from src.evaluation.model_registry import get_registry
+        
+        self.model = None
+        self.tokenizer = None
+        self.prefix_cache = None
+        if self.output_cache is not None:
+            # Cached outputs belong to the model that produced them
+            self.output_cache.clear()
+        
+        if evict:
+            get_registry().evict(self.model_name)
     
     def load_test_data(self):
         """Load test dataset"""
         print(f"\n📊 Loading test data...")
         
+        with self.phase("load_test_data", use_sample=self.use_sample):
+            self._load_test_data()
+        
+        print(f"✅ Loaded {len(self.test_data)} test examples")
+    
+    def _load_test_data(self):
+        """Load sample data or the full competition split into self.test_data"""
         if self.use_sample:
             # Use sample data
             sample_path = "./data/sample_data/test_sample.json"
@@ -74,8 +206,6 @@ class PromptEvaluator:
             # Use full test set
             dataset = load_imdb_dataset()
             self.test_data = get_test_split(dataset, size=1000)
-        
-        print(f"✅ Loaded {len(self.test_data)} test examples")
     
     def run_inference(self, prompt, max_length=10):
         """
@@ -88,83 +218,345 @@ class PromptEvaluator:
         Returns:
             str: Model's output
         """
-        inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=512)
-        outputs = self.model.generate(**inputs, max_length=max_length, num_beams=1)
-        result = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        return self.run_inference_batch([prompt], max_length=max_length)[0]
+    
+    def run_inference_batch(self, prompts, max_length=10, client_id="default"):
+        """
+        Run inference on a batch of prompts.
+        
+        With a shared inference queue enabled the prompts are merged with
+        other clients' requests; otherwise they go to a single generate call.
+        
+        Args:
+            prompts: List of complete prompt strings
+            max_length: Max tokens to generate
+            client_id: Who the prompts belong to (for queue fairness)
+            
+        Returns:
+            list: Model's output for each prompt
+        """
+        if self.inference_queue is not None:
+            return self.inference_queue.map(prompts, client_id=client_id, max_length=max_length)
+        return self.generate_batch(prompts, max_length)
+    
+    def generate_batch(self, prompts, max_length=10, inputs=None):
+        """
+        Answer a batch of prompts from the output cache or the model.
+        
+        Args:
+            prompts: List of complete prompt strings
+            max_length: Max tokens to generate
+            inputs: The prompts already tokenized by tokenize_batch (optional,
+                not used for the output cache's partial batches)
+            
+        Returns:
+            list: Model's output for each prompt
+        """
+        if self.output_cache is None:
+            return self._generate(prompts, max_length, inputs)
+        
+        # Only send prompts we have not answered before to the model
+        outputs = [self.output_cache.get((prompt, max_length)) for prompt in prompts]
+        missing = [i for i, output in enumerate(outputs) if output is None]
+        if self.monitor is not None:
+            self.monitor.cache_hits.inc(len(prompts) - len(missing))
+            self.monitor.cache_misses.inc(len(missing))
+        
+        if missing:
+            generated = self._generate([prompts[i] for i in missing], max_length)
+            for i, output in zip(missing, generated):
+                self.output_cache[(prompts[i], max_length)] = output
+                outputs[i] = output
+        
+        return outputs
+    
+    def tokenize_batch(self, prompts, tokenizer=None):
+        """
+        Tokenize a batch of prompts for the local model (padded, truncated).
+        
+        Args:
+            prompts: List of complete prompt strings
+            tokenizer: Use this tokenizer instead of the evaluator's (e.g. a
+                per-thread copy; fast tokenizers must not be shared by threads)
+        """
+        return (tokenizer or self.tokenizer)(
+            prompts, return_tensors="pt", padding=True, truncation=True,
+            max_length=MAX_INPUT_TOKENS
+        )
+    
+    def tokenizes_ahead(self):
+        """
+        True if batches go straight to the local model, so they can be
+        tokenized before infer_batch (and their token counts reused).
+        """
+        return (self.tokenizer is not None and self.backend is None and self.prefix_cache is None
+                and self.inference_queue is None and self.output_cache is None)
+    
+    def _generate(self, prompts, max_length, inputs=None):
+        """Tokenize, generate and decode a batch of prompts"""
+        if self.monitor is not None:
+            self.monitor.batch_size.observe(len(prompts))
+        
+        if self.backend is not None:
+            return self.backend.generate(prompts, max_length=max_length)
+        
+        if inputs is None:
+            inputs = self.tokenize_batch(prompts)
+        
+        if self.is_encoder_decoder:
+            outputs = self.model.generate(**inputs, max_length=max_length, num_beams=1)
+        else:
+            # Decoder-only models echo the prompt: keep only the new tokens
+            outputs = self.model.generate(
+                **inputs, max_new_tokens=max_length, num_beams=1, do_sample=False,
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+            outputs = outputs[:, inputs['input_ids'].shape[1]:]
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    
+    def predict_batch(self, student_module, batch, student_name="default", prompts=None):
+        """
+        Build prompts, run inference and parse outputs for one batch.
+        
+        Args:
+            student_module: Imported student module
+            batch: List of test examples
+            student_name: Student's name (client id for the inference queue)
+            prompts: Prompts already built for this batch (optional)
+            
+        Returns:
+            list: One record per example with label, prediction, output and
+                inference_time
+        """
+        # Generate prompts
+        if prompts is None:
+            prompts = self.build_prompts(student_module, batch)
+        
+        # Run inference (time is shared evenly across the batch)
+        start_time = time.time()
+        inputs = self.tokenize_batch(prompts) if self.tokenizes_ahead() else None
+        outputs = self.infer_batch(student_module, prompts, student_name, inputs)
+        inference_time = (time.time() - start_time) / len(batch)
+        
+        return self.parse_batch(student_module, batch, outputs, inference_time, student_name,
+                                prompts, inputs)
+    
+    def infer_batch(self, student_module, prompts, student_name="default", inputs=None):
+        """
+        Run one student's prompts through the prefix cache, queue or model.
+        
+        Args:
+            student_module: Imported student module
+            prompts: Prompts built by the student's get_prompt
+            student_name: Student's name (client id for the inference queue)
+            inputs: The prompts already tokenized (only used for a direct
+                model call)
+            
+        Returns:
+            list: Model output for each prompt
+        """
+        if self.prefix_cache is not None:
+            return self.prefix_cache.generate_batch(
+                prompts, student_module.get_prompt, fallback=self.generate_batch
+            )
+        if self.inference_queue is not None:
+            return self.run_inference_batch(prompts, client_id=student_name)
+        return self.generate_batch(prompts, inputs=inputs)
+    
+    def parse_batch(self, student_module, batch, outputs, inference_time, student_name="default",
+                    prompts=None, inputs=None):
+        """
+        Parse the outputs of one batch into prediction records.
+        
+        Args:
+            student_module: Imported student module
+            batch: List of test examples
+            outputs: Model output for each example
+            inference_time: Inference time per example in seconds
+            student_name: Student's name (for the monitor)
+            prompts: Prompts of the batch, kept in the records (optional)
+            inputs: The batch as tokenized for the model (optional); its
+                attention mask gives each record's input_tokens
+            
+        Returns:
+            list: One record per example with label, prediction, output,
+                inference_time and prompt (and input_tokens with inputs)
+        """
+        if prompts is None:
+            prompts = [None] * len(batch)
+        
+        records = []
+        for example, prompt, output, prediction in zip(batch, prompts, outputs,
+                                                       parse_predictions(student_module, outputs)):
+            # Convert parsed output to binary
+            records.append({
+                'label': example['label'],
+                'prediction': 1 if prediction == "Positive" else 0,
+                'output': output,
+                'inference_time': inference_time,
+                'prompt': prompt,
+            })
+        if inputs is not None:
+            for record, length in zip(records, input_lengths(inputs)):
+                record['input_tokens'] = length
+        
+        if self.monitor is not None:
+            self.monitor.examples.inc(len(batch), student=student_name)
+        
+        return records
+    
+    def summarize_predictions(self, student_name, true_labels, predictions, inference_times,
+                              outputs=None, prompts=None):
+        """
+        Calculate, print and return the metrics for per-example lists.
+        
+        Args:
+            student_name: Student's name
+            true_labels: True labels (0/1)
+            predictions: Predicted labels (0/1)
+            inference_times: Per-example inference time in seconds
+            outputs: Raw model outputs (for the prediction store)
+            prompts: Prompts (for the prediction store's token counts)
+            
+        Returns:
+            StudentResult: Evaluation results
+        """
+        if self.prediction_store is None:
+            outputs = None
+        return self.summarize_result(StudentResult.from_lists(
+            student_name, true_labels, predictions, inference_times, outputs, prompts,
+            self.tokenizer
+        ))
+    
+    def new_result(self, student_name):
+        """Allocate a StudentResult for the test set (keeping outputs if they are stored)"""
+        return StudentResult(student_name, len(self.test_data),
+                             keep_outputs=self.prediction_store is not None)
+    
+    def summarize_result(self, result):
+        """
+        Compute, print and store the metrics of a finished evaluation.
+        
+        Args:
+            result: StudentResult with every example added
+            
+        Returns:
+            StudentResult: The result, with metrics
+        """
+        result.finalize()
+        if self.prediction_store is not None and result.outputs is not None:
+            self.prediction_store.add_result(result, self.test_example_ids)
+        
+        if self.monitor is not None and result['total_inference_time'] > 0:
+            self.monitor.throughput.set(
+                result.count / result['total_inference_time'], student=result.student_name
+            )
+        
+        # Print results
+        print_metrics(result, student_name=result.student_name)
+        print(f"\n⏱️  Average inference time: {result['avg_inference_time']:.3f}s per example")
+        print(f"   Total time: {result['total_inference_time']:.1f}s")
+        
         return result
     
-    def evaluate_student_prompt(self, student_module, student_name):
+    def evaluate_student_prompt(self, student_module, student_name, prompts=None):
         """
         Evaluate a single student's prompt.
         
         Args:
             student_module: Imported student module
             student_name: Student's name
+            prompts: Prompts already built for every test example (optional,
+                e.g. reused across several models)
             
         Returns:
-            dict: Evaluation results
+            StudentResult: Evaluation results (reads like a metrics dict)
         """
         print(f"\n{'='*70}")
         print(f"Evaluating: {student_name}")
         print(f"{'='*70}")
         
-        predictions = []
-        true_labels = []
-        inference_times = []
-        
-        # Get the prompt function
-        get_prompt = student_module.get_prompt
+        if self.pipeline_workers > 0:
+            from src.evaluation.pipeline import evaluate_pipelined
+            return evaluate_pipelined(self, student_module, student_name, prompts,
+                                      workers=self.pipeline_workers)
         
-        # Optional: get parse_output function if exists
-        parse_output = getattr(student_module, 'parse_output', None)
+        result = self.new_result(student_name)
         
-        # Run on all test examples
-        for i, example in enumerate(self.test_data):
-            review = example['text']
-            true_label = example['label']
+        # Run on all test examples, batch_size prompts per generate call
+        for batch_start in range(0, len(self.test_data), self.batch_size):
+            batch = self.test_data[batch_start:batch_start + self.batch_size]
             
-            # Generate prompt
-            prompt = get_prompt(review)
+            batch_prompts = None
+            if prompts is not None:
+                batch_prompts = prompts[batch_start:batch_start + self.batch_size]
             
-            # Run inference
-            start_time = time.time()
-            output = self.run_inference(prompt)
-            inference_time = time.time() - start_time
-            inference_times.append(inference_time)
-            
-            # Parse output
-            if parse_output:
-                prediction = parse_output(output)
-            else:
-                # Default parsing
-                if "Positive" in output:
-                    prediction = "Positive"
-                elif "Negative" in output:
-                    prediction = "Negative"
-                else:
-                    prediction = "Positive"  # Default fallback
-            
-            # Convert to binary
-            pred_binary = 1 if prediction == "Positive" else 0
-            
-            predictions.append(pred_binary)
-            true_labels.append(true_label)
+            with self.phase("batch", student=student_name, start=batch_start, size=len(batch)):
+                records = self.predict_batch(student_module, batch, student_name, batch_prompts)
+            result.add_records(records, self.tokenizer)
             
             # Progress indicator
-            if (i + 1) % 10 == 0:
-                print(f"   Progress: {i+1}/{len(self.test_data)} examples processed")
+            done = batch_start + len(batch)
+            if done % 10 < len(batch):
+                print(f"   Progress: {done - done % 10}/{len(self.test_data)} examples processed")
+            
+            if self.monitor is not None and self.inference_queue is None:
+                # With a queue, depth is reported by the queue itself
+                self.monitor.queue_depth.set(len(self.test_data) - batch_start - len(batch))
         
-        # Calculate metrics
-        metrics = calculate_metrics(true_labels, predictions)
-        metrics['avg_inference_time'] = sum(inference_times) / len(inference_times)
-        metrics['total_inference_time'] = sum(inference_times)
+        return self.summarize_result(result)
+
+    def score_outputs(self, student_module, student_name, outputs, inference_times, prompts=None):
+        """
+        Parse model outputs produced elsewhere (e.g. by the dedup scheduler)
+        and score them against the test labels.
+    
+        Args:
+            student_module: Imported student module
+            student_name: Student's name
+            outputs: Model output for each test example
+            inference_times: Inference time for each test example
+            prompts: Prompt for each test example (for the prediction store)
+    
+        Returns:
+            StudentResult: Evaluation results
+        """
+        print(f"\n{'='*70}")
+        print(f"Evaluating: {student_name}")
+        print(f"{'='*70}")
+    
+        predictions = [1 if prediction == "Positive" else 0
+                       for prediction in parse_predictions(student_module, outputs)]
+        true_labels = [example['label'] for example in self.test_data]
+    
+        if self.monitor is not None:
+            self.monitor.examples.inc(len(outputs), student=student_name)
+    
+        return self.summarize_predictions(student_name, true_labels, predictions, inference_times,
+                                          outputs, prompts)
+    
+    def build_prompts(self, student_module, examples):
+        """
+        Build a student's prompts for a list of examples.
         
-        # Print results
-        print_metrics(metrics, student_name=student_name)
-        print(f"\n⏱️  Average inference time: {metrics['avg_inference_time']:.3f}s per example")
-        print(f"   Total time: {metrics['total_inference_time']:.1f}s")
+        Uses the module's optional get_prompts hook (one call for all
+        reviews) when available, else get_prompt per review.
         
-        return metrics
+        Args:
+            student_module: Imported (or sandboxed) student module
+            examples: List of test examples
+            
+        Returns:
+            list: One prompt per example
+        """
+        reviews = [example['text'] for example in examples]
+        get_prompts = getattr(student_module, 'get_prompts', None)
+        if get_prompts is not None:
+            prompts = list(get_prompts(reviews))
+            if len(prompts) != len(reviews):
+                raise ValueError(f"get_prompts returned {len(prompts)} prompts for {len(reviews)} reviews")
+            return prompts
+        return [student_module.get_prompt(review) for review in reviews]
     
     def find_student_prompts(self):
         """
@@ -183,16 +575,35 @@ class PromptEvaluator:
         
         return student_prompts
     
-    def evaluate_all_students(self):
+    def evaluate_all_students(self, dedup=False, batch_tokens=None, sandbox=None,
+                              preflight=None, plan=False, plan_settings=None):
         """
         Evaluate all submitted student prompts and generate leaderboard.
         
+        Args:
+            dedup: Pool the prompts of all students in one global queue,
+                run each distinct prompt once and share its output
+                (see src/evaluation/scheduler.py)
+            batch_tokens: With dedup, pack batches up to this many padded
+                tokens instead of batch_size prompts
+            sandbox: Optional SandboxPool; submissions are then imported
+                and run in resource-limited subprocesses
+            preflight: "flag" or "reject" to check prompt token budgets
+                with the tokenizer before loading the model (see
+                src/evaluation/preflight.py); rejected submissions are
+                not evaluated
+            plan: Predict the run time from preflight token counts and a
+                throughput profile of the model, choose batch size and
+                pipeline workers, and print predicted vs actual time
+                (see src/evaluation/planner.py)
+            plan_settings: Settings the planner must keep instead of
+                choosing them (batch_size, pipeline_workers), e.g. the
+                user's explicit command line values
+            
         Returns:
             dict: Results for all students
         """
-        # Load model and data
-        if self.model is None:
-            self.load_model()
+        # Load data (the model is loaded once submissions have been checked)
         if self.test_data is None:
             self.load_test_data()
         
@@ -206,23 +617,72 @@ class PromptEvaluator:
         
         print(f"\n📝 Found {len(student_prompts)} student submissions")
         
-        # Evaluate each student
-        all_results = {}
-        
+        # Import student modules
+        modules = []
         for student_name, module_path in student_prompts:
             try:
-                # Import student module
-                spec = importlib.util.spec_from_file_location(student_name, module_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                
-                # Evaluate
-                results = self.evaluate_student_prompt(module, student_name)
-                all_results[student_name] = results
-                
+                with self.phase("import_student", student=student_name):
+                    modules.append((student_name, self._import_student(
+                        student_name, module_path, sandbox
+                    )))
             except Exception as e:
-                print(f"\n❌ Error evaluating {student_name}: {str(e)}")
-                continue
+                print(f"\n❌ Error importing {student_name}: {str(e)}")
+        
+        if preflight is not None or plan:
+            from src.evaluation.preflight import run_preflight
+            reports = run_preflight(self, modules, policy=preflight or "flag")
+            modules = [(student_name, module) for student_name, module in modules
+                       if reports[student_name]['status'] not in ("rejected", "error")]
+        
+        if self.model is None and self.backend is None:
+            self.load_model()
+        
+        run_plan = None
+        if plan:
+            if self.backend is not None:
+                print("⚠️  The run planner needs a local model, skipping it")
+            else:
+                from src.evaluation.planner import plan_evaluation
+                run_plan = plan_evaluation(
+                    self, {student_name: reports[student_name] for student_name, _ in modules},
+                    dedup=dedup, **(plan_settings or {})
+                )
+        
+        # Evaluate each student
+        all_results = {}
+        student_seconds = {}
+        run_start = time.time()
+        
+        if dedup:
+            from src.evaluation.scheduler import evaluate_students_deduplicated
+            all_results = evaluate_students_deduplicated(self, modules, batch_tokens)
+        
+        else:
+            for student_name, module in modules:
+                try:
+                    # Sandboxed prompts are built in a few IPC round trips
+                    prompts = None
+                    if sandbox is not None:
+                        with self.phase("build_prompts", student=student_name):
+                            prompts = self.build_prompts(module, self.test_data)
+                    
+                    # Evaluate
+                    start_time = time.time()
+                    with self.phase("evaluate_student", student=student_name):
+                        results = self.evaluate_student_prompt(module, student_name, prompts=prompts)
+                    student_seconds[student_name] = time.time() - start_time
+                    all_results[student_name] = results
+                    
+                except Exception as e:
+                    print(f"\n❌ Error evaluating {student_name}: {str(e)}")
+                    continue
+        
+        if run_plan is not None:
+            from src.evaluation.planner import print_plan_accuracy
+            print_plan_accuracy(run_plan, student_seconds, time.time() - run_start)
+        if sandbox is not None:
+            sandbox.print_report()
+        print_parser_fallbacks()
         
         # Generate comparison
         if all_results:
@@ -232,10 +692,18 @@ class PromptEvaluator:
             leaderboard_df = compare_prompts(all_results)
             
             # Save results
-            self.save_results(all_results, leaderboard_df)
+            with self.phase("save_results"):
+                self.save_results(all_results, leaderboard_df)
         
         return all_results
     
+    @staticmethod
+    def _import_student(student_name, module_path, sandbox=None):
+        """Import a submission in-process or in a sandbox subprocess"""
+        if sandbox is not None:
+            return sandbox.load(student_name, module_path)
+        return load_student_module(module_path, student_name)
+    
     def save_results(self, all_results, leaderboard_df):
         """
         Save evaluation results and leaderboard.
@@ -254,19 +722,18 @@ class PromptEvaluator:
         results_file = results_dir / f"evaluation_{timestamp}.json"
         
         # Convert numpy types to Python types for JSON serialization
-        json_results = {}
-        for name, metrics in all_results.items():
-            json_results[name] = {
-                k: float(v) if isinstance(v, (float, int)) else str(v)
-                for k, v in metrics.items()
-                if k != 'confusion_matrix'
-            }
+        json_results = {
+            name: metrics_to_json(metrics) for name, metrics in all_results.items()
+        }
         
         with open(results_file, 'w') as f:
             json.dump(json_results, f, indent=2)
         
         print(f"\n✅ Results saved to: {results_file}")
         
+        # Save per-example predictions
+        self.save_predictions(timestamp)
+        
         # Save leaderboard as markdown
         leaderboard_file = Path("./results/leaderboard.md")
         with open(leaderboard_file, 'w') as f:
@@ -275,31 +742,239 @@ class PromptEvaluator:
             f.write(leaderboard_df.to_markdown())
         
         print(f"✅ Leaderboard saved to: {leaderboard_file}")
+    
+    def save_predictions(self, timestamp=None):
+        """
+        Save the stored per-example predictions (if store_predictions is on)
+        and fold them into the example difficulty index.
+        
+        Args:
+            timestamp: File name suffix (default: now)
+            
+        Returns:
+            Path: The predictions file, or None if nothing was stored
+        """
+        if self.prediction_store is None or not len(self.prediction_store):
+            return None
+        
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        predictions_file = self.prediction_store.save(
+            Path("./results/predictions") / f"predictions_{timestamp}.npz"
+        )
+        print(f"✅ Per-example predictions saved to: {predictions_file}")
+        
+        # Fold the new run into the example difficulty index
+        from src.evaluation.difficulty import update_difficulty_index
+        update_difficulty_index(predictions_file, split=self.prediction_store.split)
+        return predictions_file
+    
+    def profile_students(self, student=None, num_examples=20, use_torch=False,
+                         output_dir="./results/profiles"):
+        """
+        Profile student submissions on a few examples to find slow spots.
+        
+        Args:
+            student: File name (without .py) of one student; None profiles all
+            num_examples: Number of test examples to run under the profiler
+            use_torch: Also record a torch.profiler Chrome trace
+            output_dir: Where to write the profile files
+            
+        Returns:
+            dict: Student name -> profile report
+        """
+        from src.evaluation.profiling import profile_student, print_profile_summary
+        
+        if self.model is None:
+            self.load_model()
+        if self.test_data is None:
+            self.load_test_data()
+        
+        if student:
+            student_prompts = [(student, Path(f"./src/prompts/student_prompts/{student}.py"))]
+        else:
+            student_prompts = self.find_student_prompts()
+        
+        reports = {}
+        for student_name, module_path in student_prompts:
+            try:
+                module = load_student_module(module_path, student_name)
+                reports[student_name] = profile_student(
+                    self, module, student_name, Path(module_path).stem,
+                    num_examples=num_examples,
+                    output_dir=output_dir,
+                    use_torch=use_torch
+                )
+            except Exception as e:
+                print(f"\n❌ Error profiling {student_name}: {str(e)}")
+                continue
+        
+        if reports:
+            print_profile_summary(reports)
+        
+        return reports
+
+
+def metrics_to_json(metrics, include_confusion_matrix=False):
+    """
+    Convert a metrics dict (with numpy values) into JSON-serializable types.
+    
+    Args:
+        metrics: StudentResult or metrics dictionary from evaluate_student_prompt
+        include_confusion_matrix: Keep the confusion matrix as nested lists
+        
+    Returns:
+        dict: JSON-safe copy of the metrics
+    """
+    if isinstance(metrics, StudentResult):
+        # Already plain Python numbers
+        return metrics.to_json(include_confusion_matrix)
+    
+    json_metrics = {}
+    for k, v in metrics.items():
+        if k == 'confusion_matrix':
+            if include_confusion_matrix:
+                json_metrics[k] = [[int(x) for x in row] for row in v]
+        elif isinstance(v, numbers.Number):
+            json_metrics[k] = float(v)
+        else:
+            json_metrics[k] = str(v)
+    return json_metrics
+
+
+def print_parser_fallbacks():
+    """Warn if the shared label parser had to guess for some outputs"""
+    stats = DEFAULT_PARSER.stats()
+    if stats['fallbacks']:
+        print(f"\n⚠️  {stats['fallbacks']} of {stats['parsed']} outputs contained no "
+              f"Positive/Negative label and were scored as {DEFAULT_PARSER.default}")
+
+
+def parse_predictions(student_module, outputs):
+    """
+    Parse a list of model outputs with a student's parsing functions.
+    
+    Uses the optional parse_outputs hook (one call for all outputs) when
+    available, else parse_output per output, else the shared label
+    parser (src/evaluation/label_parser.py).
+    
+    Args:
+        student_module: Imported student module
+        outputs: Raw model outputs
+        
+    Returns:
+        list: "Positive" or "Negative" for each output
+    """
+    parse_outputs = getattr(student_module, 'parse_outputs', None)
+    if parse_outputs is not None:
+        predictions = list(parse_outputs(outputs))
+        if len(predictions) != len(outputs):
+            raise ValueError(f"parse_outputs returned {len(predictions)} labels for {len(outputs)} outputs")
+        return predictions
+    
+    # Optional: parse_output function if the student provides one
+    parse_output = getattr(student_module, 'parse_output', None)
+    if parse_output is None:
+        return parse_labels(outputs)
+    return [parse_output(output) for output in outputs]
+
+
+# Typical raw outputs, used to compare parse_outputs with parse_output
+PARSE_PROBES = [
+    "Positive", "Negative", "positive", "negative", " Positive.", "Negative!",
+    "POSITIVE", "The sentiment is Negative", "Classification: Positive",
+    "Not positive", "neutral", "", "Positive or Negative",
+]
+
+
+def verify_batch_hooks(student_module, reviews, outputs=PARSE_PROBES):
+    """
+    Check that a student's batch hooks agree with the per-item functions.
+    
+    get_prompts is compared with get_prompt on the given reviews, and
+    parse_outputs with parse_output on the given outputs (only for hooks
+    the module defines both ways).
+    
+    Args:
+        student_module: Imported student module
+        reviews: Review texts (e.g. the sample set)
+        outputs: Raw model outputs to parse
+        
+    Returns:
+        dict: Hook name -> number of mismatching items (empty if the
+            module has no batch hooks)
+    """
+    mismatches = {}
+    if hasattr(student_module, 'get_prompts'):
+        batched = list(student_module.get_prompts(reviews))
+        single = [student_module.get_prompt(review) for review in reviews]
+        mismatches['get_prompts'] = (
+            sum(a != b for a, b in zip(batched, single)) + abs(len(batched) - len(single))
+        )
+    if hasattr(student_module, 'parse_outputs') and hasattr(student_module, 'parse_output'):
+        batched = list(student_module.parse_outputs(outputs))
+        single = [student_module.parse_output(output) for output in outputs]
+        mismatches['parse_outputs'] = (
+            sum(a != b for a, b in zip(batched, single)) + abs(len(batched) - len(single))
+        )
+    
+    for hook, count in mismatches.items():
+        if count:
+            print(f"❌ {hook} disagrees with the per-item function on {count} items")
+        else:
+            print(f"✅ {hook} matches the per-item function")
+    return mismatches
 
 
-def quick_test(student_name):
+def quick_test(student_name, model_name="google/flan-t5-base", preview=None, **evaluator_options):
     """
     Quick test of a single student's prompt on sample data.
     
     Args:
         student_name: Name of the student file (without .py)
+        model_name: HuggingFace model to use
+        preview: Instead of the sample data, run this many reviews of the
+            competition split, stratified by label, length and difficulty,
+            and estimate the full-set accuracy with a confidence interval
+            (see src/evaluation/preview.py)
+        **evaluator_options: Extra PromptEvaluator options (batch_size, tracer, ...)
         
     Example:
         quick_test('john_doe')
+        quick_test('john_doe', preview=100)
     """
-    evaluator = PromptEvaluator(use_sample=True)
+    evaluator = PromptEvaluator(model_name=model_name, use_sample=not preview, **evaluator_options)
     evaluator.load_model()
     evaluator.load_test_data()
     
+    if preview:
+        from src.evaluation.preview import load_difficulty_index, select_preview
+        full_data = evaluator.test_data
+        index = load_difficulty_index()
+        sample_ids, strata, stratified_by = select_preview(full_data, preview, index)
+        evaluator.test_data = [full_data[i] for i in sample_ids]
+        evaluator.test_example_ids = sample_ids
+    
     # Import student module
     module_path = f"./src/prompts/student_prompts/{student_name}.py"
-    spec = importlib.util.spec_from_file_location(student_name, module_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    with evaluator.phase("import_student", student=student_name):
+        module = load_student_module(module_path, student_name)
+    
+    # Batch hooks must give the same results as the per-item functions
+    verify_batch_hooks(module, [example['text'] for example in evaluator.test_data])
     
     # Evaluate
-    results = evaluator.evaluate_student_prompt(module, student_name)
+    with evaluator.phase("evaluate_student", student=student_name):
+        results = evaluator.evaluate_student_prompt(module, student_name)
+    print_parser_fallbacks()
     
+    if preview:
+        from src.evaluation.preview import estimate_accuracy, print_preview_estimate
+        estimate = estimate_accuracy(results.labels == results.predictions, sample_ids, strata)
+        print_preview_estimate(estimate, len(full_data), stratified_by)
+        results['predicted_accuracy'] = estimate['estimate']
+        results['predicted_accuracy_ci'] = (estimate['ci_low'], estimate['ci_high'])
+    
+    evaluator.save_predictions()
     return results
 
 
@@ -313,7 +988,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Evaluate student prompts")
     parser.add_argument(
         '--mode', 
-        choices=['all', 'single', 'sample'],
+        choices=['all', 'single', 'sample', 'matrix', 'preflight', 'sweep'],
         default='sample',
         help='Evaluation mode'
     )
@@ -322,29 +997,272 @@ if __name__ == "__main__":
         type=str,
         help='Student name for single evaluation'
     )
+    parser.add_argument(
+        '--preview',
+        type=int,
+        help='With --mode single: run this many stratified reviews of the competition '
+             'split and estimate the full-set accuracy with a confidence interval'
+    )
     parser.add_argument(
         '--model',
         type=str,
         default='google/flan-t5-base',
         help='HuggingFace model name'
     )
+    parser.add_argument(
+        '--models',
+        type=str,
+        default='google/flan-t5-small,google/flan-t5-base',
+        help='Comma-separated models for --mode matrix'
+    )
+    parser.add_argument(
+        '--variants',
+        type=str,
+        help='Comma-separated prompt files (or student names) to compare with --mode sweep'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Use the full test set in --mode matrix/sweep'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        help='Number of prompts per generate call (default: 1, or 4x the '
+             'backend concurrency with --backend-url)'
+    )
+    parser.add_argument(
+        '--backend-url',
+        type=str,
+        help='Use an OpenAI-compatible completions server instead of a local model'
+    )
+    parser.add_argument(
+        '--backend-concurrency',
+        type=int,
+        default=8,
+        help='Requests in flight at once to the backend'
+    )
+    parser.add_argument(
+        '--backend-rps',
+        type=float,
+        help='Maximum requests per second to the backend'
+    )
+    parser.add_argument(
+        '--pipeline-workers',
+        type=int,
+        help='Build and tokenize prompts on N threads while the model runs (default: 0)'
+    )
+    parser.add_argument(
+        '--trace',
+        type=str,
+        help='Write a Chrome/Perfetto trace of the run to this JSON file'
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Reuse model outputs for identical prompts'
+    )
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Schedule all students\' prompts in one global queue, running each '
+             'distinct prompt once (--mode all/sample)'
+    )
+    parser.add_argument(
+        '--sandbox',
+        action='store_true',
+        help='Run student code in subprocesses with CPU, memory and time limits '
+             '(--mode all/sample)'
+    )
+    parser.add_argument(
+        '--preflight',
+        choices=['flag', 'reject'],
+        help='Check prompt token budgets before loading the model; "reject" skips '
+             'submissions whose template (prompt without the review) is over the '
+             'rules\' 1000-token limit (--mode all/sample)'
+    )
+    parser.add_argument(
+        '--plan',
+        action='store_true',
+        help='Predict the run time, pick batch size and pipeline workers, and '
+             'compare predicted with actual time at the end (--mode all/sample)'
+    )
+    parser.add_argument(
+        '--batch-tokens',
+        type=int,
+        help='With --dedup or --mode sweep, pack batches by padded token budget '
+             'instead of --batch-size'
+    )
+    parser.add_argument(
+        '--charts',
+        action='store_true',
+        help='Render confusion matrices and leaderboard charts to results/visualizations '
+             '(--mode all/sample)'
+    )
+    parser.add_argument(
+        '--store-predictions',
+        action='store_true',
+        help='Save every example\'s output, prediction and latency to results/predictions '
+             '(all evaluating modes, including single/--preview and matrix)'
+    )
+    parser.add_argument(
+        '--prefix-cache',
+        action='store_true',
+        help='Reuse the KV cache of each static prompt prefix (decoder-only models)'
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        help='Serve live Prometheus metrics on http://127.0.0.1:PORT/metrics'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile submissions and write flamegraph/trace files to results/profiles'
+    )
+    parser.add_argument(
+        '--profile-examples',
+        type=int,
+        default=20,
+        help='Number of examples to run under the profiler'
+    )
+    parser.add_argument(
+        '--profile-torch',
+        action='store_true',
+        help='Also record a torch.profiler Chrome trace'
+    )
     
     args = parser.parse_args()
+    tracer = TraceRecorder(enabled=bool(args.trace))
+    
+    monitor = None
+    metrics_server = None
+    if args.metrics_port is not None:
+        from src.evaluation.monitoring import EvaluationMonitor, MetricsServer
+        monitor = EvaluationMonitor()
+        metrics_server = MetricsServer(monitor.registry, port=args.metrics_port).start()
+    
+    backend = None
+    if args.backend_url:
+        from src.evaluation.backends import OpenAICompatibleBackend
+        backend = OpenAICompatibleBackend(
+            args.backend_url, model=args.model,
+            max_concurrency=args.backend_concurrency,
+            requests_per_second=args.backend_rps
+        )
+    
+    sandbox = None
+    if args.sandbox:
+        from src.evaluation.sandbox import SandboxPool
+        sandbox = SandboxPool()
+    
+    batch_size = args.batch_size
+    if batch_size is None:
+        # A remote backend needs several prompts per batch to run them concurrently
+        batch_size = 4 * args.backend_concurrency if backend is not None else 1
+    
+    evaluator_options = dict(
+        model_name=args.model,
+        batch_size=batch_size,
+        backend=backend,
+        tracer=tracer,
+        monitor=monitor,
+        cache_outputs=args.cache,
+        prefix_cache=args.prefix_cache,
+        pipeline_workers=args.pipeline_workers or 0,
+        store_predictions=args.store_predictions
+    )
+    
+    # Values given on the command line are kept by --plan
+    plan_settings = {name: value for name, value in (('batch_size', args.batch_size),
+                                                     ('pipeline_workers', args.pipeline_workers))
+                     if value is not None}
     
-    if args.mode == 'all':
+    if args.store_predictions and (args.profile or args.mode == 'preflight'):
+        print("⚠️  --store-predictions has no effect with --profile or --mode preflight")
+    
+    if args.profile:
+        # Profile on the data set the chosen mode would use
+        evaluator = PromptEvaluator(use_sample=(args.mode != 'all'), **evaluator_options)
+        evaluator.profile_students(
+            student=args.student if args.mode == 'single' else None,
+            num_examples=args.profile_examples,
+            use_torch=args.profile_torch
+        )
+    
+    elif args.mode == 'all':
         # Evaluate all students on full test set
-        evaluator = PromptEvaluator(model_name=args.model, use_sample=False)
-        evaluator.evaluate_all_students()
+        evaluator = PromptEvaluator(use_sample=False, **evaluator_options)
+        all_results = evaluator.evaluate_all_students(
+            dedup=args.dedup, batch_tokens=args.batch_tokens, sandbox=sandbox,
+            preflight=args.preflight, plan=args.plan, plan_settings=plan_settings
+        )
+        if args.charts and all_results:
+            from src.evaluation.report import render_report
+            render_report(all_results)
+    
+    elif args.mode == 'preflight':
+        # Token budgets of every submission on the competition set, no model
+        from src.evaluation.preflight import run_preflight
+        evaluator = PromptEvaluator(use_sample=False, **evaluator_options)
+        evaluator.load_test_data()
+        modules = []
+        for student_name, module_path in evaluator.find_student_prompts():
+            try:
+                modules.append((student_name, evaluator._import_student(student_name, module_path, sandbox)))
+            except Exception as e:
+                print(f"\n❌ Error importing {student_name}: {str(e)}")
+        run_preflight(evaluator, modules, policy=args.preflight or 'flag')
+    
+    elif args.mode == 'matrix':
+        # Every student on every model, loading each model once
+        from src.evaluation.matrix import evaluate_model_matrix
+        evaluator_options.pop('model_name')
+        evaluate_model_matrix(
+            [name.strip() for name in args.models.split(',') if name.strip()],
+            use_sample=not args.full,
+            **evaluator_options
+        )
+    
+    elif args.mode == 'sweep':
+        # Prompt variants with successive halving (see src/evaluation/sweep.py)
+        from src.evaluation.sweep import sweep_prompt_variants
+        variant_paths = [path.strip() for path in (args.variants or '').split(',') if path.strip()]
+        if not variant_paths:
+            print("❌ Please specify --variants file1.py,file2.py")
+        else:
+            evaluator = PromptEvaluator(use_sample=not args.full, **evaluator_options)
+            evaluator.load_model()
+            evaluator.load_test_data()
+            variants = {}
+            for path in variant_paths:
+                if not path.endswith('.py'):
+                    path = f"./src/prompts/student_prompts/{path}.py"
+                variants[Path(path).stem] = load_student_module(path, Path(path).stem)
+            sweep_prompt_variants(evaluator, variants, max_batch_tokens=args.batch_tokens)
     
     elif args.mode == 'single':
         # Evaluate single student
         if not args.student:
             print("❌ Please specify --student name")
         else:
-            quick_test(args.student)
+            quick_test(args.student, preview=args.preview, **evaluator_options)
     
     else:
         # Sample mode - quick test
         print("Running in SAMPLE mode - using sample data for quick testing")
-        evaluator = PromptEvaluator(model_name=args.model, use_sample=True)
-        evaluator.evaluate_all_students()
+        evaluator = PromptEvaluator(use_sample=True, **evaluator_options)
+        all_results = evaluator.evaluate_all_students(
+            dedup=args.dedup, batch_tokens=args.batch_tokens, sandbox=sandbox,
+            preflight=args.preflight, plan=args.plan, plan_settings=plan_settings
+        )
+        if args.charts and all_results:
+            from src.evaluation.report import render_report
+            render_report(all_results)
+    
+    if sandbox is not None:
+        sandbox.close()
+    if args.trace:
+        tracer.save(args.trace)
+    if metrics_server is not None:
+        metrics_server.stop()
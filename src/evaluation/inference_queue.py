@@ -0,0 +1,202 @@
+"""
+Inference Queue - Dynamic Micro-Batching for Concurrent Clients
+================================================================
+
+When a whole class runs quick tests at once, every request would otherwise
+run its own batch-size-1 generate call. The queue sits in front of a single
+model: requests from many clients are coalesced into batches (up to
+`max_batch_size`, waiting at most `max_wait` seconds for a batch to fill),
+clients are served round-robin so one large submission cannot starve the
+others, and each client may only have `max_pending_per_client` prompts
+waiting (backpressure). Results come back through futures.
+
+Example:
+    queue = InferenceQueue(evaluator.generate_batch, max_batch_size=16).start()
+    future = queue.submit("Classify ...", client_id="alice")
+    output = future.result()
+"""
+
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+
+class InferenceQueue:
+    """Coalesces prompts from many clients into batched model calls"""
+
+    def __init__(self, infer_batch, max_batch_size=16, max_wait=0.01,
+                 max_pending_per_client=64, monitor=None):
+        """
+        Args:
+            infer_batch: Function (prompts, max_length) -> list of outputs
+            max_batch_size: Largest batch sent to the model
+            max_wait: Seconds to wait for more requests before running a
+                partially filled batch
+            max_pending_per_client: Prompts a client may have queued before
+                submit() blocks (or raises queue.Full)
+            monitor: Optional EvaluationMonitor; queue depth is reported on it
+        """
+        self.infer_batch = infer_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_pending_per_client = max_pending_per_client
+        self.monitor = monitor
+
+        # client_id -> deque of (prompt, max_length, future), in round-robin order
+        self._pending = OrderedDict()
+        self._pending_count = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        self.batches_run = 0
+        self.prompts_run = 0
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="inference-queue", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the worker after the batches already queued have run."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def submit(self, prompt, client_id="default", max_length=10, block=True, timeout=None):
+        """
+        Queue one prompt.
+
+        Args:
+            prompt: Complete prompt string
+            client_id: Who the request belongs to (used for fairness)
+            max_length: Max tokens to generate
+            block: Wait for room if the client is at its pending limit
+            timeout: Seconds to wait for room (None waits forever)
+
+        Returns:
+            Future: Resolves to the model output
+
+        Raises:
+            queue.Full: The client is at its pending limit and block is False
+                or the timeout expired
+        """
+        future = Future()
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            while len(self._pending.get(client_id, ())) >= self.max_pending_per_client:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not block or (remaining is not None and remaining <= 0):
+                    raise queue.Full(f"Client {client_id!r} has too many pending prompts")
+                self._condition.wait(remaining)
+
+            self._pending.setdefault(client_id, deque()).append((prompt, max_length, future))
+            self._pending_count += 1
+            self._report_depth()
+            self._condition.notify_all()
+
+        return future
+
+    def map(self, prompts, client_id="default", max_length=10):
+        """
+        Run a list of prompts through the queue and wait for all outputs.
+
+        Args:
+            prompts: List of complete prompt strings
+            client_id: Who the request belongs to
+            max_length: Max tokens to generate
+
+        Returns:
+            list: Model output for each prompt, in order
+        """
+        futures = [self.submit(prompt, client_id, max_length) for prompt in prompts]
+        return [future.result() for future in futures]
+
+    def _report_depth(self):
+        if self.monitor is not None:
+            self.monitor.queue_depth.set(self._pending_count)
+
+    def _take_batch(self):
+        """
+        Pop up to max_batch_size items, one per client in turn.
+
+        Only items with the same max_length as the first one are taken so
+        the batch can share a single generate call. Must hold the condition.
+        """
+        batch = []
+        max_length = None
+        while len(batch) < self.max_batch_size and self._pending_count:
+            progressed = False
+            for client_id in list(self._pending):
+                items = self._pending[client_id]
+                if max_length is None:
+                    max_length = items[0][1]
+                if items[0][1] == max_length:
+                    batch.append(items.popleft())
+                    self._pending_count -= 1
+                    progressed = True
+                # Served clients go to the back of the round-robin order
+                self._pending.move_to_end(client_id)
+                if not items:
+                    del self._pending[client_id]
+                if len(batch) >= self.max_batch_size:
+                    break
+            if not progressed:
+                break
+
+        self._report_depth()
+        # Clients blocked on backpressure may have room now
+        self._condition.notify_all()
+        return batch, max_length
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending_count:
+                    self._condition.wait()
+                if not self._running and not self._pending_count:
+                    return
+
+                # Give concurrent clients a moment to fill the batch
+                deadline = time.monotonic() + self.max_wait
+                while self._running and self._pending_count < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch, max_length = self._take_batch()
+
+            prompts = [prompt for prompt, _, _ in batch]
+            try:
+                outputs = list(self.infer_batch(prompts, max_length))
+                if len(outputs) != len(batch):
+                    raise RuntimeError(
+                        f"infer_batch returned {len(outputs)} outputs for {len(batch)} prompts"
+                    )
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.prompts_run += len(batch)
+            for (_, _, future), output in zip(batch, outputs):
+                future.set_result(output)
+
+    def stats(self):
+        """Return queue statistics (batches run, mean batch size, pending)."""
+        with self._condition:
+            pending = self._pending_count
+        return {
+            'batches_run': self.batches_run,
+            'prompts_run': self.prompts_run,
+            'mean_batch_size': self.prompts_run / self.batches_run if self.batches_run else 0.0,
+            'pending': pending,
+        }
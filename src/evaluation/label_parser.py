@@ -0,0 +1,153 @@
+"""
+Label Parser - Fast, Shared Extraction of "Positive" / "Negative"
+==================================================================
+
+One precompiled pattern finds the first sentiment label in a model output,
+whatever its case, punctuation or surrounding text:
+
+    "Positive"                      -> Positive
+    " negative."                    -> Negative
+    "Classification: POSITIVE"      -> Positive
+    "Sentiment - neg"               -> Negative
+    "I'd say positively great"      -> Positive
+    "???"                           -> Positive (fallback, counted)
+
+This changes scoring for some outputs. The old default parser checked for
+"Positive" (case-sensitive) first, then "Negative", so:
+
+    output                    old         now
+    "negative"                Positive    Negative
+    "Negative or Positive"    Positive    Negative
+    "positive, not Negative"  Negative    Positive
+
+Submissions with their own parse_output() are not affected.
+
+A classifier asked for one word produces only a handful of distinct
+outputs, so each distinct output is matched once and remembered: parsing a
+list of outputs is then mostly dictionary lookups. Outputs with no label
+fall back to "Positive" (the old default) and are counted,
+so a prompt that makes the model ramble shows up in the statistics instead
+of silently scoring as Positive.
+
+Example:
+    from src.evaluation.label_parser import parse_label, parse_labels, DEFAULT_PARSER
+
+    parse_label("The answer is: negative!")   # "Negative"
+    parse_labels(["Positive", "neg.", "??"])  # ["Positive", "Negative", "Positive"]
+    DEFAULT_PARSER.stats()                    # {'parsed': 4, 'fallbacks': 1, ...}
+"""
+
+import re
+import threading
+
+# Words starting with positive/negative (positively, negatives, ...) or the
+# short forms pos/neg, matched on the lowercased output
+_LABEL_PATTERN = re.compile(r"\b(?:positive|negative|pos\b|neg\b)")
+
+
+class LabelParser:
+    """Extracts sentiment labels and counts how often it had to guess"""
+
+    def __init__(self, default="Positive", max_cache=65536):
+        """
+        Args:
+            default: Label returned when an output contains no label
+            max_cache: Distinct outputs remembered (the memo is cleared
+                when it fills up)
+        """
+        self.default = default
+        self.max_cache = max_cache
+        self.parsed = 0
+        self.fallbacks = 0
+        self._memo = {}  # output -> label or None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _search(output):
+        found = _LABEL_PATTERN.search(output.lower())
+        if found is None:
+            return None
+        return "Positive" if found.group(0)[0] == "p" else "Negative"
+
+    def match_batch(self, outputs):
+        """
+        Return the first label of each output (None where there is none).
+
+        Args:
+            outputs: List of raw model outputs
+
+        Returns:
+            list: "Positive", "Negative" or None for each output
+        """
+        # The memo is shared between threads (the evaluator's pipeline and
+        # the daemon parse concurrently), so another call's clear() must not
+        # run between filling it and reading it back
+        with self._lock:
+            memo = self._memo
+            unseen = set(outputs).difference(memo)
+            if unseen:
+                if len(memo) + len(unseen) > self.max_cache:
+                    memo.clear()
+                    unseen = set(outputs)
+                for output in unseen:
+                    memo[output] = self._search(output)
+            labels = list(map(memo.__getitem__, outputs))
+        return labels
+
+    def parse(self, output):
+        """
+        Parse one output.
+
+        Args:
+            output: Raw model output
+
+        Returns:
+            str: "Positive" or "Negative"
+        """
+        return self.parse_batch([output])[0]
+
+    def parse_batch(self, outputs):
+        """
+        Parse a list of outputs.
+
+        Args:
+            outputs: Raw model outputs
+
+        Returns:
+            list: "Positive" or "Negative" for each output
+        """
+        labels = self.match_batch(outputs)
+        missing = labels.count(None)
+        with self._lock:
+            self.parsed += len(labels)
+            self.fallbacks += missing
+        if missing:
+            labels = [self.default if label is None else label for label in labels]
+        return labels
+
+    def stats(self):
+        with self._lock:
+            return {
+                'parsed': self.parsed,
+                'fallbacks': self.fallbacks,
+                'fallback_rate': self.fallbacks / self.parsed if self.parsed else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.parsed = 0
+            self.fallbacks = 0
+
+
+# Shared by the evaluator, the notebooks and any submission that wants it
+DEFAULT_PARSER = LabelParser()
+
+
+def parse_label(output):
+    """Parse one model output into "Positive" or "Negative" (shared parser)."""
+    return DEFAULT_PARSER.parse(output)
+
+
+def parse_labels(outputs):
+    """Parse a list of model outputs into labels in one pass (shared parser)."""
+    return DEFAULT_PARSER.parse_batch(outputs)
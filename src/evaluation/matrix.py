@@ -0,0 +1,142 @@
+"""
+Model Matrix - Score Every Submission on Several Models
+========================================================
+
+Runs all student prompts on a list of models to study how robust each
+prompt is. Each model is loaded exactly once, the test data stays in
+memory for the whole run, prompts are built once per student and reused
+for every model, and each model is released before the next one loads.
+
+Example:
+    python src/evaluation/evaluator.py --mode matrix \\
+        --models google/flan-t5-small,google/flan-t5-base,Qwen/Qwen2.5-0.5B-Instruct
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from src.evaluation.evaluator import PromptEvaluator, load_student_module, metrics_to_json
+
+
+def build_matrix_table(results, metric='accuracy'):
+    """
+    Arrange matrix results as a student x model table.
+
+    Args:
+        results (dict): student -> model -> metrics
+        metric (str): Metric to show in the cells
+
+    Returns:
+        pd.DataFrame: One row per student, one column per model, plus the
+            mean and spread (max - min) across models
+    """
+    import pandas as pd
+
+    table = pd.DataFrame({
+        student: {model: metrics[metric] for model, metrics in by_model.items()}
+        for student, by_model in results.items()
+    }).T
+    table['Mean'] = table.mean(axis=1)
+    table['Spread'] = table.drop(columns='Mean').max(axis=1) - table.drop(columns='Mean').min(axis=1)
+    return table.sort_values('Mean', ascending=False)
+
+
+def evaluate_model_matrix(model_names, use_sample=True, output_dir="./results", **evaluator_options):
+    """
+    Evaluate every student submission on every model.
+
+    Args:
+        model_names (list): HuggingFace model names, run in order
+        use_sample (bool): Use sample data instead of the full test set
+        output_dir (str): Where to write the matrix files
+        **evaluator_options: Extra PromptEvaluator options (batch_size, ...)
+
+    Returns:
+        dict: student -> model -> metrics
+    """
+    evaluator = PromptEvaluator(model_name=model_names[0], use_sample=use_sample,
+                                **evaluator_options)
+    evaluator.load_test_data()
+
+    # Import every submission and build its prompts once for all models
+    students = {}
+    for student_name, module_path in evaluator.find_student_prompts():
+        try:
+            with evaluator.phase("import_student", student=student_name):
+                module = load_student_module(module_path, student_name)
+                prompts = evaluator.build_prompts(module, evaluator.test_data)
+            students[student_name] = (module, prompts)
+        except Exception as e:
+            print(f"\n❌ Error preparing {student_name}: {str(e)}")
+
+    if not students:
+        print("⚠️  No student submissions found!")
+        return {}
+
+    print(f"\n📝 {len(students)} submissions x {len(model_names)} models")
+
+    results = {student_name: {} for student_name in students}
+    for model_name in model_names:
+        evaluator.model_name = model_name
+        try:
+            evaluator.load_model()
+        except Exception as e:
+            print(f"\n❌ Could not load {model_name}: {str(e)}")
+            continue
+
+        for student_name, (module, prompts) in students.items():
+            try:
+                with evaluator.phase("evaluate_student", student=student_name, model=model_name):
+                    metrics = evaluator.evaluate_student_prompt(
+                        module, f"{student_name} @ {model_name}", prompts=prompts
+                    )
+                results[student_name][model_name] = metrics
+            except Exception as e:
+                print(f"\n❌ Error evaluating {student_name} on {model_name}: {str(e)}")
+
+        evaluator.unload_model()
+
+    results = {student: by_model for student, by_model in results.items() if by_model}
+    if results:
+        table = build_matrix_table(results)
+        print("\n" + "=" * 80)
+        print("MODEL MATRIX - ACCURACY")
+        print("=" * 80)
+        print(table.to_string(float_format=lambda v: f"{v:.4f}"))
+        print("=" * 80)
+        save_matrix(results, table, output_dir)
+        # One file for the whole matrix; each student @ model is its own submission
+        evaluator.save_predictions()
+
+    return results
+
+
+def save_matrix(results, table, output_dir="./results"):
+    """
+    Save the matrix as JSON (all metrics) and markdown (accuracy table).
+
+    Args:
+        results (dict): student -> model -> metrics
+        table (pd.DataFrame): Table from build_matrix_table
+        output_dir (str): Where to write the files
+    """
+    output_dir = Path(output_dir)
+    (output_dir / "submissions").mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    json_file = output_dir / "submissions" / f"model_matrix_{timestamp}.json"
+    with open(json_file, 'w') as f:
+        json.dump({
+            student: {model: metrics_to_json(metrics) for model, metrics in by_model.items()}
+            for student, by_model in results.items()
+        }, f, indent=2)
+
+    markdown_file = output_dir / "model_matrix.md"
+    with open(markdown_file, 'w') as f:
+        f.write("# 🧪 Model Matrix - Accuracy\n\n")
+        f.write(f"*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n")
+        f.write(table.to_markdown(floatfmt=".4f"))
+
+    print(f"\n✅ Matrix saved to: {json_file}")
+    print(f"✅ Table saved to: {markdown_file}")
@@ -3,17 +3,10 @@ Evaluation Metrics for Sentiment Classification
 ================================================
 
 This module provides metrics for evaluating prompt performance.
-"""
 
-from sklearn.metrics import (
-    accuracy_score,
-    precision_recall_fscore_support,
-    confusion_matrix,
-    classification_report
-)
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+sklearn, matplotlib and seaborn are imported inside the functions that use
+them, so importing this module (and the evaluator) stays fast.
+"""
 
 
 def calculate_metrics(y_true, y_pred):
@@ -27,32 +20,51 @@ def calculate_metrics(y_true, y_pred):
     Returns:
         dict: Dictionary containing all metrics
     """
+    from sklearn.metrics import confusion_matrix
+    
     # Convert string labels to binary if needed
     if isinstance(y_true[0], str):
         y_true = [1 if label == "Positive" else 0 for label in y_true]
     if isinstance(y_pred[0], str):
         y_pred = [1 if label == "Positive" else 0 for label in y_pred]
     
-    # Calculate metrics
-    accuracy = accuracy_score(y_true, y_pred)
-    precision, recall, f1, _ = precision_recall_fscore_support(
-        y_true, y_pred, average='binary'
-    )
+    # Confusion matrix (both labels, even if one never occurs)
+    tn, fp, fn, tp = confusion_matrix(y_true, y_pred, labels=[0, 1]).ravel()
+    return metrics_from_counts(tn, fp, fn, tp)
+
+
+def metrics_from_counts(tn, fp, fn, tp):
+    """
+    Calculate the metrics from the four confusion matrix counts.
     
-    # Confusion matrix
-    cm = confusion_matrix(y_true, y_pred)
-    tn, fp, fn, tp = cm.ravel()
+    This is the one implementation of the metrics: calculate_metrics and
+    StudentResult (which counts its label arrays directly) both use it.
+    Precision, recall and F1 are 0.0 when undefined, as in sklearn.
+    
+    Args:
+        tn, fp, fn, tp: True negatives, false positives, false negatives,
+            true positives
+        
+    Returns:
+        dict: Dictionary containing all metrics
+    """
+    import numpy as np
+    
+    tn, fp, fn, tp = int(tn), int(fp), int(fn), int(tp)
+    total = tn + fp + fn + tp
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
     
     metrics = {
-        'accuracy': accuracy,
+        'accuracy': (tp + tn) / total if total else 0.0,
         'precision': precision,
         'recall': recall,
-        'f1_score': f1,
-        'true_positives': int(tp),
-        'true_negatives': int(tn),
-        'false_positives': int(fp),
-        'false_negatives': int(fn),
-        'confusion_matrix': cm
+        'f1_score': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        'true_positives': tp,
+        'true_negatives': tn,
+        'false_positives': fp,
+        'false_negatives': fn,
+        'confusion_matrix': np.array([[tn, fp], [fn, tp]])
     }
     
     return metrics
@@ -85,7 +97,7 @@ def print_metrics(metrics, student_name="Unknown"):
     print("\n" + "=" * 70)
 
 
-def plot_confusion_matrix(cm, student_name="Unknown", save_path=None):
+def plot_confusion_matrix(cm, student_name="Unknown", save_path=None, show=None, dpi=300):
     """
     Plot confusion matrix as a heatmap.
     
@@ -93,8 +105,15 @@ def plot_confusion_matrix(cm, student_name="Unknown", save_path=None):
         cm (np.array): Confusion matrix
         student_name (str): Student name for title
         save_path (str): Path to save figure (optional)
+        show (bool): Display the figure (default: only when it is not saved
+            and matplotlib has an interactive backend)
+        dpi (int): Resolution of the saved figure
     """
-    plt.figure(figsize=(8, 6))
+    import matplotlib
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    fig = plt.figure(figsize=(8, 6))
     
     sns.heatmap(
         cm, 
@@ -112,10 +131,16 @@ def plot_confusion_matrix(cm, student_name="Unknown", save_path=None):
     plt.tight_layout()
     
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        plt.savefig(save_path, dpi=dpi, bbox_inches='tight')
         print(f"✅ Confusion matrix saved to: {save_path}")
     
-    plt.show()
+    if show is None:
+        # plt.show() blocks (or does nothing) in headless runs
+        show = not save_path and matplotlib.get_backend().lower() != 'agg'
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 
 def compare_prompts(results_dict):
@@ -201,6 +226,8 @@ def generate_classification_report(y_true, y_pred, save_path=None):
     Returns:
         str: Classification report
     """
+    from sklearn.metrics import classification_report
+    
     # Convert to binary if needed
     if isinstance(y_true[0], str):
         y_true = [1 if label == "Positive" else 0 for label in y_true]
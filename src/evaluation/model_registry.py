@@ -0,0 +1,234 @@
+"""
+Model Registry - Share Loaded Models Within a Process
+======================================================
+
+Notebook and daemon users switch between models (flan-t5-small,
+flan-t5-base, ...). Instead of reloading on every switch, or keeping every
+model ever loaded, the registry caches models and tokenizers under a memory
+budget and evicts the least recently used model when a new one does not fit.
+
+Example:
+    from src.evaluation.model_registry import get_registry
+
+    model, tokenizer = get_registry().get("google/flan-t5-small")
+    print(get_registry().stats())
+
+The process-wide budget can be set with the LLM_EVAL_MODEL_BUDGET_MB
+environment variable (default: unlimited).
+"""
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def _from_pretrained(model_class, model_name):
+    """
+    Load weights without an extra in-memory copy.
+
+    safetensors files are memory-mapped, and low_cpu_mem_usage skips the
+    random initialisation that from_pretrained would otherwise overwrite.
+    """
+    try:
+        return model_class.from_pretrained(model_name, use_safetensors=True, low_cpu_mem_usage=True)
+    except OSError:
+        # Checkpoint only ships PyTorch .bin weights
+        return model_class.from_pretrained(model_name, low_cpu_mem_usage=True)
+
+
+def load_model_and_tokenizer(model_name):
+    """
+    Load a HuggingFace model and tokenizer for generation.
+
+    Encoder-decoder checkpoints (FLAN-T5) load as Seq2SeqLM. Decoder-only
+    checkpoints load as CausalLM and pad/truncate on the left, since their
+    answer follows the prompt.
+
+    Args:
+        model_name: HuggingFace model name or local path
+
+    Returns:
+        tuple: (model, tokenizer)
+    """
+    from transformers import (
+        AutoConfig, AutoTokenizer, AutoModelForSeq2SeqLM, AutoModelForCausalLM
+    )
+
+    config = AutoConfig.from_pretrained(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if config.is_encoder_decoder:
+        model = _from_pretrained(AutoModelForSeq2SeqLM, model_name)
+    else:
+        model = _from_pretrained(AutoModelForCausalLM, model_name)
+        tokenizer.padding_side = "left"
+        tokenizer.truncation_side = "left"
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+
+    model.eval()
+    return model, tokenizer
+
+
+def model_nbytes(model):
+    """Bytes used by a model's parameters and buffers."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def _free_memory():
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+class ModelRegistry:
+    """LRU cache of loaded models with a memory budget"""
+
+    def __init__(self, budget_bytes=None, max_rss_bytes=None, loader=load_model_and_tokenizer):
+        """
+        Args:
+            budget_bytes: Max total size of cached model weights (None = no limit)
+            max_rss_bytes: Also evict while the process RSS is above this
+            loader: Function model_name -> (model, tokenizer)
+        """
+        self.budget_bytes = budget_bytes
+        self.max_rss_bytes = max_rss_bytes
+        self.loader = loader
+
+        # model_name -> {'model', 'tokenizer', 'nbytes', 'hits', 'loaded_at', 'last_used'}
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.load_time = 0.0
+
+    @property
+    def total_bytes(self):
+        return sum(entry['nbytes'] for entry in self._entries.values())
+
+    def get(self, model_name):
+        """
+        Return a cached (model, tokenizer), loading it if needed.
+
+        Args:
+            model_name: HuggingFace model name or local path
+
+        Returns:
+            tuple: (model, tokenizer)
+        """
+        with self._lock:
+            entry = self._entries.get(model_name)
+            if entry is not None:
+                self._entries.move_to_end(model_name)
+                entry['hits'] += 1
+                entry['last_used'] = time.time()
+                self.hits += 1
+                return entry['model'], entry['tokenizer']
+
+            start_time = time.time()
+            model, tokenizer = self.loader(model_name)
+            self.load_time += time.time() - start_time
+            self.loads += 1
+
+            self._entries[model_name] = {
+                'model': model,
+                'tokenizer': tokenizer,
+                'nbytes': model_nbytes(model),
+                'hits': 0,
+                'loaded_at': time.time(),
+                'last_used': time.time(),
+            }
+            self._enforce_budget(keep=model_name)
+            return model, tokenizer
+
+    def _over_budget(self):
+        if self.budget_bytes is not None and self.total_bytes > self.budget_bytes:
+            return True
+        if self.max_rss_bytes is not None:
+            from src.evaluation.monitoring import resident_memory_bytes
+            return resident_memory_bytes() > self.max_rss_bytes
+        return False
+
+    def _enforce_budget(self, keep):
+        """Evict least recently used models (never `keep`) until within budget."""
+        while self._over_budget():
+            victim = next((name for name in self._entries if name != keep), None)
+            if victim is None:
+                break
+            self.evict(victim)
+
+    def evict(self, model_name):
+        """
+        Drop a model from the registry.
+
+        Memory is only returned once no one else holds the model either.
+
+        Args:
+            model_name: Model to drop
+
+        Returns:
+            bool: True if the model was cached
+        """
+        with self._lock:
+            entry = self._entries.pop(model_name, None)
+            if entry is None:
+                return False
+            self.evictions += 1
+            print(f"♻️  Evicted model from registry: {model_name} "
+                  f"({entry['nbytes'] / 1e6:.0f} MB)")
+        del entry
+        _free_memory()
+        return True
+
+    def clear(self):
+        """Evict every model."""
+        for model_name in list(self._entries):
+            self.evict(model_name)
+
+    def stats(self):
+        """
+        Load/evict statistics.
+
+        Returns:
+            dict: Counters, cached bytes and per-model details
+        """
+        with self._lock:
+            return {
+                'loads': self.loads,
+                'hits': self.hits,
+                'evictions': self.evictions,
+                'load_time': self.load_time,
+                'cached_bytes': self.total_bytes,
+                'budget_bytes': self.budget_bytes,
+                'models': {
+                    name: {'nbytes': entry['nbytes'], 'hits': entry['hits'],
+                           'last_used': entry['last_used']}
+                    for name, entry in self._entries.items()
+                },
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Return the process-wide model registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            budget_mb = os.environ.get("LLM_EVAL_MODEL_BUDGET_MB")
+            _registry = ModelRegistry(
+                budget_bytes=int(float(budget_mb) * 1e6) if budget_mb else None
+            )
+        return _registry
+
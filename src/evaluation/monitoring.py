@@ -0,0 +1,251 @@
+"""
+Live Metrics - Prometheus Endpoint for Long Evaluation Runs
+============================================================
+
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format and served from a background thread, so a multi-hour `--mode all`
+run can be watched (or scraped) without touching the inference loop.
+
+Example:
+    monitor = EvaluationMonitor()
+    server = MetricsServer(monitor.registry, port=9100).start()
+    # ... run the evaluation ...
+    # curl http://127.0.0.1:9100/metrics
+    server.stop()
+"""
+
+import os
+import resource
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class holding one value (or histogram) per label set"""
+
+    kind = "untyped"
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple((name, labels[name]) for name in self.label_names)
+
+    def samples(self):
+        """Return (suffix, labels, value) tuples for rendering."""
+        with self._lock:
+            if not self.label_names and not self._values:
+                # Unlabelled metrics are reported as zero before first use
+                return [("", (), 0)]
+            return [("", key, value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, label_names=(), callback=None):
+        super().__init__(name, help_text, label_names)
+        self.callback = callback
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        if self.callback is not None:
+            return [("", (), self.callback())]
+        return super().samples()
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets, label_names=()):
+        super().__init__(name, help_text, label_names)
+        self.buckets = sorted(buckets) + [float('inf')]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in items:
+            for bound, count in zip(self.buckets, counts):
+                samples.append(("_bucket", key + (("le", _format_value(bound)),), count))
+            samples.append(("_sum", key, total))
+            samples.append(("_count", key, counts[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on /metrics"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, label_names=()):
+        return self.register(Counter(name, help_text, label_names))
+
+    def gauge(self, name, help_text, label_names=(), callback=None):
+        return self.register(Gauge(name, help_text, label_names, callback=callback))
+
+    def histogram(self, name, help_text, buckets, label_names=()):
+        return self.register(Histogram(name, help_text, buckets, label_names))
+
+    def render(self):
+        """Render all metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+def resident_memory_bytes():
+    """Current resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Not Linux: fall back to peak RSS (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class EvaluationMonitor:
+    """The metrics the evaluator updates while it runs"""
+
+    def __init__(self, registry=None):
+        self.registry = registry or MetricsRegistry()
+        self.examples = self.registry.counter(
+            "llm_eval_examples_processed_total",
+            "Examples scored, per student", ("student",))
+        self.throughput = self.registry.gauge(
+            "llm_eval_student_throughput_examples_per_second",
+            "Examples per second for the student's latest evaluation", ("student",))
+        self.cache_hits = self.registry.counter(
+            "llm_eval_cache_hits_total", "Prompts answered from the output cache")
+        self.cache_misses = self.registry.counter(
+            "llm_eval_cache_misses_total", "Prompts that needed a model call")
+        self.batch_size = self.registry.histogram(
+            "llm_eval_batch_size", "Prompts per generate call",
+            buckets=[1, 2, 4, 8, 16, 32, 64, 128])
+        self.queue_depth = self.registry.gauge(
+            "llm_eval_queue_depth", "Examples waiting to be processed")
+        self.registry.gauge(
+            "llm_eval_resident_memory_bytes", "Resident set size of the evaluator process",
+            callback=resident_memory_bytes)
+        self.phase_latency = self.registry.histogram(
+            "llm_eval_phase_seconds", "Duration of evaluation phases",
+            buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800],
+            label_names=("phase",))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep scrapes out of the evaluation output
+        pass
+
+
+class MetricsServer:
+    """Serves a MetricsRegistry on http://host:port/metrics from a daemon thread"""
+
+    def __init__(self, registry, host="127.0.0.1", port=9100):
+        """
+        Args:
+            registry: MetricsRegistry to expose
+            host: Interface to bind (localhost by default)
+            port: TCP port; 0 picks a free port
+        """
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="metrics-server", daemon=True
+        )
+        self._thread.start()
+        print(f"📡 Metrics available at {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
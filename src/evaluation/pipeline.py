@@ -0,0 +1,175 @@
+"""
+Evaluation Pipeline - Overlap Prompt Building, Inference and Parsing
+=====================================================================
+
+The serial loop leaves the model idle while Python builds prompts and
+tokenizes them, and leaves the CPU idle while the model generates. The
+pipeline splits evaluation of one student into three stages connected by
+bounded queues:
+
+    prepare (thread pool)   get_prompt(s) + tokenization, a few batches ahead
+    inference (caller)      one generate call per batch, in order
+    parse (one thread)      parse_output(s) and prediction records
+
+Fast tokenizers and torch release the GIL, so the stages run concurrently.
+How busy each stage was is printed at the end: the stage close to 100% is
+the bottleneck.
+
+A fast tokenizer is not safe to share between threads (it switches its
+padding/truncation state per call), so each prepare thread and the parse
+thread tokenize with their own copy; the model's thread keeps the
+original. Student code (get_prompt(s), parse_output(s)) runs on the
+prepare and parse threads but never two calls at once, so submissions need
+not be thread-safe.
+
+Example:
+    python src/evaluation/evaluator.py --mode all --pipeline-workers 2
+"""
+
+import copy
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _StageClock:
+    """Accumulates busy time per stage across threads"""
+
+    def __init__(self, stages):
+        self.busy = dict.fromkeys(stages, 0.0)
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.busy[stage] += seconds
+
+
+def evaluate_pipelined(evaluator, student_module, student_name, prompts=None,
+                       workers=2, max_pending=4):
+    """
+    Evaluate one student with prompt building, inference and parsing overlapped.
+
+    Args:
+        evaluator: PromptEvaluator with test data and a loaded model (or backend)
+        student_module: Imported student module
+        student_name: Student's name
+        prompts: Prompts already built for every test example (optional)
+        workers: Threads building and tokenizing prompts
+        max_pending: Batches allowed to wait between two stages
+
+    Returns:
+        StudentResult: Evaluation results (as evaluate_student_prompt)
+    """
+    test_data = evaluator.test_data
+    batch_size = evaluator.batch_size
+    # Pre-tokenized inputs are only used by a direct call to the local model
+    tokenize = evaluator.tokenizes_ahead()
+    clock = _StageClock(["prepare", "inference", "parse"])
+    result = evaluator.new_result(student_name)
+
+    # One tokenizer copy per prepare thread, and one for the parse thread
+    # when it counts output tokens; copied here, before the threads start
+    tokenizers = queue.SimpleQueue()
+    if tokenize:
+        for _ in range(workers):
+            tokenizers.put(copy.deepcopy(evaluator.tokenizer))
+    parse_tokenizer = None
+    if result.outputs is not None and evaluator.tokenizer is not None:
+        parse_tokenizer = copy.deepcopy(evaluator.tokenizer)
+
+    # Student code runs one call at a time
+    student_lock = threading.Lock()
+
+    def prepare(batch_start):
+        start_time = time.perf_counter()
+        batch = test_data[batch_start:batch_start + batch_size]
+        if prompts is not None:
+            batch_prompts = prompts[batch_start:batch_start + batch_size]
+        else:
+            with student_lock:
+                batch_prompts = evaluator.build_prompts(student_module, batch)
+        inputs = None
+        if tokenize:
+            tokenizer = tokenizers.get()
+            try:
+                inputs = evaluator.tokenize_batch(batch_prompts, tokenizer)
+            finally:
+                tokenizers.put(tokenizer)
+        clock.add("prepare", time.perf_counter() - start_time)
+        return batch_start, batch, batch_prompts, inputs
+
+    errors = []
+    parse_queue = queue.Queue(maxsize=max_pending)
+
+    def parse_worker():
+        while True:
+            item = parse_queue.get()
+            if item is None:
+                return
+            if errors:
+                # Keep draining so the inference stage never blocks
+                continue
+            batch_start, batch, batch_prompts, inputs, outputs, inference_time = item
+            start_time = time.perf_counter()
+            try:
+                # Input token counts come from the prepared inputs
+                with student_lock:
+                    records = evaluator.parse_batch(student_module, batch, outputs, inference_time,
+                                                    student_name, batch_prompts, inputs)
+                result.add_records(records, parse_tokenizer)
+            except Exception as e:
+                errors.append(e)
+            clock.add("parse", time.perf_counter() - start_time)
+
+            done = batch_start + len(batch)
+            if done % 10 < len(batch):
+                print(f"   Progress: {done}/{len(test_data)} examples processed")
+
+    parser = threading.Thread(target=parse_worker, name="parse", daemon=True)
+    parser.start()
+    wall_start = time.perf_counter()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prepare") as pool:
+            batch_starts = iter(range(0, len(test_data), batch_size))
+            prepared = deque(pool.submit(prepare, batch_start)
+                             for _, batch_start in zip(range(max_pending), batch_starts))
+
+            while prepared:
+                batch_start, batch, batch_prompts, inputs = prepared.popleft().result()
+                next_start = next(batch_starts, None)
+                if next_start is not None:
+                    prepared.append(pool.submit(prepare, next_start))
+
+                with evaluator.phase("batch", student=student_name, start=batch_start,
+                                     size=len(batch)):
+                    start_time = time.time()
+                    outputs = evaluator.infer_batch(student_module, batch_prompts,
+                                                    student_name, inputs)
+                    elapsed = time.time() - start_time
+                clock.add("inference", elapsed)
+
+                # Blocks when parsing falls behind (bounded queue)
+                parse_queue.put((batch_start, batch, batch_prompts, inputs, outputs,
+                                 elapsed / len(batch)))
+
+                if evaluator.monitor is not None and evaluator.inference_queue is None:
+                    evaluator.monitor.queue_depth.set(len(test_data) - batch_start - len(batch))
+    finally:
+        parse_queue.put(None)
+        parser.join()
+
+    if errors:
+        raise errors[0]
+
+    wall_time = time.perf_counter() - wall_start
+    if wall_time > 0:
+        print(f"\n⚙️  Pipeline utilization over {wall_time:.1f}s: "
+              f"prepare {clock.busy['prepare'] / (wall_time * workers):.0%} ({workers} workers), "
+              f"inference {clock.busy['inference'] / wall_time:.0%}, "
+              f"parse {clock.busy['parse'] / wall_time:.0%}")
+
+    # One parse thread handles batches in order, so records are in test order
+    return evaluator.summarize_result(result)
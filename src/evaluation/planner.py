@@ -0,0 +1,304 @@
+"""
+Run Planner - Predict Evaluation Time and Pick Batch Size / Workers
+====================================================================
+
+Combines the preflight token counts of every submission with a throughput
+profile of this machine: short micro-benchmarks of full generation at
+several sequence lengths and batch sizes. From
+these the planner predicts how long the run will take for each candidate
+batch size, picks the fastest, sets the number of prompt-building
+pipeline workers, and at the end of the run prints predicted vs actual
+time.
+
+The profile is cached per model and machine in results/benchmarks/.
+
+Example:
+    python src/evaluation/evaluator.py --mode all --plan
+"""
+
+import json
+import math
+import os
+import platform
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.evaluation.config import MAX_INPUT_TOKENS
+
+PROFILE_SEQ_LENGTHS = (32, 128, 256, 512)
+PROFILE_BATCH_SIZES = (1, 4, 8, 16)
+PROFILE_DIR = "./results/benchmarks"
+
+
+def _best_time(func, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def measure_throughput_profile(evaluator, seq_lengths=PROFILE_SEQ_LENGTHS,
+                               batch_sizes=PROFILE_BATCH_SIZES, max_new_tokens=10, repeats=2):
+    """
+    Time the loaded model on synthetic batches.
+
+    Args:
+        evaluator: PromptEvaluator with a loaded local model
+        seq_lengths: Input lengths (tokens) to measure
+        batch_sizes: Batch sizes to measure
+        max_new_tokens: Tokens generated, as in evaluation
+        repeats: Best of this many runs per point
+
+    Returns:
+        dict: Model, machine and one point per (batch_size, seq_len) with
+            total_seconds (one generate call)
+    """
+    import torch
+
+    tokenizer = evaluator.tokenizer
+
+    def inputs_for(seq_len, batch_size):
+        text = " ".join(["movie"] * seq_len)
+        return tokenizer([text] * batch_size, return_tensors="pt", truncation=True,
+                         max_length=seq_len)
+
+    points = []
+    with torch.no_grad():
+        # Warm-up: first calls pay for lazy initialisation
+        evaluator._generate(["warm up"], max_new_tokens)
+
+        for batch_size in batch_sizes:
+            for seq_len in seq_lengths:
+                inputs = inputs_for(seq_len, batch_size)
+                prompts = [""] * batch_size
+                points.append({
+                    'batch_size': batch_size,
+                    'seq_len': seq_len,
+                    'total_seconds': _best_time(
+                        lambda: evaluator._generate(prompts, max_new_tokens, inputs),
+                        repeats
+                    ),
+                })
+                print(f"   batch {batch_size:3d} x {seq_len:4d} tokens: "
+                      f"{points[-1]['total_seconds']:.3f}s")
+
+    return {
+        'model': evaluator.model_name,
+        'machine': platform.node(),
+        'cpu_count': os.cpu_count(),
+        'max_new_tokens': max_new_tokens,
+        'measured_at': datetime.now().isoformat(timespec='seconds'),
+        'points': points,
+    }
+
+
+def load_or_measure_profile(evaluator, profile_dir=PROFILE_DIR, refresh=False):
+    """
+    Return the cached profile for this model and machine, measuring it if needed.
+
+    Args:
+        evaluator: PromptEvaluator with a loaded local model
+        profile_dir: Where profiles are cached
+        refresh: Measure again even if a cached profile exists
+
+    Returns:
+        dict: Throughput profile (see measure_throughput_profile)
+    """
+    slug = f"{evaluator.model_name}_{platform.node()}".replace("/", "_")
+    profile_file = Path(profile_dir) / f"throughput_{slug}.json"
+
+    if profile_file.exists() and not refresh:
+        with open(profile_file) as f:
+            return json.load(f)
+
+    print(f"\n⏱️  Measuring throughput profile for {evaluator.model_name}...")
+    profile = measure_throughput_profile(evaluator)
+    profile_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(profile_file, 'w') as f:
+        json.dump(profile, f, indent=2)
+    print(f"✅ Profile saved to: {profile_file}")
+    return profile
+
+
+def _fit_line(xs, ys):
+    """Least-squares y = a + b * x."""
+    n = len(xs)
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x if var_x else 0.0
+    return mean_y - slope * mean_x, slope
+
+
+def batch_cost_models(profile):
+    """
+    Fit batch time as a linear function of padded length, per batch size.
+
+    Returns:
+        dict: batch_size -> (seconds, seconds per token)
+    """
+    models = {}
+    for batch_size in sorted({point['batch_size'] for point in profile['points']}):
+        points = [point for point in profile['points'] if point['batch_size'] == batch_size]
+        models[batch_size] = _fit_line([point['seq_len'] for point in points],
+                                       [point['total_seconds'] for point in points])
+    return models
+
+
+def cost_model_for(cost_models, batch_size):
+    """
+    Cost model of a batch size, scaled from the nearest measured one if it
+    was not profiled (batch time taken as proportional to batch size).
+
+    Returns:
+        tuple: (seconds, seconds per token)
+    """
+    if batch_size in cost_models:
+        return cost_models[batch_size]
+    nearest = min(cost_models, key=lambda measured: abs(measured - batch_size))
+    scale = batch_size / nearest
+    intercept, per_token = cost_models[nearest]
+    return intercept * scale, per_token * scale
+
+
+def predict_seconds(lengths, batch_size, cost_model):
+    """
+    Predict inference time for prompts run in order, batch_size at a time.
+
+    Each batch is padded to its longest prompt (truncated at MAX_INPUT_TOKENS).
+
+    Args:
+        lengths: Token count of each prompt, in evaluation order
+        batch_size: Prompts per batch
+        cost_model: (seconds, seconds per token) for this batch size
+
+    Returns:
+        float: Predicted seconds
+    """
+    intercept, per_token = cost_model
+    total = 0.0
+    for batch_start in range(0, len(lengths), batch_size):
+        padded = min(max(lengths[batch_start:batch_start + batch_size]), MAX_INPUT_TOKENS)
+        total += max(0.0, intercept + per_token * padded)
+    return total
+
+
+def plan_evaluation(evaluator, reports, profile=None, max_workers=None, batch_size=None,
+                    pipeline_workers=None, dedup=False):
+    """
+    Choose batch size and pipeline workers and predict the run time.
+
+    The chosen settings are applied to the evaluator. Settings the user
+    chose explicitly are passed in and kept; only the others are planned.
+
+    Args:
+        evaluator: PromptEvaluator with a loaded local model
+        reports: student -> preflight report (with 'lengths', 'build_seconds'
+            and 'tokenize_seconds')
+        profile: Throughput profile (default: cached or measured now)
+        max_workers: Most pipeline workers to use (default: half the CPUs)
+        batch_size: Batch size chosen by the user (None = plan it)
+        pipeline_workers: Pipeline workers chosen by the user (None = plan it)
+        dedup: The run uses the dedup scheduler, which builds all prompts
+            up front and does not use pipeline workers
+
+    Returns:
+        dict: batch_size, pipeline_workers, predicted_seconds and
+            predicted seconds per student
+    """
+    profile = profile or load_or_measure_profile(evaluator)
+    cost_models = batch_cost_models(profile)
+
+    # Fastest measured batch size over all submissions
+    totals = {
+        batch_size: sum(predict_seconds(report['lengths'], batch_size, cost_model)
+                        for report in reports.values())
+        for batch_size, cost_model in cost_models.items()
+    }
+    batch_size_kept = batch_size is not None
+    if batch_size_kept:
+        totals.setdefault(batch_size, sum(
+            predict_seconds(report['lengths'], batch_size, cost_model_for(cost_models, batch_size))
+            for report in reports.values()
+        ))
+    else:
+        batch_size = min(totals, key=totals.get)
+    per_student = {
+        student_name: predict_seconds(report['lengths'], batch_size,
+                                      cost_model_for(cost_models, batch_size))
+        for student_name, report in reports.items()
+    }
+    inference_seconds = totals[batch_size]
+
+    # Pipeline workers: enough to build and tokenize prompts as fast as
+    # the model consumes them, none if that work is negligible
+    prepare_seconds = sum(report['build_seconds'] + report['tokenize_seconds']
+                          for report in reports.values())
+    max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+    workers_kept = pipeline_workers is not None
+    if dedup:
+        workers = 0
+    elif workers_kept:
+        workers = pipeline_workers
+    elif inference_seconds == 0 or prepare_seconds < 0.02 * inference_seconds:
+        workers = 0
+    else:
+        workers = min(max_workers, max(1, math.ceil(prepare_seconds / inference_seconds)))
+
+    # Without a pipeline, preparing prompts adds to the run time
+    predicted_seconds = inference_seconds + (0.0 if workers else prepare_seconds)
+
+    evaluator.batch_size = batch_size
+    evaluator.pipeline_workers = workers
+
+    print("\n" + "=" * 70)
+    print("RUN PLAN")
+    print("=" * 70)
+    for candidate, seconds in sorted(totals.items()):
+        marker = ""
+        if candidate == batch_size:
+            marker = "  <- kept (--batch-size)" if batch_size_kept else "  <- chosen"
+        print(f"   batch size {candidate:3d}: {seconds / 60:7.1f} min predicted{marker}")
+    if dedup:
+        print(f"   pipeline workers: not used with --dedup "
+              f"(prompt building + tokenization: {prepare_seconds:.1f}s)")
+        print("   (predictions assume every prompt runs; duplicates are found later)")
+    else:
+        print(f"   pipeline workers: {workers}{' (kept, --pipeline-workers)' if workers_kept else ''} "
+              f"(prompt building + tokenization: {prepare_seconds:.1f}s)")
+    print(f"   predicted total: {predicted_seconds / 60:.1f} min for {len(reports)} submissions")
+    print("=" * 70)
+
+    return {
+        'batch_size': batch_size,
+        'pipeline_workers': workers,
+        'predicted_seconds': predicted_seconds,
+        'students': per_student,
+    }
+
+
+def print_plan_accuracy(plan, actual_seconds, total_seconds):
+    """
+    Print predicted vs actual time per student and for the whole run.
+
+    Args:
+        plan: Result of plan_evaluation
+        actual_seconds: student -> measured evaluation seconds (empty when
+            students shared batches, e.g. with --dedup)
+        total_seconds: Measured seconds for the whole run
+    """
+    print("\n" + "=" * 70)
+    print("PREDICTED VS ACTUAL TIME")
+    print("=" * 70)
+    if not actual_seconds:
+        print("   Per-student times are not available with --dedup (students share batches)")
+    for student_name, actual in actual_seconds.items():
+        predicted = plan['students'].get(student_name)
+        if predicted:
+            print(f"   {student_name:25s} predicted {predicted:8.1f}s   actual {actual:8.1f}s   "
+                  f"({actual / predicted - 1:+.0%})")
+    print(f"   {'Total':25s} predicted {plan['predicted_seconds']:8.1f}s   "
+          f"actual {total_seconds:8.1f}s")
+    print("=" * 70)
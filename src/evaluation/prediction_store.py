@@ -0,0 +1,269 @@
+"""
+Prediction Store - Per-Example Results in a Compact Columnar File
+==================================================================
+
+save_results only keeps aggregate metrics, so questions like "which
+reviews does everybody get wrong?" used to need a new inference run. The
+store keeps one row per (student, example) with the raw output, the
+prediction, latency and token counts, as typed NumPy columns plus a table
+of distinct output strings, written with np.savez_compressed.
+
+The query helpers work on whole columns, so they take milliseconds even
+for hundreds of students x 1000 examples.
+
+Example:
+    from src.evaluation.prediction_store import load_predictions
+
+    table = load_predictions("results/predictions/predictions_20250101_120000.npz")
+    table.accuracy_by_student()
+    table.hardest_examples(10)
+    table.disagreements("Alice Example", "Bob")
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+
+# Column name -> dtype
+COLUMNS = {
+    'student': np.uint16,        # index into student_names
+    'example_id': np.uint32,     # index of the example in the test set
+    'label': np.uint8,           # 1 = Positive, 0 = Negative
+    'prediction': np.uint8,
+    'latency': np.float32,       # inference seconds per example
+    'input_tokens': np.uint16,
+    'output_tokens': np.uint16,
+    'output': np.uint32,         # index into output_table
+}
+
+
+class PredictionStore:
+    """Collects per-example records during a run and writes them to disk"""
+
+    def __init__(self, split="test"):
+        """
+        Args:
+            split: Data set the example ids refer to ("test" for the
+                competition split, "sample" for the sample data)
+        """
+        self.split = split
+        self.student_names = []
+        self._output_ids = {}  # distinct raw output -> index in output_table
+        self.output_table = []
+        self._chunks = []  # one dict of column arrays per add_result()
+
+    def add_result(self, result, example_ids=None):
+        """
+        Append a StudentResult; its typed arrays are stored as they are.
+
+        Args:
+            result: StudentResult kept with keep_outputs=True
+            example_ids: Index of each example in the test set
+                (default: 0..n-1, the test set order)
+        """
+        student_name = result.student_name
+        if student_name not in self.student_names:
+            self.student_names.append(student_name)
+
+        n = result.count
+        output_codes = np.empty(n, dtype=COLUMNS['output'])
+        for i, output in enumerate(result.outputs[:n]):
+            code = self._output_ids.get(output)
+            if code is None:
+                code = self._output_ids[output] = len(self.output_table)
+                self.output_table.append(output)
+            output_codes[i] = code
+
+        if example_ids is None:
+            example_ids = np.arange(n, dtype=COLUMNS['example_id'])
+        self._chunks.append({
+            'student': np.full(n, self.student_names.index(student_name), dtype=COLUMNS['student']),
+            'example_id': np.asarray(example_ids, dtype=COLUMNS['example_id']),
+            'label': result.labels[:n],
+            'prediction': result.predictions[:n],
+            'latency': result.latencies[:n],
+            'input_tokens': result.input_tokens[:n],
+            'output_tokens': result.output_tokens[:n],
+            'output': output_codes,
+        })
+
+    def __len__(self):
+        return sum(len(chunk['student']) for chunk in self._chunks)
+
+    def columns(self):
+        """Concatenate everything added so far into one array per column."""
+        return {
+            name: np.concatenate([chunk[name] for chunk in self._chunks]) if self._chunks
+            else np.zeros(0, dtype=dtype)
+            for name, dtype in COLUMNS.items()
+        }
+
+    def save(self, path):
+        """
+        Write the store as a compressed .npz file.
+
+        Args:
+            path: Output file
+
+        Returns:
+            Path: The written file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            split=np.array(self.split),
+            student_names=np.array(self.student_names, dtype=str),
+            output_table=np.array(self.output_table, dtype=str),
+            **self.columns()
+        )
+        return path
+
+
+class PredictionTable:
+    """Loaded prediction store with vectorized query helpers"""
+
+    def __init__(self, columns, student_names, output_table, split="test"):
+        self.columns = columns
+        self.split = split
+        self.student_names = [str(name) for name in student_names]
+        self.output_table = output_table
+        self.correct = columns['prediction'] == columns['label']
+
+    def __len__(self):
+        return len(self.columns['student'])
+
+    def _student_code(self, student_name):
+        return self.student_names.index(student_name)
+
+    def rows_for(self, student_name):
+        """Boolean mask of one student's rows."""
+        return self.columns['student'] == self._student_code(student_name)
+
+    def accuracy_by_student(self):
+        """
+        Returns:
+            dict: student -> accuracy, best first
+        """
+        students = self.columns['student']
+        totals = np.bincount(students, minlength=len(self.student_names))
+        correct = np.bincount(students, weights=self.correct, minlength=len(self.student_names))
+        accuracy = np.divide(correct, totals, out=np.zeros(len(totals)), where=totals > 0)
+        order = np.argsort(-accuracy)
+        return {self.student_names[i]: float(accuracy[i]) for i in order}
+
+    def example_accuracy(self):
+        """
+        Returns:
+            np.ndarray: Share of students answering each example correctly
+                (indexed by example_id; NaN for examples nobody ran)
+        """
+        example_ids = self.columns['example_id']
+        size = int(example_ids.max()) + 1 if len(example_ids) else 0
+        totals = np.bincount(example_ids, minlength=size)
+        correct = np.bincount(example_ids, weights=self.correct, minlength=size)
+        return np.divide(correct, totals, out=np.full(size, np.nan), where=totals > 0)
+
+    def hardest_examples(self, n=10):
+        """
+        Examples most students get wrong.
+
+        Returns:
+            list: (example_id, share of students correct), hardest first
+        """
+        accuracy = self.example_accuracy()
+        order = np.argsort(np.where(np.isnan(accuracy), np.inf, accuracy))[:n]
+        return [(int(i), float(accuracy[i])) for i in order if not np.isnan(accuracy[i])]
+
+    def wrong_by_everyone(self):
+        """
+        Returns:
+            np.ndarray: example_ids no student classified correctly
+        """
+        accuracy = self.example_accuracy()
+        return np.flatnonzero(accuracy == 0)
+
+    def disagreements(self, student_a, student_b):
+        """
+        Examples where two students predict different labels.
+
+        Returns:
+            np.ndarray: example_ids
+        """
+        size = len(self.example_accuracy())
+        predictions = []
+        for student_name in (student_a, student_b):
+            rows = self.rows_for(student_name)
+            by_example = np.full(size, -1, dtype=np.int16)
+            by_example[self.columns['example_id'][rows]] = self.columns['prediction'][rows]
+            predictions.append(by_example)
+        a, b = predictions
+        return np.flatnonzero((a != b) & (a >= 0) & (b >= 0))
+
+    def outputs_for(self, example_id):
+        """
+        Returns:
+            dict: student -> raw output for one example
+        """
+        rows = np.flatnonzero(self.columns['example_id'] == example_id)
+        return {
+            self.student_names[self.columns['student'][i]]: str(self.output_table[self.columns['output'][i]])
+            for i in rows
+        }
+
+    def top_outputs(self, student_name=None, n=10):
+        """
+        Most frequent raw outputs (overall or for one student).
+
+        Returns:
+            list: (output, count), most frequent first
+        """
+        codes = self.columns['output']
+        if student_name is not None:
+            codes = codes[self.rows_for(student_name)]
+        counts = np.bincount(codes, minlength=len(self.output_table))
+        order = np.argsort(-counts)[:n]
+        return [(str(self.output_table[i]), int(counts[i])) for i in order if counts[i]]
+
+    def latency_by_student(self):
+        """
+        Returns:
+            dict: student -> (mean, p95) inference seconds per example
+        """
+        # Group rows by student once instead of masking once per student
+        order = np.argsort(self.columns['student'], kind='stable')
+        students = self.columns['student'][order]
+        starts = np.flatnonzero(np.diff(students)) + 1
+        latency = {}
+        for first, values in zip(np.r_[0, starts], np.split(self.columns['latency'][order], starts)):
+            if len(values):
+                latency[self.student_names[students[first]]] = (
+                    float(values.mean()), float(np.percentile(values, 95))
+                )
+        return latency
+
+    def to_dataframe(self):
+        """All rows as a pandas DataFrame with names and outputs decoded."""
+        import pandas as pd
+
+        frame = pd.DataFrame(self.columns)
+        frame['student'] = np.asarray(self.student_names, dtype=object)[frame['student']]
+        frame['output'] = self.output_table[frame['output']]
+        return frame
+
+
+def load_predictions(path):
+    """
+    Load a prediction store written by PredictionStore.save.
+
+    Args:
+        path: .npz file
+
+    Returns:
+        PredictionTable: Columns with query helpers
+    """
+    with np.load(path) as data:
+        columns = {name: data[name] for name in COLUMNS}
+        split = str(data['split']) if 'split' in data.files else "test"
+        return PredictionTable(columns, data['student_names'], data['output_table'], split)
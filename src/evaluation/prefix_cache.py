@@ -0,0 +1,231 @@
+"""
+Shared-Prefix KV Cache - Cheap Few-Shot Prompts on Decoder-Only Models
+=======================================================================
+
+Few-shot submissions put the same long instruction-plus-examples block in
+front of every review. For decoder-only (causal) models the attention keys
+and values of that block never change, so they are computed once per
+student and reused: the cache is expanded to the batch and the reviews'
+suffixes run through the model together, in one generate call per batch.
+
+It pays off when the prefix is long compared to the review (few-shot
+prompts with several examples): each prompt then skips most of its
+tokens. Prefixes under min_prefix_tokens are not cached, because copying
+the cache for each batch costs about as much as running them again.
+Compare with and without --prefix-cache on a few submissions
+(`--mode sample`) before relying on it.
+
+Encoder-decoder models (FLAN-T5) encode the whole prompt bidirectionally,
+so the prefix cannot be reused there and this module does not apply.
+"""
+
+import copy
+import os
+import weakref
+from collections import OrderedDict
+
+# Two reviews that share nothing, used to find the part of a prompt that
+# does not depend on the review
+_PROBE_REVIEWS = (
+    "① first probe review ①",
+    "② a different second probe ②",
+)
+
+
+def detect_static_prefix(get_prompt):
+    """
+    Find the part of a student's prompt that is the same for every review.
+
+    The common prefix of two probe prompts is cut back to the last line
+    break (or space) so the prefix/suffix split usually falls on a token
+    boundary (generation checks that it does for each prompt).
+
+    Args:
+        get_prompt: The student's get_prompt function
+
+    Returns:
+        str: The static prefix ("" if the prompt starts with the review)
+    """
+    try:
+        first, second = (get_prompt(review) for review in _PROBE_REVIEWS)
+    except Exception:
+        # Prompt functions that choke on unusual text just don't get a prefix
+        return ""
+
+    common = os.path.commonprefix([first, second])
+    cut = common.rfind("\n")
+    if cut < 0:
+        cut = common.rfind(" ")
+    return common[:cut + 1] if cut >= 0 else ""
+
+
+class PrefixKVCache:
+    """Computes and reuses the key/value cache of static prompt prefixes"""
+
+    def __init__(self, model, tokenizer, max_input_tokens=512, max_prefixes=8,
+                 min_prefix_tokens=16):
+        """
+        Args:
+            model: Decoder-only HuggingFace model
+            tokenizer: Its tokenizer
+            max_input_tokens: Prompts longer than this take the normal
+                (truncating) path, as do prompts whose tokens do not start
+                with the prefix's tokens, so the model sees the same ids as
+                in the uncached evaluator
+            max_prefixes: Number of prefix caches kept (least recently used
+                are dropped)
+            min_prefix_tokens: Shorter prefixes are not worth caching
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_input_tokens = max_input_tokens
+        self.max_prefixes = max_prefixes
+        self.min_prefix_tokens = min_prefix_tokens
+
+        self._prefixes = weakref.WeakKeyDictionary()  # get_prompt -> prefix
+        self._caches = OrderedDict()  # prefix -> (prefix_ids, past_key_values)
+
+        self.hits = 0
+        self.fallbacks = 0
+        self.prefix_tokens_saved = 0
+
+    def prefix_for(self, get_prompt):
+        """Return (and remember) the static prefix of a prompt function."""
+        try:
+            return self._prefixes[get_prompt]
+        except (KeyError, TypeError):
+            prefix = detect_static_prefix(get_prompt)
+            try:
+                self._prefixes[get_prompt] = prefix
+            except TypeError:
+                pass
+            return prefix
+
+    def _cache_for(self, prefix):
+        """Run the prefix through the model once and keep its KV cache."""
+        import torch
+        from transformers import DynamicCache
+
+        if prefix in self._caches:
+            self._caches.move_to_end(prefix)
+            return self._caches[prefix]
+
+        prefix_ids = self.tokenizer(prefix, return_tensors="pt").input_ids
+        if prefix_ids.shape[1] < self.min_prefix_tokens:
+            entry = (prefix_ids, None)
+        else:
+            with torch.no_grad():
+                past_key_values = self.model(
+                    input_ids=prefix_ids, past_key_values=DynamicCache(), use_cache=True
+                ).past_key_values
+            entry = (prefix_ids, past_key_values)
+
+        self._caches[prefix] = entry
+        if len(self._caches) > self.max_prefixes:
+            self._caches.popitem(last=False)
+        return entry
+
+    def _generate_cached(self, prompts, prefix, max_new_tokens):
+        """
+        Generate, as one batch, for the prompts that can reuse the prefix cache.
+
+        Args:
+            prompts: Prompts starting with the prefix
+            prefix: Their static prefix
+            max_new_tokens: Max tokens to generate
+
+        Returns:
+            dict: Position in prompts -> output, for the prompts that used
+                the cache (the others are left out)
+        """
+        import torch
+
+        prefix_ids, past_key_values = self._cache_for(prefix)
+        if past_key_values is None:
+            return {}
+
+        # Tokenize whole prompts, as the uncached path does: BPE and
+        # SentencePiece can merge across the prefix/review boundary, and then
+        # the cached prefix is not what the model would have seen
+        prefix_list = prefix_ids[0].tolist()
+        prefix_length = len(prefix_list)
+        suffixes = {}
+        for i, ids in enumerate(self.tokenizer(list(prompts))['input_ids']):
+            if prefix_length < len(ids) <= self.max_input_tokens and ids[:prefix_length] == prefix_list:
+                suffixes[i] = ids[prefix_length:]
+        if not suffixes:
+            return {}
+
+        # Suffixes are left-padded so each ends right before the generated
+        # tokens; the padding between prefix and suffix is masked out
+        rows = len(suffixes)
+        width = max(len(ids) for ids in suffixes.values())
+        pad_token_id = self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None else 0
+        suffix_ids = torch.full((rows, width), pad_token_id, dtype=prefix_ids.dtype)
+        suffix_mask = torch.zeros((rows, width), dtype=torch.long)
+        for row, ids in enumerate(suffixes.values()):
+            suffix_ids[row, width - len(ids):] = torch.tensor(ids, dtype=prefix_ids.dtype)
+            suffix_mask[row, width - len(ids):] = 1
+        input_ids = torch.cat([prefix_ids.expand(rows, -1), suffix_ids], dim=-1)
+        attention_mask = torch.cat([torch.ones((rows, prefix_length), dtype=torch.long),
+                                    suffix_mask], dim=-1)
+
+        # generate() extends the cache in place, so work on a copy with one
+        # row per prompt
+        batch_cache = copy.deepcopy(past_key_values)
+        batch_cache.batch_repeat_interleave(rows)
+
+        with torch.no_grad():
+            outputs = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                past_key_values=batch_cache,
+                max_new_tokens=max_new_tokens,
+                num_beams=1,
+                do_sample=False,
+                pad_token_id=pad_token_id,
+            )
+
+        self.hits += rows
+        self.prefix_tokens_saved += rows * prefix_length
+        texts = self.tokenizer.batch_decode(outputs[:, input_ids.shape[1]:], skip_special_tokens=True)
+        return dict(zip(suffixes, texts))
+
+    def generate_batch(self, prompts, get_prompt, fallback, max_new_tokens=10):
+        """
+        Generate outputs, processing only the review suffix where possible.
+
+        Args:
+            prompts: Complete prompt strings built by get_prompt
+            get_prompt: The student's prompt function (used to find the prefix)
+            fallback: Function (prompts, max_length) -> outputs for prompts
+                that cannot use the cache
+            max_new_tokens: Max tokens to generate
+
+        Returns:
+            list: Model output for each prompt
+        """
+        prefix = self.prefix_for(get_prompt)
+        outputs = [None] * len(prompts)
+
+        if prefix:
+            candidates = [i for i, prompt in enumerate(prompts) if prompt.startswith(prefix)]
+            cached = self._generate_cached([prompts[i] for i in candidates], prefix, max_new_tokens)
+            for position, output in cached.items():
+                outputs[candidates[position]] = output
+
+        missing = [i for i, output in enumerate(outputs) if output is None]
+        if missing:
+            self.fallbacks += len(missing)
+            for i, output in zip(missing, fallback([prompts[i] for i in missing], max_new_tokens)):
+                outputs[i] = output
+
+        return outputs
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'fallbacks': self.fallbacks,
+            'prefix_tokens_saved': self.prefix_tokens_saved,
+            'cached_prefixes': len(self._caches),
+        }
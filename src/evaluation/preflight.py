@@ -0,0 +1,234 @@
+"""
+Preflight - Check Prompt Token Budgets Before Spending Model Time
+==================================================================
+
+The rules allow prompts of up to 1000 tokens, but the evaluator truncates
+inputs at MAX_INPUT_TOKENS (512), so a long few-shot prompt can lose the
+review it was meant to classify without anyone noticing. Preflight builds
+every student's prompts for the test set and measures them with the
+tokenizer only (no model is loaded):
+
+- token length distribution (mean, p50, p90, p99, max)
+- template tokens: what the student's prompt adds around the review
+  (prompt tokens minus review tokens, largest over the test set)
+- share of reviews that would fit on their own but are truncated because
+  of the template
+- share of prompts truncated at all, for information (some IMDb reviews
+  are longer than 512 or even 1000 tokens whatever the prompt)
+- estimated inference time
+
+Submissions are judged on their template only: templates over the rules'
+limit are flagged, or with policy "reject" not evaluated at all, and
+templates that push more than TEMPLATE_TRUNCATION_FLAG_RATE of the reviews
+past the evaluator's limit are flagged.
+
+Example:
+    python src/evaluation/evaluator.py --mode preflight
+    python src/evaluation/evaluator.py --mode all --preflight reject
+"""
+
+import time
+
+from src.evaluation.config import MAX_INPUT_TOKENS
+
+# Prompt length limit stated in docs/COMPETITION_RULES.md
+RULES_MAX_TOKENS = 1000
+
+# Flag templates that get this share of otherwise fitting reviews truncated
+TEMPLATE_TRUNCATION_FLAG_RATE = 0.05
+
+# Rough CPU cost of flan-t5-base per example and per input token, used
+# when no measured throughput profile is given
+DEFAULT_COST_MODEL = {'per_example': 0.05, 'per_token': 0.0004}
+
+
+def load_tokenizer(model_name):
+    """
+    Load only the tokenizer of a model.
+
+    Args:
+        model_name: HuggingFace model name or local path
+
+    Returns:
+        Tokenizer, or None if it cannot be loaded (e.g. a remote-only model)
+    """
+    try:
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(model_name)
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def token_lengths(tokenizer, prompts):
+    """
+    Untruncated token count of each prompt.
+
+    Args:
+        tokenizer: HuggingFace tokenizer, or None to estimate from characters
+            (about 4 characters per token for English text)
+        prompts: List of prompt strings
+
+    Returns:
+        list: Token count per prompt
+    """
+    if tokenizer is None:
+        return [max(1, len(prompt) // 4) for prompt in prompts]
+    return [len(ids) for ids in tokenizer(prompts)['input_ids']]
+
+
+def _percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def estimate_seconds(lengths, cost_model=None, max_input_tokens=MAX_INPUT_TOKENS):
+    """
+    Estimate inference time for prompts of the given lengths.
+
+    Args:
+        lengths: Token count per prompt
+        cost_model: Dict with 'per_example' and 'per_token' seconds
+            (default: DEFAULT_COST_MODEL)
+        max_input_tokens: Longer prompts are truncated to this length
+
+    Returns:
+        float: Estimated seconds
+    """
+    cost_model = cost_model or DEFAULT_COST_MODEL
+    tokens = sum(min(length, max_input_tokens) for length in lengths)
+    return len(lengths) * cost_model['per_example'] + tokens * cost_model['per_token']
+
+
+def preflight_prompts(prompts, tokenizer, cost_model=None, max_input_tokens=MAX_INPUT_TOKENS,
+                      review_lengths=None):
+    """
+    Measure one student's prompts.
+
+    Args:
+        prompts: The student's prompt for each test example
+        tokenizer: HuggingFace tokenizer (None = estimate from characters)
+        cost_model: Cost model for estimate_seconds
+        max_input_tokens: Evaluator truncation length
+        review_lengths: Token count of each review on its own, to separate
+            the template from the review (None = count whole prompts)
+
+    Returns:
+        dict: Length distribution, template tokens, truncation rates,
+            estimated seconds and the token count of every prompt
+    """
+    lengths = token_lengths(tokenizer, prompts)
+    ordered = sorted(lengths)
+    if review_lengths is None:
+        review_lengths = [0] * len(lengths)
+    # Both counts include the end-of-sequence token, so it cancels out
+    template_lengths = [max(0, length - review) for length, review in zip(lengths, review_lengths)]
+    fits = [review <= max_input_tokens for review in review_lengths]
+    cut_by_template = sum(fit and length > max_input_tokens for fit, length in zip(fits, lengths))
+    return {
+        'examples': len(lengths),
+        'mean_tokens': sum(lengths) / len(lengths),
+        'p50_tokens': _percentile(ordered, 0.50),
+        'p90_tokens': _percentile(ordered, 0.90),
+        'p99_tokens': _percentile(ordered, 0.99),
+        'max_tokens': ordered[-1],
+        'template_tokens': max(template_lengths),
+        'template_truncated_rate': cut_by_template / max(1, sum(fits)),
+        'truncated_rate': sum(length > max_input_tokens for length in lengths) / len(lengths),
+        'estimated_seconds': estimate_seconds(lengths, cost_model, max_input_tokens),
+        'lengths': lengths,
+    }
+
+
+def run_preflight(evaluator, students, policy="flag", cost_model=None):
+    """
+    Preflight every submission and print a report.
+
+    Args:
+        evaluator: PromptEvaluator with test data loaded (no model needed)
+        students: List of (student_name, module) pairs
+        policy: "flag" to only warn, "reject" to mark submissions whose
+            template is over the rules' limit as rejected
+        cost_model: Cost model for estimate_seconds
+
+    Returns:
+        dict: student -> report (see preflight_prompts, plus the time spent
+            building and tokenizing prompts) with a 'status' of "ok", "flagged",
+            "rejected" or "error"
+    """
+    tokenizer = evaluator.tokenizer
+    if tokenizer is None:
+        tokenizer = load_tokenizer(evaluator.backend.model if evaluator.backend is not None
+                                   else evaluator.model_name)
+        if tokenizer is None:
+            print("⚠️  Tokenizer not available, estimating tokens from characters")
+
+    # Shared by every student: what the reviews cost without any template
+    review_lengths = token_lengths(tokenizer, [example['text'] for example in evaluator.test_data])
+
+    reports = {}
+    for student_name, module in students:
+        try:
+            with evaluator.phase("preflight", student=student_name):
+                start_time = time.time()
+                prompts = evaluator.build_prompts(module, evaluator.test_data)
+                build_seconds = time.time() - start_time
+                report = preflight_prompts(prompts, tokenizer, cost_model,
+                                           review_lengths=review_lengths)
+                report['build_seconds'] = build_seconds
+                report['tokenize_seconds'] = time.time() - start_time - build_seconds
+        except Exception as e:
+            print(f"\n❌ Preflight failed for {student_name}: {str(e)}")
+            reports[student_name] = {'status': 'error', 'error': str(e)}
+            continue
+
+        over_rules = report['template_tokens'] > RULES_MAX_TOKENS
+        if over_rules and policy == "reject":
+            report['status'] = "rejected"
+        elif over_rules or report['template_truncated_rate'] > TEMPLATE_TRUNCATION_FLAG_RATE:
+            report['status'] = "flagged"
+        else:
+            report['status'] = "ok"
+        reports[student_name] = report
+
+    print_preflight_report(reports)
+    return reports
+
+
+def print_preflight_report(reports):
+    """Print one line per student and the warnings."""
+    print("\n" + "=" * 100)
+    print(f"PREFLIGHT - prompt tokens (evaluator truncates at {MAX_INPUT_TOKENS}, "
+          f"rules allow {RULES_MAX_TOKENS})")
+    print("=" * 100)
+    print(f"{'Student':25s} {'mean':>6s} {'p50':>6s} {'p90':>6s} {'p99':>6s} {'max':>6s} "
+          f"{'>' + str(MAX_INPUT_TOKENS):>7s} {'tmpl':>6s} {'cut':>7s} {'est. s':>8s}  status")
+
+    total_seconds = 0.0
+    for student_name, report in reports.items():
+        if report['status'] == "error":
+            print(f"{student_name:25s} {'':66s}  error")
+            continue
+        total_seconds += report['estimated_seconds'] if report['status'] != "rejected" else 0.0
+        print(f"{student_name:25s} {report['mean_tokens']:6.0f} {report['p50_tokens']:6d} "
+              f"{report['p90_tokens']:6d} {report['p99_tokens']:6d} {report['max_tokens']:6d} "
+              f"{report['truncated_rate']:7.1%} {report['template_tokens']:6d} "
+              f"{report['template_truncated_rate']:7.1%} "
+              f"{report['estimated_seconds']:8.1f}  {report['status']}")
+    print("=" * 100)
+    print(f">{MAX_INPUT_TOKENS}: prompts truncated (for information, long reviews count too)")
+    print("tmpl: tokens added around the review; cut: reviews that fit alone but are "
+          "truncated with the template")
+    print(f"Estimated inference time for accepted submissions: {total_seconds / 60:.1f} min")
+
+    for student_name, report in reports.items():
+        if report['status'] == "rejected":
+            print(f"❌ {student_name}: rejected, the template alone uses {report['template_tokens']} "
+                  f"tokens (limit {RULES_MAX_TOKENS})")
+        elif report['status'] == "flagged":
+            if report['template_tokens'] > RULES_MAX_TOKENS:
+                print(f"⚠️  {student_name}: the template alone uses {report['template_tokens']} "
+                      f"tokens (limit {RULES_MAX_TOKENS})")
+            else:
+                print(f"⚠️  {student_name}: the {report['template_tokens']}-token template gets "
+                      f"{report['template_truncated_rate']:.1%} of reviews truncated at "
+                      f"{MAX_INPUT_TOKENS} tokens (the review may be cut off)")
@@ -0,0 +1,150 @@
+"""
+Fast Preview - Estimate the Full-Set Score from a Stratified Subset
+====================================================================
+
+The 50-review sample says little about the competition score, and the full
+1000-review run takes minutes of shared CPU. A preview runs a small subset
+of the competition split chosen so that every stratum is represented in
+proportion:
+
+- label (Positive / Negative)
+- review length (tercile)
+- difficulty (tercile, from the example difficulty index if one exists)
+
+and weights each stratum's accuracy by its share of the full split. That
+gives an estimate of the full-set accuracy with a 95% confidence interval
+(normal approximation with finite population correction).
+
+A preview smaller than the number of strata drops the difficulty strata,
+then the length strata, so every stratum gets at least one review. If
+some stratum still has no review, the weights are renormalised over the
+sampled strata and the output says how much of the full split they cover.
+
+Example:
+    python src/evaluation/evaluator.py --mode single --student alice_example --preview 100
+"""
+
+import math
+
+import numpy as np
+
+from src.evaluation.difficulty import DifficultyIndex, stratified_sample
+
+DEFAULT_PREVIEW_SIZE = 100
+Z_95 = 1.96
+
+
+def preview_strata(examples, index=None, length_bins=3, difficulty_bins=3):
+    """
+    Stratum of each example: label x length bin x difficulty bin.
+
+    Args:
+        examples: Full list of test examples
+        index: DifficultyIndex for the same split (None = no difficulty strata)
+        length_bins: Review length quantile bins
+        difficulty_bins: Difficulty quantile bins
+
+    Returns:
+        np.ndarray: Integer stratum per example
+    """
+    labels = np.array([example['label'] for example in examples], dtype=np.intp)
+    lengths = np.array([len(example['text']) for example in examples])
+    edges = np.quantile(lengths, np.linspace(0, 1, length_bins + 1)[1:-1])
+    strata = labels * length_bins + np.searchsorted(edges, lengths, side='right')
+
+    if index is not None and len(index):
+        strata = strata * difficulty_bins + index.strata(difficulty_bins, size=len(examples))
+    return strata
+
+
+def load_difficulty_index(split="test"):
+    """The saved difficulty index for a split, or None if there is none yet"""
+    index = DifficultyIndex.load(split)
+    return index if index.sources else None
+
+
+def select_preview(examples, size=DEFAULT_PREVIEW_SIZE, index=None, seed=42):
+    """
+    Choose a stratified preview subset.
+
+    Uses the finest stratification that gives every stratum at least one
+    example: label x length x difficulty, then label x length, then label.
+
+    Args:
+        examples: Full list of test examples
+        size: Number of examples in the preview
+        index: DifficultyIndex (None = stratify by label and length only)
+        seed: Random seed
+
+    Returns:
+        tuple: (sorted example ids, stratum of every example, description
+            of the strata used)
+    """
+    options = [(3, None, "label and length"), (1, None, "label")]
+    if index is not None and len(index):
+        options.insert(0, (3, index, "label, length and difficulty"))
+    for length_bins, difficulty, stratified_by in options:
+        strata = preview_strata(examples, difficulty, length_bins)
+        if len(np.unique(strata)) <= size:
+            break
+    return stratified_sample(strata, size, seed), strata, stratified_by
+
+
+def estimate_accuracy(correct, sample_ids, strata):
+    """
+    Stratified estimate of the full-set accuracy.
+
+    Args:
+        correct: 0/1 per preview example (in sample_ids order)
+        sample_ids: Example ids of the preview
+        strata: Stratum of every example in the full set
+
+    Strata without a preview example cannot be estimated; the weights are
+    renormalised over the sampled strata (which assumes the missing ones
+    score like the rest) and 'coverage' says how much of the full set the
+    sampled strata hold.
+
+    Returns:
+        dict: subset_accuracy, estimate, ci_low, ci_high, stderr, examples,
+            coverage
+    """
+    correct = np.asarray(correct, dtype=np.float64)
+    sample_strata = strata[sample_ids]
+    sampled = np.unique(sample_strata)
+    population = int(np.isin(strata, sampled).sum())
+
+    estimate = 0.0
+    variance = 0.0
+    for stratum in sampled:
+        hits = correct[sample_strata == stratum]
+        n, size = len(hits), int(np.sum(strata == stratum))
+        weight = size / population
+        estimate += weight * float(hits.mean())
+        # Smoothed proportion so strata with 0 or n hits still add variance
+        p = (hits.sum() + 0.5) / (n + 1)
+        fpc = 1 - n / size
+        variance += weight ** 2 * p * (1 - p) / n * fpc
+
+    stderr = math.sqrt(variance)
+    return {
+        'examples': len(correct),
+        'subset_accuracy': float(correct.mean()) if len(correct) else 0.0,
+        'estimate': estimate,
+        'stderr': stderr,
+        'ci_low': max(0.0, estimate - Z_95 * stderr),
+        'ci_high': min(1.0, estimate + Z_95 * stderr),
+        'coverage': population / len(strata) if len(strata) else 0.0,
+    }
+
+
+def print_preview_estimate(estimate, full_size, stratified_by):
+    """Print the preview accuracy with its error bars."""
+    print(f"\n🔎 Preview on {estimate['examples']} of {full_size} reviews "
+          f"(stratified by {stratified_by})")
+    print(f"   Subset accuracy:             {estimate['subset_accuracy']:.2%}")
+    print(f"   Predicted full-set accuracy: {estimate['estimate']:.2%} "
+          f"± {Z_95 * estimate['stderr']:.2%} "
+          f"(95% CI {estimate['ci_low']:.2%} - {estimate['ci_high']:.2%})")
+    if estimate['coverage'] < 1:
+        print(f"   ⚠️  Only strata holding {estimate['coverage']:.0%} of the reviews were sampled; "
+              f"the others are assumed to score like them")
@@ -0,0 +1,228 @@
+"""
+Profiling Helpers - Find Out Why a Submission Is Slow
+=====================================================
+
+Wraps `PromptEvaluator.evaluate_student_prompt` in cProfile (and optionally
+`torch.profiler`) for a small number of examples and writes, per student:
+
+- `<student>.prof`            raw cProfile stats (open with snakeviz / pstats)
+- `<student>.folded`          collapsed stacks (flamegraph.pl, speedscope)
+- `<student>.trace.json`      Chrome trace of the call tree (chrome://tracing, Perfetto)
+- `<student>.torch.trace.json` torch.profiler Chrome trace (only with use_torch)
+- `<student>.hotspots.txt`    top functions by self time
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+from pathlib import Path
+
+
+def _format_func(func):
+    """Turn a pstats function key (file, line, name) into a readable label."""
+    filename, line, name = func
+    if filename == '~':
+        # Built-in functions have no source location
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def _call_tree(stats, min_time):
+    """
+    Expand the cProfile caller graph into approximate call paths.
+
+    cProfile only records caller -> callee edges, so time along a path is
+    estimated by scaling each edge proportionally to its share of the
+    callee's cumulative time (the same approximation flameprof uses).
+
+    Yields:
+        (path, start, total_time, self_time) tuples; start is the offset of
+        the node inside its root so the tree can be laid out as a timeline.
+    """
+    children = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    roots = [
+        func for func, (_, _, _, _, callers) in stats.items()
+        if not any(caller in stats for caller in callers)
+    ]
+
+    def walk(func, budget, start, path):
+        cc, nc, tt, ct, _ = stats[func]
+        ratio = budget / ct if ct > 0 else 0.0
+        path = path + (func,)
+        yield path, start, budget, tt * ratio
+
+        offset = start
+        for child, edge_ct in sorted(children.get(func, []), key=lambda c: -c[1]):
+            child_budget = edge_ct * ratio
+            if child in path or child_budget < min_time or len(path) > 200:
+                continue
+            yield from walk(child, child_budget, offset, path)
+            offset += child_budget
+
+    offset = 0.0
+    for root in sorted(roots, key=lambda f: -stats[f][3]):
+        if stats[root][3] < min_time:
+            continue
+        yield from walk(root, stats[root][3], offset, ())
+        offset += stats[root][3]
+
+
+def write_profile_outputs(profiler, output_dir, student_slug, top_n=15):
+    """
+    Write collapsed-stack, Chrome-trace and hot-spot files for a profile run.
+
+    Args:
+        profiler: A finished cProfile.Profile
+        output_dir: Directory to write files into
+        student_slug: File name prefix (usually the module name)
+        top_n: Number of hot spots to keep
+
+    Returns:
+        dict: Paths of the written files and the list of hot spots
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    prof_file = output_dir / f"{student_slug}.prof"
+    profiler.dump_stats(str(prof_file))
+
+    stats = pstats.Stats(profiler)
+    raw = stats.stats
+    total_time = stats.total_tt or 1e-9
+    min_time = total_time * 1e-4
+
+    folded_lines = {}
+    trace_events = []
+    for path, start, total, self_time in _call_tree(raw, min_time):
+        labels = [_format_func(func) for func in path]
+        key = ";".join(labels)
+        folded_lines[key] = folded_lines.get(key, 0) + self_time
+        trace_events.append({
+            'name': labels[-1],
+            'cat': 'python',
+            'ph': 'X',
+            'ts': start * 1e6,
+            'dur': total * 1e6,
+            'pid': os.getpid(),
+            'tid': 0,
+        })
+
+    folded_file = output_dir / f"{student_slug}.folded"
+    with open(folded_file, 'w') as f:
+        for key, seconds in folded_lines.items():
+            micros = int(seconds * 1e6)
+            if micros > 0:
+                f.write(f"{key} {micros}\n")
+
+    trace_file = output_dir / f"{student_slug}.trace.json"
+    with open(trace_file, 'w') as f:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
+
+    hotspots = []
+    for func, (cc, nc, tt, ct, _) in sorted(raw.items(), key=lambda item: -item[1][2])[:top_n]:
+        hotspots.append({
+            'function': _format_func(func),
+            'calls': nc,
+            'self_time': tt,
+            'cumulative_time': ct,
+        })
+
+    hotspots_file = output_dir / f"{student_slug}.hotspots.txt"
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('tottime').print_stats(top_n)
+    with open(hotspots_file, 'w') as f:
+        f.write(stream.getvalue())
+
+    return {
+        'prof': str(prof_file),
+        'folded': str(folded_file),
+        'trace': str(trace_file),
+        'hotspots_file': str(hotspots_file),
+        'hotspots': hotspots,
+        'total_time': total_time,
+    }
+
+
+def profile_student(evaluator, student_module, student_name, student_slug,
+                    num_examples=20, output_dir="./results/profiles",
+                    use_torch=False, top_n=15):
+    """
+    Profile one student's evaluation on the first `num_examples` examples.
+
+    Args:
+        evaluator: PromptEvaluator with model and test data loaded
+        student_module: Imported student module
+        student_name: Student's display name
+        student_slug: File name prefix for the outputs
+        num_examples: Number of test examples to run under the profiler
+        output_dir: Where to write the profile files
+        use_torch: Also record a torch.profiler Chrome trace
+        top_n: Number of hot spots to report
+
+    Returns:
+        dict: Output file paths, hot spots and the evaluation metrics
+    """
+    full_test_data = evaluator.test_data
+    evaluator.test_data = full_test_data[:num_examples]
+
+    torch_profiler = None
+    if use_torch:
+        from torch.profiler import profile, ProfilerActivity
+        # with_stack=False keeps torch off sys.setprofile so it can run
+        # side by side with cProfile
+        torch_profiler = profile(activities=[ProfilerActivity.CPU], with_stack=False)
+
+    profiler = cProfile.Profile()
+    try:
+        if torch_profiler is not None:
+            torch_profiler.__enter__()
+        profiler.enable()
+        try:
+            metrics = evaluator.evaluate_student_prompt(student_module, student_name)
+        finally:
+            profiler.disable()
+            if torch_profiler is not None:
+                torch_profiler.__exit__(None, None, None)
+    finally:
+        evaluator.test_data = full_test_data
+
+    report = write_profile_outputs(profiler, output_dir, student_slug, top_n=top_n)
+    report['metrics'] = metrics
+
+    if torch_profiler is not None:
+        torch_trace = Path(output_dir) / f"{student_slug}.torch.trace.json"
+        torch_profiler.export_chrome_trace(str(torch_trace))
+        report['torch_trace'] = str(torch_trace)
+
+    return report
+
+
+def print_profile_summary(reports, top_n=10):
+    """
+    Pretty print the hot spots of one or more profile runs.
+
+    Args:
+        reports (dict): Student name -> report from profile_student
+        top_n (int): Number of hot spots to show per student
+    """
+    print("\n" + "=" * 80)
+    print("PROFILE SUMMARY - TOP HOT SPOTS (by self time)")
+    print("=" * 80)
+
+    for name, report in reports.items():
+        print(f"\n🔥 {name} (profiled {report['total_time']:.2f}s)")
+        for spot in report['hotspots'][:top_n]:
+            share = spot['self_time'] / report['total_time'] * 100
+            print(f"   {spot['self_time']:8.3f}s {share:5.1f}%  "
+                  f"{spot['calls']:>8} calls  {spot['function']}")
+        print(f"   Files: {report['folded']}, {report['trace']}")
+        if 'torch_trace' in report:
+            print(f"          {report['torch_trace']}")
+
+    print("=" * 80)
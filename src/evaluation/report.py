@@ -0,0 +1,194 @@
+"""
+Visual Report - Render Every Student's Charts Headless and in Parallel
+======================================================================
+
+plot_confusion_matrix draws one seaborn figure at a time and is meant for
+notebooks. For a whole class this module renders, straight to PNG with
+Agg canvases (pyplot and the caller's backend are left alone, so inline
+plots in a notebook keep working):
+
+- one confusion matrix per student
+- a leaderboard bar chart of accuracy and F1
+- accuracy vs. average inference time
+
+Students are split across a process pool. Each worker builds one
+confusion-matrix figure and only updates its image data, labels and title
+for each student instead of creating a new figure, and the files are
+written to results/visualizations.
+
+Example:
+    python src/evaluation/evaluator.py --mode all --charts
+
+    from src.evaluation.report import render_report
+    render_report(all_results)
+"""
+
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+VISUALIZATIONS_DIR = "./results/visualizations"
+
+_LABELS = ['Negative', 'Positive']
+
+
+def _new_figure(figsize):
+    """A figure drawn by its own Agg canvas, outside pyplot's figure manager"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _slug(student_name):
+    return re.sub(r"[^A-Za-z0-9]+", "_", student_name).strip("_").lower() or "student"
+
+
+def _render_confusion_matrices(jobs, output_dir, dpi):
+    """
+    Worker: draw the confusion matrices of several students on one figure.
+
+    Args:
+        jobs: List of (student_name, [[tn, fp], [fn, tp]])
+        output_dir: Where to write the PNG files
+        dpi: Resolution
+
+    Returns:
+        list: Written file paths
+    """
+    fig = _new_figure((6, 4.5))
+    ax = fig.subplots()
+    image = ax.imshow([[0, 0], [0, 0]], cmap='Blues', vmin=0, vmax=1)
+    fig.colorbar(image, ax=ax, label='Count')
+    ax.set_xticks([0, 1], _LABELS)
+    ax.set_yticks([0, 1], _LABELS)
+    ax.set_xlabel('Predicted Label')
+    ax.set_ylabel('True Label')
+    cells = [[ax.text(j, i, "", ha='center', va='center', fontsize=14) for j in range(2)]
+             for i in range(2)]
+    # Placeholder title so tight_layout leaves room for the real ones
+    title = ax.set_title("Confusion Matrix", fontsize=13, fontweight='bold')
+    fig.tight_layout()
+
+    written = []
+    for student_name, cm in jobs:
+        top = max(max(row) for row in cm) or 1
+        image.set_data(cm)
+        image.set_clim(0, top)
+        for i in range(2):
+            for j in range(2):
+                cells[i][j].set_text(str(cm[i][j]))
+                cells[i][j].set_color('white' if cm[i][j] > top / 2 else 'black')
+        title.set_text(f'Confusion Matrix - {student_name}')
+
+        path = Path(output_dir) / f"confusion_{_slug(student_name)}.png"
+        fig.savefig(path, dpi=dpi)
+        written.append(str(path))
+
+    return written
+
+
+def _render_summary_charts(rows, output_dir, dpi):
+    """
+    Worker: leaderboard and accuracy-vs-time charts.
+
+    Args:
+        rows: List of (student_name, accuracy, f1_score, avg_inference_time)
+        output_dir: Where to write the PNG files
+        dpi: Resolution
+
+    Returns:
+        list: Written file paths
+    """
+    rows = sorted(rows, key=lambda row: row[1])
+    names = [row[0] for row in rows]
+    written = []
+
+    # Leaderboard: one bar pair per student, best at the top
+    fig = _new_figure((8, max(3, 0.3 * len(rows) + 1)))
+    ax = fig.subplots()
+    positions = range(len(rows))
+    ax.barh([p + 0.2 for p in positions], [row[1] for row in rows], height=0.4, label='Accuracy')
+    ax.barh([p - 0.2 for p in positions], [row[2] for row in rows], height=0.4, label='F1 Score')
+    ax.set_yticks(list(positions), names)
+    ax.set_xlim(0, 1)
+    ax.set_xlabel('Score')
+    ax.set_title('Leaderboard', fontsize=13, fontweight='bold')
+    ax.legend(loc='lower right')
+    fig.tight_layout()
+    path = Path(output_dir) / "leaderboard.png"
+    fig.savefig(path, dpi=dpi)
+    written.append(str(path))
+
+    # Accuracy vs. speed
+    fig = _new_figure((7, 5))
+    ax = fig.subplots()
+    ax.scatter([row[3] for row in rows], [row[1] for row in rows])
+    if len(rows) <= 40:
+        for name, accuracy, _, seconds in rows:
+            ax.annotate(name, (seconds, accuracy), fontsize=8, xytext=(3, 3),
+                        textcoords='offset points')
+    ax.set_xlabel('Average inference time (s per example)')
+    ax.set_ylabel('Accuracy')
+    ax.set_title('Accuracy vs. Inference Time', fontsize=13, fontweight='bold')
+    fig.tight_layout()
+    path = Path(output_dir) / "accuracy_vs_time.png"
+    fig.savefig(path, dpi=dpi)
+    written.append(str(path))
+
+    return written
+
+
+def render_report(all_results, output_dir=VISUALIZATIONS_DIR, workers=None, dpi=150):
+    """
+    Render all confusion matrices and summary charts.
+
+    Args:
+        all_results: student -> metrics (as returned by evaluate_all_students)
+        output_dir: Where to write the PNG files
+        workers: Processes to render with (default: CPUs, at most one per
+            chunk of 8 students; 0 renders in this process)
+        dpi: Resolution
+
+    Returns:
+        list: Written file paths
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Only plain numbers cross the process boundary
+    matrices = []
+    rows = []
+    for student_name, metrics in all_results.items():
+        matrices.append((student_name, [[int(metrics['true_negatives']), int(metrics['false_positives'])],
+                                        [int(metrics['false_negatives']), int(metrics['true_positives'])]]))
+        rows.append((student_name, float(metrics['accuracy']), float(metrics['f1_score']),
+                     float(metrics.get('avg_inference_time', 0.0))))
+    if not rows:
+        return []
+
+    if workers is None:
+        workers = min(os.cpu_count() or 1, max(1, len(matrices) // 8))
+
+    written = []
+    if workers <= 1:
+        written += _render_summary_charts(rows, output_dir, dpi)
+        written += _render_confusion_matrices(matrices, output_dir, dpi)
+    else:
+        # One chunk per worker: each worker reuses its figure for the whole chunk.
+        # spawn: workers start clean, without the model or its threads
+        chunks = [matrices[i::workers] for i in range(workers)]
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [pool.submit(_render_summary_charts, rows, str(output_dir), dpi)]
+            futures += [pool.submit(_render_confusion_matrices, chunk, str(output_dir), dpi)
+                        for chunk in chunks if chunk]
+            for future in futures:
+                written += future.result()
+
+    print(f"✅ {len(written)} charts saved to: {output_dir}")
+    return written
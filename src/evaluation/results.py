@@ -0,0 +1,215 @@
+"""
+Student Results - Typed Per-Example Arrays and Plain Metrics
+=============================================================
+
+An evaluation used to collect labels, predictions and latencies in Python
+lists and return a metrics dict of NumPy scalars, converted value by value
+when the results were saved. For 25k-review or multi-model runs those
+lists and conversions add up. StudentResult instead preallocates one typed
+array per column for the whole test set:
+
+    labels, predictions   uint8
+    latencies             float32 (seconds per example)
+    input/output tokens   uint16
+
+and computes its metrics once from a 2x2 count of the arrays, with the
+same code as metrics.calculate_metrics. It behaves like the old metrics
+dict (result['accuracy'], compare_prompts, print_metrics), serializes to
+JSON without converting element by element, and goes into the prediction
+store as-is.
+
+Example:
+    result = StudentResult("Alice", len(test_data))
+    result.add_records(records)           # records from parse_batch
+    result.finalize()
+    result['accuracy'], result.to_json()
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+
+from src.evaluation.config import MAX_INPUT_TOKENS
+from src.evaluation.metrics import metrics_from_counts
+
+_MAX_TOKENS = np.iinfo(np.uint16).max
+
+
+def input_lengths(inputs):
+    """
+    Token count of each row of an already tokenized, padded batch.
+
+    Args:
+        inputs: Tokenizer output with an attention_mask (tensor or lists)
+
+    Returns:
+        list: Tokens per row, padding excluded
+    """
+    mask = inputs['attention_mask']
+    rows = mask.tolist() if hasattr(mask, 'tolist') else mask
+    return [int(sum(row)) for row in rows]
+
+
+def count_tokens(tokenizer, texts):
+    """
+    Token count of each text as the model sees it, clipped to the uint16 range.
+
+    Prefer input_lengths of the batch the model ran on; this tokenizes
+    again. It uses the evaluator's settings (padded, truncated at
+    MAX_INPUT_TOKENS), so counts match what the model saw and the
+    tokenizer's padding/truncation state is not switched between calls.
+
+    Args:
+        tokenizer: HuggingFace tokenizer, or None to estimate from characters
+            (about 4 characters per token for English text)
+        texts: List of strings
+
+    Returns:
+        np.ndarray: uint16 token counts
+    """
+    if tokenizer is None:
+        lengths = [min(MAX_INPUT_TOKENS, max(1, len(text) // 4)) for text in texts]
+    elif not texts:
+        lengths = []
+    else:
+        lengths = input_lengths(tokenizer(list(texts), padding=True, truncation=True,
+                                          max_length=MAX_INPUT_TOKENS))
+    return np.minimum(lengths, _MAX_TOKENS).astype(np.uint16)
+
+
+class StudentResult(Mapping):
+    """One student's per-example arrays and metrics (read like a metrics dict)"""
+
+    __slots__ = ('student_name', 'count', 'labels', 'predictions', 'latencies',
+                 'input_tokens', 'output_tokens', 'outputs', 'metrics')
+
+    def __init__(self, student_name, size, keep_outputs=False):
+        """
+        Args:
+            student_name: Student's name
+            size: Number of examples (arrays are allocated once)
+            keep_outputs: Also keep raw outputs and token counts (needed
+                for the prediction store)
+        """
+        self.student_name = student_name
+        self.count = 0
+        self.labels = np.zeros(size, dtype=np.uint8)
+        self.predictions = np.zeros(size, dtype=np.uint8)
+        self.latencies = np.zeros(size, dtype=np.float32)
+        self.input_tokens = np.zeros(size, dtype=np.uint16)
+        self.output_tokens = np.zeros(size, dtype=np.uint16)
+        self.outputs = [None] * size if keep_outputs else None
+        self.metrics = {}
+
+    @classmethod
+    def from_lists(cls, student_name, labels, predictions, latencies, outputs=None,
+                   prompts=None, tokenizer=None):
+        """
+        Build a result from per-example lists.
+
+        Args:
+            student_name: Student's name
+            labels: True labels (0/1)
+            predictions: Predicted labels (0/1)
+            latencies: Inference seconds per example
+            outputs: Raw model outputs (optional)
+            prompts: Prompts, for input token counts (optional)
+            tokenizer: Tokenizer for token counts (None = estimate)
+
+        Returns:
+            StudentResult: Filled, not yet finalized
+        """
+        result = cls(student_name, len(labels), keep_outputs=outputs is not None)
+        result.labels[:] = labels
+        result.predictions[:] = predictions
+        result.latencies[:] = latencies
+        if outputs is not None:
+            result.outputs[:] = outputs
+            result.output_tokens[:] = count_tokens(tokenizer, outputs)
+            if prompts is not None and None not in prompts:
+                result.input_tokens[:] = count_tokens(tokenizer, prompts)
+        result.count = len(labels)
+        return result
+
+    def add_records(self, records, tokenizer=None):
+        """
+        Append prediction records (from PromptEvaluator.parse_batch).
+
+        Args:
+            records: Dicts with label, prediction, inference_time, output
+                and prompt (and input_tokens if the batch was tokenized
+                ahead, see PromptEvaluator.parse_batch)
+            tokenizer: Tokenizer for token counts (None = estimate; only
+                used when outputs are kept)
+        """
+        start, end = self.count, self.count + len(records)
+        self.labels[start:end] = [record['label'] for record in records]
+        self.predictions[start:end] = [record['prediction'] for record in records]
+        self.latencies[start:end] = [record['inference_time'] for record in records]
+        if self.outputs is not None:
+            outputs = [record['output'] for record in records]
+            self.outputs[start:end] = outputs
+            self.output_tokens[start:end] = count_tokens(tokenizer, outputs)
+            if records and 'input_tokens' in records[0]:
+                self.input_tokens[start:end] = [record['input_tokens'] for record in records]
+            else:
+                prompts = [record.get('prompt') for record in records]
+                if None not in prompts:
+                    self.input_tokens[start:end] = count_tokens(tokenizer, prompts)
+        self.count = end
+
+    def finalize(self):
+        """
+        Trim the arrays to the examples added and compute the metrics.
+
+        Returns:
+            StudentResult: self
+        """
+        if self.count < len(self.labels):
+            for name in ('labels', 'predictions', 'latencies', 'input_tokens', 'output_tokens'):
+                setattr(self, name, getattr(self, name)[:self.count])
+            if self.outputs is not None:
+                del self.outputs[self.count:]
+
+        # tn, fp, fn, tp from one pass over the arrays
+        counts = np.bincount(
+            self.labels.astype(np.intp) * 2 + self.predictions, minlength=4
+        )[:4].tolist()
+        total_time = float(self.latencies.sum(dtype=np.float64))
+
+        self.metrics = metrics_from_counts(*counts)
+        self.metrics['avg_inference_time'] = total_time / self.count if self.count else 0.0
+        self.metrics['total_inference_time'] = total_time
+        return self
+
+    def __getitem__(self, key):
+        return self.metrics[key]
+
+    def __setitem__(self, key, value):
+        self.metrics[key] = value
+
+    def __iter__(self):
+        return iter(self.metrics)
+
+    def __len__(self):
+        return len(self.metrics)
+
+    def to_json(self, include_confusion_matrix=False):
+        """
+        JSON-safe metrics, numbers as floats (as metrics_to_json writes them).
+
+        Args:
+            include_confusion_matrix: Keep the confusion matrix as nested lists
+
+        Returns:
+            dict: Metrics
+        """
+        json_metrics = {k: float(v) if isinstance(v, (int, float)) else str(v)
+                        for k, v in self.metrics.items() if k != 'confusion_matrix'}
+        if include_confusion_matrix:
+            json_metrics['confusion_matrix'] = self.metrics['confusion_matrix'].tolist()
+        return json_metrics
+
+    def __repr__(self):
+        return (f"StudentResult({self.student_name!r}, examples={self.count}, "
+                f"accuracy={self.metrics.get('accuracy', float('nan')):.4f})")
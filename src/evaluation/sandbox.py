@@ -0,0 +1,287 @@
+"""
+Student Sandbox - Run Submissions in Resource-Limited Subprocesses
+===================================================================
+
+Submissions are imported and their prompt/parse functions run in the
+evaluator's own process, so one that imports a huge library, loops
+forever or allocates without bound stalls or bloats the whole run. The
+sandbox runs each submission in its own subprocess instead, with a CPU
+time limit, a memory (address space) limit and a wall-clock timeout per
+call. Prompts are built in chunks over IPC rather than one round trip per
+review, and the cost of building them is recorded per student.
+
+Example:
+    pool = SandboxPool(cpu_seconds=60, memory_mb=1024)
+    student = pool.load("Alice Example", "src/prompts/student_prompts/alice_example.py")
+    prompts = student.get_prompts(["Great film!", "Dull."])
+    pool.print_report()
+    pool.close()
+
+Or from the command line:
+    python src/evaluation/evaluator.py --mode all --sandbox
+"""
+
+import importlib.util
+import multiprocessing
+import signal
+import threading
+import time
+
+# Student functions the sandbox exposes
+STUDENT_HOOKS = ("get_prompt", "parse_output", "get_prompts", "parse_outputs")
+
+# Hooks taking a whole list instead of one item
+BATCH_HOOKS = ("get_prompts", "parse_outputs")
+
+
+class SandboxError(RuntimeError):
+    """A submission failed, timed out or hit a resource limit in its sandbox"""
+
+
+def _apply_limits(cpu_seconds, memory_bytes):
+    try:
+        import resource
+    except ImportError:
+        # No rlimits on this platform: only the wall-clock timeout applies
+        return
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+
+def _cpu_time():
+    return time.process_time()
+
+
+def _worker_main(conn, module_path, module_name, cpu_seconds, memory_bytes):
+    """Subprocess entry point: import the submission, then serve calls."""
+    _apply_limits(cpu_seconds, memory_bytes)
+
+    start_cpu = _cpu_time()
+    try:
+        spec = importlib.util.spec_from_file_location(module_name, module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        hooks = [name for name in STUDENT_HOOKS if callable(getattr(module, name, None))]
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}", _cpu_time() - start_cpu))
+        return
+    conn.send(("ok", hooks, _cpu_time() - start_cpu))
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+
+        hook, items = request
+        start_cpu = _cpu_time()
+        try:
+            func = getattr(module, hook)
+            if hook in BATCH_HOOKS:
+                result = list(func(items))
+            else:
+                result = [func(item) for item in items]
+        except BaseException as e:
+            conn.send(("error", f"{type(e).__name__}: {e}", _cpu_time() - start_cpu))
+            continue
+        conn.send(("ok", result, _cpu_time() - start_cpu))
+
+
+class SandboxedStudent:
+    """Proxy for a submission running in a sandbox subprocess"""
+
+    def __init__(self, student_name, module_path, cpu_seconds=60, memory_bytes=None,
+                 timeout=30, chunk_size=256):
+        """
+        Args:
+            student_name: Student's name
+            module_path: Path to the student's .py file
+            cpu_seconds: CPU time the subprocess may use in total
+            memory_bytes: Address space limit of the subprocess
+            timeout: Wall-clock seconds allowed for the import and for each chunk
+            chunk_size: Items sent per IPC round trip
+        """
+        self.student_name = student_name
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+        # Cost of running this student's code
+        self.stats = {'import_time': 0.0, 'calls': 0, 'items': 0,
+                      'wall_time': 0.0, 'cpu_time': 0.0}
+
+        # spawn: the child starts clean, without the model or server threads
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_worker_main,
+            args=(child_conn, str(module_path), f"sandboxed_{student_name}",
+                  cpu_seconds, memory_bytes),
+            name=f"sandbox-{student_name}",
+            daemon=True,
+        )
+        self._lock = threading.Lock()
+
+        start_time = time.time()
+        self._process.start()
+        child_conn.close()
+        hooks = self._receive("import")
+        self.stats['import_time'] = time.time() - start_time
+
+        # Stable function objects, so callers can key caches on them.
+        # The batch hooks are always offered: they run the student's own
+        # batch hook if it has one, else the per-item function in the child.
+        for hook in ("get_prompt", "parse_output"):
+            if hook in hooks:
+                setattr(self, hook, self._make_hook(hook))
+        for batch_hook, item_hook in (("get_prompts", "get_prompt"), ("parse_outputs", "parse_output")):
+            if batch_hook in hooks or item_hook in hooks:
+                setattr(self, batch_hook, self._make_batch_hook(
+                    batch_hook if batch_hook in hooks else item_hook
+                ))
+
+    def _make_hook(self, hook):
+        def call(item):
+            return self.call_many(hook, [item])[0]
+        call.__name__ = hook
+        return call
+
+    def _make_batch_hook(self, hook):
+        def call(items):
+            return self.call_many(hook, items)
+        call.__name__ = hook
+        return call
+
+    def _receive(self, what):
+        if not self._conn.poll(self.timeout):
+            self.close(kill=True)
+            raise SandboxError(f"{self.student_name}: {what} timed out after {self.timeout}s")
+        try:
+            status, payload, cpu_time = self._conn.recv()
+        except EOFError:
+            self._process.join(1)
+            raise SandboxError(f"{self.student_name}: sandbox died during {what} "
+                               f"({self._describe_exit()})") from None
+
+        self.stats['cpu_time'] += cpu_time
+        if status == "error":
+            raise SandboxError(f"{self.student_name}: {what} failed: {payload}")
+        return payload
+
+    def _describe_exit(self):
+        code = self._process.exitcode
+        if hasattr(signal, "SIGXCPU") and code == -signal.SIGXCPU:
+            return "CPU time limit exceeded"
+        if code is not None and code < 0:
+            return f"killed by signal {-code}"
+        return f"exit code {code}"
+
+    def call_many(self, hook, items):
+        """
+        Call a student function on many items, chunk_size per round trip.
+
+        Args:
+            hook: Function name (e.g. "get_prompt"); batch hooks receive
+                each chunk as one list
+            items: Arguments, one per call
+
+        Returns:
+            list: Results in order
+        """
+        results = []
+        with self._lock:
+            for chunk_start in range(0, len(items), self.chunk_size):
+                chunk = list(items[chunk_start:chunk_start + self.chunk_size])
+                if not self._process.is_alive():
+                    raise SandboxError(f"{self.student_name}: sandbox is not running "
+                                       f"({self._describe_exit()})")
+                start_time = time.time()
+                self._conn.send((hook, chunk))
+                results.extend(self._receive(hook))
+                self.stats['wall_time'] += time.time() - start_time
+                self.stats['calls'] += 1
+                self.stats['items'] += len(chunk)
+        return results
+
+    def close(self, kill=False):
+        """Stop the subprocess."""
+        if self._process.is_alive() and not kill:
+            try:
+                self._conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self._process.join(1)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._conn.close()
+
+
+class SandboxPool:
+    """Starts one sandbox per submission and reports their cost"""
+
+    def __init__(self, cpu_seconds=60, memory_mb=2048, timeout=30, chunk_size=256):
+        """
+        Args:
+            cpu_seconds: CPU time each submission may use in total
+            memory_mb: Address space limit per submission (None = no limit)
+            timeout: Wall-clock seconds for the import and for each chunk of calls
+            chunk_size: Reviews (or outputs) sent per IPC round trip
+        """
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = int(memory_mb * 1024 * 1024) if memory_mb else None
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.students = {}
+
+    def load(self, student_name, module_path):
+        """
+        Import a submission in a new sandbox.
+
+        Args:
+            student_name: Student's name
+            module_path: Path to the student's .py file
+
+        Returns:
+            SandboxedStudent: Proxy exposing the student's functions
+
+        Raises:
+            SandboxError: If the import fails, times out or hits a limit
+        """
+        student = SandboxedStudent(
+            student_name, module_path, cpu_seconds=self.cpu_seconds,
+            memory_bytes=self.memory_bytes, timeout=self.timeout,
+            chunk_size=self.chunk_size
+        )
+        self.students[student_name] = student
+        return student
+
+    def report(self):
+        """
+        Per-student cost of running submission code.
+
+        Returns:
+            dict: student -> stats (import_time, calls, items, wall_time,
+                cpu_time, per_item_ms)
+        """
+        report = {}
+        for student_name, student in self.students.items():
+            stats = dict(student.stats)
+            stats['per_item_ms'] = 1000 * stats['wall_time'] / stats['items'] if stats['items'] else 0.0
+            report[student_name] = stats
+        return report
+
+    def print_report(self):
+        print("\n🧱 Student code cost (sandboxed):")
+        print(f"   {'Student':25s} {'import':>8s} {'items':>7s} {'wall':>8s} {'cpu':>8s} {'ms/item':>8s}")
+        for student_name, stats in self.report().items():
+            print(f"   {student_name:25s} {stats['import_time']:7.2f}s {stats['items']:7d} "
+                  f"{stats['wall_time']:7.2f}s {stats['cpu_time']:7.2f}s {stats['per_item_ms']:8.3f}")
+
+    def close(self):
+        for student in self.students.values():
+            student.close()
+        self.students.clear()
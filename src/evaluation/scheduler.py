@@ -0,0 +1,242 @@
+"""
+Scheduler - Run Each Unique Prompt Once Across All Submissions
+===============================================================
+
+Many submissions produce identical prompts: copies of the example prompts,
+the unchanged template, or prompts that only differ for some reviews.
+Before any inference the scheduler indexes every (student, example) prompt,
+runs each distinct prompt exactly once and fans the output back out to
+every student and example that asked for it.
+
+The distinct prompts of all students form one global queue. It is packed
+into batches of similar token length, so batches are full and carry little
+padding however many (or few) examples each submission has, and the model
+never idles between students.
+
+Example:
+    python src/evaluation/evaluator.py --mode all --dedup
+    python src/evaluation/evaluator.py --mode all --dedup --batch-tokens 4096
+"""
+
+import time
+
+from src.evaluation.config import MAX_INPUT_TOKENS
+
+
+class PromptIndex:
+    """Maps each distinct prompt to the (student, example) pairs using it"""
+
+    def __init__(self):
+        self.unique_prompts = []  # prompt id -> prompt
+        self._prompt_ids = {}  # prompt -> prompt id
+        self.student_ids = {}  # student -> prompt id of each example
+
+    def add_student(self, student_name, prompts):
+        """
+        Index one student's prompts (one per test example, in order).
+
+        Args:
+            student_name: Student's name
+            prompts: List of prompt strings
+        """
+        ids = []
+        for prompt in prompts:
+            prompt_id = self._prompt_ids.get(prompt)
+            if prompt_id is None:
+                prompt_id = len(self.unique_prompts)
+                self._prompt_ids[prompt] = prompt_id
+                self.unique_prompts.append(prompt)
+            ids.append(prompt_id)
+        self.student_ids[student_name] = ids
+
+    @property
+    def total_prompts(self):
+        return sum(len(ids) for ids in self.student_ids.values())
+
+    @property
+    def dedup_ratio(self):
+        """Prompts requested per prompt actually run (1.0 = no duplicates)"""
+        return self.total_prompts / len(self.unique_prompts) if self.unique_prompts else 1.0
+
+    def fan_out(self, values):
+        """
+        Spread per-unique-prompt values back to every student.
+
+        Args:
+            values: One value per entry of unique_prompts
+
+        Returns:
+            dict: student -> list of values, one per example
+        """
+        return {
+            student_name: [values[prompt_id] for prompt_id in ids]
+            for student_name, ids in self.student_ids.items()
+        }
+
+    def summary(self):
+        total = self.total_prompts
+        unique = len(self.unique_prompts)
+        return {
+            'students': len(self.student_ids),
+            'total_prompts': total,
+            'unique_prompts': unique,
+            'dedup_ratio': self.dedup_ratio,
+            'saved_fraction': 1 - unique / total if total else 0.0,
+        }
+
+
+def prompt_token_lengths(evaluator, prompts):
+    """
+    Input length of each prompt as the model will see it.
+
+    Args:
+        evaluator: PromptEvaluator
+        prompts: List of prompt strings
+
+    Returns:
+        list: Token count per prompt (character count with a remote
+            backend, which is enough to order prompts by length)
+    """
+    if evaluator.tokenizer is None:
+        return [len(prompt) for prompt in prompts]
+    input_ids = evaluator.tokenizer(
+        prompts, truncation=True, max_length=MAX_INPUT_TOKENS
+    )['input_ids']
+    return [len(ids) for ids in input_ids]
+
+
+def pack_batches(lengths, max_batch_size, max_batch_tokens=None):
+    """
+    Group items into batches of similar length, longest first.
+
+    Sorting by length keeps padding low; running the longest batch first
+    surfaces out-of-memory errors right away.
+
+    Args:
+        lengths: Length of each item
+        max_batch_size: Max items per batch (used without a token budget)
+        max_batch_tokens: Optional budget of padded tokens per batch
+            (items x longest item); replaces max_batch_size so short
+            prompts travel in larger batches
+
+    Returns:
+        list: Batches as lists of item indices
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches = []
+    batch = []
+    for i in order:
+        if batch:
+            # The first item of a batch is its longest
+            if max_batch_tokens is not None:
+                full = (len(batch) + 1) * lengths[batch[0]] > max_batch_tokens
+            else:
+                full = len(batch) >= max_batch_size
+            if full:
+                batches.append(batch)
+                batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def run_unique_prompts(evaluator, index, max_batch_tokens=None, max_length=10):
+    """
+    Run every distinct prompt of the index once, packed by token length.
+
+    Args:
+        evaluator: PromptEvaluator with a loaded model (or backend)
+        index: PromptIndex
+        max_batch_tokens: Optional padded-token budget per batch (see
+            pack_batches); default is evaluator.batch_size prompts per batch
+        max_length: Max tokens to generate
+
+    Returns:
+        tuple: (outputs, inference_times), one entry per unique prompt;
+            batch time is shared evenly across the prompts of the batch
+    """
+    prompts = index.unique_prompts
+    lengths = prompt_token_lengths(evaluator, prompts)
+    batches = pack_batches(lengths, evaluator.batch_size, max_batch_tokens)
+
+    padded = sum(len(batch) * lengths[batch[0]] for batch in batches)
+    if padded:
+        print(f"📦 Packed {len(prompts)} prompts into {len(batches)} batches "
+              f"({sum(lengths) / padded:.1%} of batch tokens are real, not padding)")
+
+    outputs = [None] * len(prompts)
+    inference_times = [None] * len(prompts)
+    done = 0
+
+    for batch in batches:
+        with evaluator.phase("batch", size=len(batch), tokens=lengths[batch[0]]):
+            start_time = time.time()
+            batch_outputs = evaluator.run_inference_batch(
+                [prompts[i] for i in batch], max_length=max_length, client_id="scheduler"
+            )
+            inference_time = (time.time() - start_time) / len(batch)
+
+        for i, output in zip(batch, batch_outputs):
+            outputs[i] = output
+            inference_times[i] = inference_time
+
+        done += len(batch)
+        if done % 10 < len(batch):
+            print(f"   Progress: {done}/{len(prompts)} unique prompts processed")
+        if evaluator.monitor is not None and evaluator.inference_queue is None:
+            evaluator.monitor.queue_depth.set(len(prompts) - done)
+
+    return outputs, inference_times
+
+
+def evaluate_students_deduplicated(evaluator, students, max_batch_tokens=None):
+    """
+    Evaluate several submissions, running each distinct prompt once.
+
+    Every example keeps the full inference time of its prompt, so a
+    student's reported latency does not depend on who else submitted the
+    same prompt.
+
+    Args:
+        evaluator: PromptEvaluator with test data and a loaded model (or backend)
+        students: List of (student_name, module) pairs
+        max_batch_tokens: Optional padded-token budget per batch
+
+    Returns:
+        dict: student -> metrics
+    """
+    index = PromptIndex()
+    modules = {}
+    for student_name, module in students:
+        try:
+            with evaluator.phase("build_prompts", student=student_name):
+                index.add_student(student_name, evaluator.build_prompts(module, evaluator.test_data))
+            modules[student_name] = module
+        except Exception as e:
+            print(f"\n❌ Error building prompts for {student_name}: {str(e)}")
+
+    summary = index.summary()
+    print(f"\n🔁 Prompt dedup: {summary['total_prompts']} prompts, "
+          f"{summary['unique_prompts']} unique "
+          f"(ratio {summary['dedup_ratio']:.2f}x, {summary['saved_fraction']:.1%} of inference saved)")
+
+    with evaluator.phase("run_unique_prompts", prompts=summary['unique_prompts']):
+        outputs, inference_times = run_unique_prompts(evaluator, index, max_batch_tokens)
+
+    student_outputs = index.fan_out(outputs)
+    student_times = index.fan_out(inference_times)
+    student_prompts = index.fan_out(index.unique_prompts)
+
+    all_results = {}
+    for student_name, module in modules.items():
+        try:
+            with evaluator.phase("evaluate_student", student=student_name):
+                all_results[student_name] = evaluator.score_outputs(
+                    module, student_name, student_outputs[student_name],
+                    student_times[student_name], student_prompts[student_name]
+                )
+        except Exception as e:
+            print(f"\n❌ Error evaluating {student_name}: {str(e)}")
+
+    return all_results
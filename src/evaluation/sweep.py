@@ -0,0 +1,219 @@
+"""
+Prompt Sweep - Compare Many Variants of One Prompt with Early Elimination
+==========================================================================
+
+Tuning a prompt means trying dozens of variants (other few-shot examples,
+instruction wording, output format lines) and running quick_test on each.
+The sweep runs them together with successive halving:
+
+    round 0: every variant on the first 25 reviews
+    round 1: the better half on the first 50
+    round 2: the better half of those on the first 100 ...
+
+until one variant is left or the test set is used up. Each round only
+runs the reviews a variant has not seen yet. All variants' prompts for a
+round go into one deduplicated queue (see scheduler.py), packed into
+length-sorted batches, and every output is kept in a cache shared across
+rounds and variants (and across sweeps if the same cache is passed in), so
+a prompt common to several variants runs once. The cache is keyed by model
+and generation length as well as prompt, so a cache passed to a sweep on
+another model is not reused by mistake.
+
+Only whole prompts are cached: each variant wraps the review in its own
+text, so a prompt is always tokenized in full.
+
+Reviews are taken in an order that alternates labels, so every round's
+prefix is balanced.
+
+Example:
+    from src.evaluation.sweep import sweep_prompt_variants
+
+    table = sweep_prompt_variants(evaluator, {
+        'zero-shot': zero_shot_prompt,
+        'two examples': few_shot_prompt,
+        'answer-first': answer_first_prompt,
+    })
+
+    python src/evaluation/evaluator.py --mode sweep \\
+        --variants my_prompts/zero_shot.py,my_prompts/few_shot.py
+"""
+
+import math
+import random
+import types
+
+from src.evaluation.evaluator import parse_predictions
+from src.evaluation.scheduler import PromptIndex, run_unique_prompts
+
+
+def _as_module(variant, parse_output=None):
+    """A submission-like object with get_prompt (and parse_output)"""
+    if callable(variant) and not hasattr(variant, 'get_prompt'):
+        module = types.SimpleNamespace(get_prompt=variant)
+        if parse_output is not None:
+            module.parse_output = parse_output
+        return module
+    return variant
+
+
+def balanced_order(examples, seed=42):
+    """
+    Example indices in random order, alternating Positive and Negative.
+
+    Args:
+        examples: Test examples
+        seed: Random seed
+
+    Returns:
+        list: Indices; every prefix has (nearly) equal labels
+    """
+    rng = random.Random(seed)
+    by_label = {}
+    for i, example in enumerate(examples):
+        by_label.setdefault(example['label'], []).append(i)
+    if not by_label:
+        return []
+    for indices in by_label.values():
+        rng.shuffle(indices)
+
+    order = []
+    for position in range(max(len(indices) for indices in by_label.values())):
+        for indices in by_label.values():
+            if position < len(indices):
+                order.append(indices[position])
+    return order
+
+
+def sweep_prompt_variants(evaluator, variants, min_examples=25, eta=2, parse_output=None,
+                          cache=None, max_batch_tokens=None, max_length=10, seed=42):
+    """
+    Evaluate prompt variants with successive halving.
+
+    Args:
+        evaluator: PromptEvaluator with test data and a loaded model (or backend)
+        variants: Dict name -> get_prompt function (or module), or a list of
+            functions (named after __name__)
+        min_examples: Reviews per variant in the first round
+        eta: Each round keeps 1/eta of the variants and runs eta times as
+            many reviews
+        parse_output: Shared parse_output for plain get_prompt functions
+            (default: the shared label parser)
+        cache: Dict (model_name, max_length, prompt) -> output to reuse
+            between sweeps
+        max_batch_tokens: Optional padded-token budget per batch
+        max_length: Max tokens to generate
+        seed: Random seed for the review order
+
+    Returns:
+        pd.DataFrame: Variants ranked by accuracy with the reviews run,
+            the round they were eliminated in, the model seconds spent on
+            them and the prompts they caused to run
+
+    Raises:
+        ValueError: No variants, or no test data
+    """
+    import pandas as pd
+
+    if not isinstance(variants, dict):
+        variants = {variant.__name__: variant for variant in variants}
+    modules = {name: _as_module(variant, parse_output) for name, variant in variants.items()}
+    if not modules:
+        raise ValueError("No prompt variants to sweep")
+
+    test_data = evaluator.test_data
+    order = balanced_order(test_data, seed)
+    if not order:
+        raise ValueError("No test data to sweep on")
+    cache = {} if cache is None else cache
+    key_prefix = (evaluator.model_name, max_length)
+
+    stats = {name: {'correct': 0, 'examples': 0, 'seconds': 0.0, 'prompts_run': 0,
+                    'eliminated': None} for name in modules}
+    survivors = list(modules)
+    budget = min(min_examples, len(order))
+    round_number = 0
+
+    while True:
+        # New reviews for this round (every survivor has seen the same prefix)
+        start = stats[survivors[0]]['examples']
+        examples = [test_data[i] for i in order[start:budget]]
+
+        index = PromptIndex()
+        for name in survivors:
+            with evaluator.phase("build_prompts", student=name):
+                index.add_student(name, evaluator.build_prompts(modules[name], examples))
+
+        # Run the prompts no earlier round or variant has answered
+        pending = PromptIndex()
+        pending.add_student("sweep", [prompt for prompt in index.unique_prompts
+                                      if key_prefix + (prompt,) not in cache])
+        seconds = {}
+        if pending.unique_prompts:
+            with evaluator.phase("sweep_round", round=round_number, prompts=len(pending.unique_prompts)):
+                outputs, inference_times = run_unique_prompts(evaluator, pending, max_batch_tokens,
+                                                              max_length)
+            cache.update((key_prefix + (prompt,), output)
+                         for prompt, output in zip(pending.unique_prompts, outputs))
+            seconds = dict(zip(pending.unique_prompts, inference_times))
+
+        # Variants sharing a prompt share its cost
+        sharers = {}
+        for ids in index.student_ids.values():
+            for prompt_id in ids:
+                sharers[prompt_id] = sharers.get(prompt_id, 0) + 1
+
+        for name in survivors:
+            ids = index.student_ids[name]
+            prompts = [index.unique_prompts[prompt_id] for prompt_id in ids]
+            predictions = parse_predictions(modules[name],
+                                            [cache[key_prefix + (prompt,)] for prompt in prompts])
+            stats[name]['correct'] += sum(
+                (prediction == "Positive") == (example['label'] == 1)
+                for prediction, example in zip(predictions, examples)
+            )
+            stats[name]['examples'] = budget
+            for prompt_id, prompt in zip(ids, prompts):
+                if prompt in seconds:
+                    stats[name]['seconds'] += seconds[prompt] / sharers[prompt_id]
+                    stats[name]['prompts_run'] += 1 / sharers[prompt_id]
+
+        accuracy = {name: stats[name]['correct'] / stats[name]['examples'] for name in survivors}
+        ranked = sorted(survivors, key=accuracy.get, reverse=True)
+        print(f"\n🧪 Sweep round {round_number}: {len(survivors)} variants on {budget} reviews "
+              f"({len(pending.unique_prompts)} new prompts run)")
+        for name in ranked:
+            print(f"   {name:30s} {accuracy[name]:.2%}")
+
+        if len(survivors) == 1 or budget == len(order):
+            break
+
+        # Keep the best 1/eta (and anything tied with the last one kept)
+        keep = max(1, math.ceil(len(survivors) / eta))
+        cutoff = accuracy[ranked[keep - 1]]
+        survivors = [name for name in ranked if accuracy[name] >= cutoff]
+        for name in ranked:
+            if name not in survivors:
+                stats[name]['eliminated'] = round_number
+
+        budget = min(budget * eta, len(order))
+        round_number += 1
+
+    rows = [{
+        'Variant': name,
+        'Accuracy': stats[name]['correct'] / stats[name]['examples'],
+        'Reviews': stats[name]['examples'],
+        'Eliminated in round': '-' if stats[name]['eliminated'] is None else stats[name]['eliminated'],
+        'Model seconds': stats[name]['seconds'],
+        'Prompts run': round(stats[name]['prompts_run']),
+    } for name in modules]
+    # Survivors of later rounds first, then by accuracy
+    rows.sort(key=lambda row: (-row['Reviews'], -row['Accuracy']))
+    table = pd.DataFrame(rows)
+    table.index = range(1, len(table) + 1)
+
+    print("\n" + "=" * 80)
+    print("PROMPT SWEEP")
+    print("=" * 80)
+    print(table.to_string(float_format=lambda v: f"{v:.4f}"))
+    print("=" * 80)
+    return table
@@ -0,0 +1,111 @@
+"""
+Trace Recorder - Timeline of an Evaluation Run
+===============================================
+
+Records spans (model load, data load, student import, batches, saving) and
+writes them in the Chrome / Perfetto trace-event JSON format, so a run can
+be opened in chrome://tracing or https://ui.perfetto.dev to spot idle gaps
+and stragglers.
+
+Example:
+    tracer = TraceRecorder()
+    with tracer.span("load_model", model="google/flan-t5-base"):
+        ...
+    tracer.save("results/traces/run.json")
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class TraceRecorder:
+    """Thread-safe recorder of Chrome trace "complete" events"""
+
+    def __init__(self, enabled=True):
+        """
+        Args:
+            enabled: If False, spans are no-ops (no overhead beyond the call)
+        """
+        self.enabled = enabled
+        self.events = []
+        self._lock = threading.Lock()
+        self._named_threads = set()
+
+    @staticmethod
+    def _now_us():
+        # Wall clock in microseconds so traces from several processes line up
+        return time.time_ns() / 1000
+
+    def _name_thread(self, pid, tid):
+        """Emit a thread_name metadata event the first time a thread is seen."""
+        if (pid, tid) in self._named_threads:
+            return
+        self._named_threads.add((pid, tid))
+        self.events.append({
+            'name': 'thread_name',
+            'ph': 'M',
+            'pid': pid,
+            'tid': tid,
+            'args': {'name': threading.current_thread().name},
+        })
+
+    @contextmanager
+    def span(self, name, cat="evaluation", **args):
+        """
+        Record the duration of a block of work.
+
+        Args:
+            name: Span name shown in the trace viewer
+            cat: Event category
+            **args: Extra values shown when the span is selected
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            end = self._now_us()
+            pid = os.getpid()
+            tid = threading.get_ident()
+            event = {
+                'name': name,
+                'cat': cat,
+                'ph': 'X',
+                'ts': start,
+                'dur': end - start,
+                'pid': pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = {k: v if isinstance(v, (int, float, bool)) else str(v)
+                                 for k, v in args.items()}
+            with self._lock:
+                self._name_thread(pid, tid)
+                self.events.append(event)
+
+    def save(self, path):
+        """
+        Write the recorded events as a Chrome trace JSON file.
+
+        Args:
+            path: Output file path
+
+        Returns:
+            Path: The written file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            events = list(self.events)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        print(f"✅ Trace saved to: {path}")
+        return path
+
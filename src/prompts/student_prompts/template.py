@@ -116,7 +116,9 @@ def parse_output(llm_output):
     Parse the LLM's output to extract the classification.
     
     This is optional - you can implement custom parsing logic here.
-    Default behavior extracts "Positive" or "Negative" from the output.
+    Default behavior extracts "Positive" or "Negative" from the output
+    (any case, punctuation or prefix) with the shared parser:
+        from src.evaluation.label_parser import parse_label
     
     Args:
         llm_output (str): Raw output from the LLM
@@ -143,6 +145,29 @@ def parse_output(llm_output):
         return "Positive"  # or handle error differently
 
 
+# ============================================================================
+# BATCH HOOKS (Optional - advanced)
+# ============================================================================
+#
+# The evaluator calls get_prompt / parse_output once per review. If you
+# define the list-based versions below, it calls them once per batch
+# instead (faster, and lets you process all outputs at once).
+#
+# Rules:
+# - get_prompt and parse_output are still required, and the batch hooks
+#   must give EXACTLY the same results as calling them one by one
+# - Return one item per input, in the same order
+# - quick_test() checks both versions agree before evaluating
+#
+# def get_prompts(reviews):
+#     """List of review texts -> list of prompts"""
+#     return [get_prompt(review_text) for review_text in reviews]
+#
+# def parse_outputs(llm_outputs):
+#     """List of raw LLM outputs -> list of labels ("Positive" or "Negative")"""
+#     return [parse_output(llm_output) for llm_output in llm_outputs]
+
+
 # ============================================================================
 # TESTING (Optional - for local development)
 # ============================================================================
@@ -0,0 +1,43 @@
+"""
+Shared test setup: puts the project root on sys.path so `src` imports work
+when pytest is run from anywhere.
+
+Run the suite from the project root:
+    python -m pytest -q
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class KeywordBackend:
+    """
+    Stand-in for a remote backend: answers "Positive" when the prompt
+    contains "good", else "Negative", and records every prompt it runs.
+    """
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, prompts, max_length=10):
+        self.prompts.extend(prompts)
+        return ["Positive" if "good" in prompt else "Negative" for prompt in prompts]
+
+
+def make_examples(n):
+    """n reviews alternating Negative ("bad") and Positive ("good")"""
+    return [{'text': f"{'good' if i % 2 else 'bad'} movie {i}", 'label': i % 2} for i in range(n)]
+
+
+@pytest.fixture
+def evaluator():
+    """PromptEvaluator on a KeywordBackend with 20 examples, no model loaded"""
+    from src.evaluation.evaluator import PromptEvaluator
+
+    evaluator = PromptEvaluator(backend=KeywordBackend(), batch_size=4, model_name="stub")
+    evaluator.test_data = make_examples(20)
+    return evaluator
@@ -0,0 +1,117 @@
+"""OpenAICompatibleBackend against a stub completions server on localhost"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.evaluation.backends import BackendError, OpenAICompatibleBackend
+
+
+class StubServer:
+    """Answers /v1/completions with " echo <prompt>", misbehaving for some prompts"""
+
+    def __init__(self):
+        self.connections = set()
+        self.attempts = {}
+        lock = threading.Lock()
+        stub = self
+
+        class StubHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like a real inference server
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload, headers=()):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                prompt = json.loads(self.rfile.read(length))['prompt']
+                with lock:
+                    stub.connections.add(self.client_address)
+                    attempt = stub.attempts[prompt] = stub.attempts.get(prompt, 0) + 1
+
+                if prompt == "busy" and attempt == 1:
+                    self._send_json(429, {'error': "slow down"}, [("Retry-After", "0.3")])
+                elif prompt == "flaky" and attempt <= 2:
+                    self._send_json(503, {'error': "loading"})
+                elif prompt == "bad":
+                    self._send_json(400, {'error': "bad request"})
+                else:
+                    self._send_json(200, {'choices': [{'text': f" echo {prompt}"}]})
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def backend(stub):
+    backend = OpenAICompatibleBackend(stub.url, model="stub", max_concurrency=4,
+                                      backoff_base=0.01)
+    yield backend
+    backend.close()
+
+
+def test_batch_reuses_pooled_connections(stub, backend):
+    prompts = [f"review {i}" for i in range(40)]
+    assert backend.generate(prompts) == [f"echo {prompt}" for prompt in prompts]
+    assert len(stub.connections) <= backend.max_concurrency
+    assert backend.stats() == {'requests_sent': 40, 'retries': 0}
+
+
+def test_retry_after_is_honoured(stub, backend):
+    start_time = time.time()
+    assert backend.complete("busy") == "echo busy"
+    assert time.time() - start_time >= 0.3
+    assert stub.attempts["busy"] == 2
+
+
+def test_transient_errors_are_retried(stub, backend):
+    assert backend.complete("flaky") == "echo flaky"
+    assert stub.attempts["flaky"] == 3
+    assert backend.stats()['retries'] == 2
+
+
+def test_client_errors_are_not_retried(stub, backend):
+    with pytest.raises(BackendError):
+        backend.complete("bad")
+    assert stub.attempts["bad"] == 1
+
+
+def test_gives_up_after_max_retries(stub):
+    backend = OpenAICompatibleBackend(stub.url, model="stub", max_retries=1, backoff_base=0.01)
+    try:
+        with pytest.raises(BackendError, match="after 2 attempts"):
+            backend.complete("flaky")
+    finally:
+        backend.close()
+
+
+def test_evaluator_runs_batches_on_the_backend(backend):
+    from src.evaluation.evaluator import PromptEvaluator
+
+    evaluator = PromptEvaluator(backend=backend, batch_size=4)
+    assert evaluator.run_inference_batch(["a", "b"]) == ["echo a", "echo b"]
@@ -0,0 +1,119 @@
+"""Micro-batching, round-robin fairness, backpressure and errors of InferenceQueue"""
+
+import queue
+import threading
+
+import pytest
+
+from src.evaluation.inference_queue import InferenceQueue
+
+
+class RecordingModel:
+    """infer_batch stand-in that records each batch and can be held back"""
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, prompts, max_length):
+        self.release.wait(timeout=10)
+        self.batches.append(list(prompts))
+        return [f"out {prompt}" for prompt in prompts]
+
+
+def test_concurrent_prompts_share_batches():
+    model = RecordingModel()
+    model.release.clear()
+    inference_queue = InferenceQueue(model, max_batch_size=4, max_wait=0.05).start()
+    try:
+        # While the model is held, the prompts pile up in the queue
+        futures = [inference_queue.submit(f"p{i}") for i in range(9)]
+        model.release.set()
+        assert [future.result(timeout=10) for future in futures] == [f"out p{i}" for i in range(9)]
+    finally:
+        inference_queue.stop()
+
+    assert sorted(len(batch) for batch in model.batches) == [1, 4, 4]
+    assert inference_queue.stats()['prompts_run'] == 9
+    assert inference_queue.stats()['pending'] == 0
+
+
+def test_map_returns_outputs_in_order():
+    inference_queue = InferenceQueue(RecordingModel(), max_batch_size=3, max_wait=0).start()
+    try:
+        assert inference_queue.map(["a", "b", "c", "d"]) == ["out a", "out b", "out c", "out d"]
+    finally:
+        inference_queue.stop()
+
+
+def test_clients_are_served_round_robin():
+    model = RecordingModel()
+    inference_queue = InferenceQueue(model, max_batch_size=4)
+    # Queue everything before the worker starts, so the first batch is a choice
+    big = [inference_queue.submit(f"big {i}", client_id="big") for i in range(8)]
+    small = [inference_queue.submit(f"small {i}", client_id="small") for i in range(2)]
+    inference_queue.start()
+    try:
+        for future in big + small:
+            future.result(timeout=10)
+    finally:
+        inference_queue.stop()
+
+    assert model.batches[0] == ["big 0", "small 0", "big 1", "small 1"]
+
+
+def test_batches_only_mix_prompts_with_the_same_max_length():
+    lengths = []
+
+    def infer_batch(prompts, max_length):
+        lengths.append((len(prompts), max_length))
+        return prompts
+
+    inference_queue = InferenceQueue(infer_batch, max_batch_size=8)
+    inference_queue.submit("a", client_id="x", max_length=10)
+    inference_queue.submit("b", client_id="y", max_length=20)
+    inference_queue.submit("c", client_id="z", max_length=10)
+    inference_queue.start()
+    inference_queue.stop()
+
+    assert lengths == [(2, 10), (1, 20)]
+
+
+def test_backpressure_limits_pending_prompts_per_client():
+    inference_queue = InferenceQueue(RecordingModel(), max_pending_per_client=2)
+    inference_queue.submit("a", client_id="alice")
+    inference_queue.submit("b", client_id="alice")
+    with pytest.raises(queue.Full):
+        inference_queue.submit("c", client_id="alice", block=False)
+    with pytest.raises(queue.Full):
+        inference_queue.submit("c", client_id="alice", timeout=0.05)
+    # Other clients are not held back
+    inference_queue.submit("d", client_id="bob", block=False)
+    inference_queue.start()
+    inference_queue.stop()
+
+
+def test_model_errors_reach_every_future_of_the_batch():
+    def infer_batch(prompts, max_length):
+        raise RuntimeError("out of memory")
+
+    inference_queue = InferenceQueue(infer_batch, max_batch_size=4)
+    futures = [inference_queue.submit(f"p{i}", client_id=f"c{i}") for i in range(3)]
+    inference_queue.start()
+    inference_queue.stop()
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="out of memory"):
+            future.result(timeout=10)
+
+
+def test_wrong_number_of_outputs_fails_every_future():
+    inference_queue = InferenceQueue(lambda prompts, max_length: prompts[:-1], max_batch_size=4)
+    futures = [inference_queue.submit(f"p{i}", client_id=f"c{i}") for i in range(3)]
+    inference_queue.start()
+    inference_queue.stop()
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="2 outputs for 3 prompts"):
+            future.result(timeout=10)
@@ -0,0 +1,79 @@
+"""Shared label parser: label extraction, fallbacks and the scoring change"""
+
+import threading
+
+import pytest
+
+from src.evaluation.label_parser import LabelParser
+
+
+@pytest.mark.parametrize("output, label", [
+    ("Positive", "Positive"),
+    ("Negative", "Negative"),
+    (" negative.", "Negative"),
+    ("Classification: POSITIVE", "Positive"),
+    ("Sentiment - neg", "Negative"),
+    ("pos", "Positive"),
+    ("I'd say positively great", "Positive"),
+    ("Negatives outweigh the rest", "Negative"),
+    # The first label wins (the old parser checked "Positive" first)
+    ("Negative or Positive", "Negative"),
+    ("positive, not Negative", "Positive"),
+])
+def test_parse_finds_the_first_label(output, label):
+    assert LabelParser().parse(output) == label
+
+
+@pytest.mark.parametrize("output", ["", "???", "neutral", "position", "negotiable", "purpose"])
+def test_outputs_without_a_label_fall_back(output):
+    parser = LabelParser()
+    assert parser.parse(output) == "Positive"
+    assert parser.stats()['fallbacks'] == 1
+
+
+def test_custom_default():
+    assert LabelParser(default="Negative").parse("no idea") == "Negative"
+
+
+def test_parse_batch_counts_fallbacks():
+    parser = LabelParser()
+    assert parser.parse_batch(["Positive", "neg.", "??", "??"]) == [
+        "Positive", "Negative", "Positive", "Positive"
+    ]
+    assert parser.stats() == {'parsed': 4, 'fallbacks': 2, 'fallback_rate': 0.5}
+
+    parser.reset()
+    assert parser.stats() == {'parsed': 0, 'fallbacks': 0, 'fallback_rate': 0.0}
+
+
+def test_match_batch_reports_missing_labels_as_none():
+    assert LabelParser().match_batch(["negative", "maybe"]) == ["Negative", None]
+
+
+def test_memo_is_cleared_when_full():
+    parser = LabelParser(max_cache=2)
+    outputs = ["positive", "negative", "pos", "neg"]
+    assert parser.parse_batch(outputs) == ["Positive", "Negative", "Positive", "Negative"]
+    assert parser.parse_batch(["maybe"]) == ["Positive"]
+    assert len(parser._memo) == 1
+
+
+def test_parse_batch_is_thread_safe():
+    parser = LabelParser(max_cache=8)
+    errors = []
+
+    def worker(offset):
+        outputs = [f"{'Positive' if i % 2 else 'Negative'} {offset}-{i}" for i in range(200)]
+        expected = ["Positive" if i % 2 else "Negative" for i in range(200)]
+        for _ in range(20):
+            if parser.parse_batch(outputs) != expected:
+                errors.append(offset)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert parser.stats()['parsed'] == 4 * 20 * 200
@@ -0,0 +1,71 @@
+"""Prometheus metrics rendering and the /metrics endpoint on localhost"""
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.evaluation.monitoring import EvaluationMonitor, MetricsRegistry, MetricsServer
+
+
+def test_counter_and_gauge_render_with_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("examples_total", "Examples", ("student",))
+    gauge = registry.gauge("depth", "Depth")
+    counter.inc(3, student="alice")
+    counter.inc(student='bo"b')
+    gauge.set(7)
+
+    text = registry.render()
+    assert "# TYPE examples_total counter" in text
+    assert 'examples_total{student="alice"} 3.0' in text
+    assert 'examples_total{student="bo\\"b"} 1.0' in text
+    assert "depth 7.0" in text
+
+
+def test_unlabelled_metric_reports_zero_before_first_use():
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Hits")
+    assert "hits_total 0.0" in registry.render()
+
+
+def test_wrong_labels_are_rejected():
+    counter = MetricsRegistry().counter("examples_total", "Examples", ("student",))
+    with pytest.raises(ValueError):
+        counter.inc(model="x")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("batch", "Batch size", buckets=[1, 4])
+    for value in (1, 2, 8):
+        histogram.observe(value)
+
+    text = registry.render()
+    assert 'batch_bucket{le="1.0"} 1' in text
+    assert 'batch_bucket{le="4.0"} 2' in text
+    assert 'batch_bucket{le="+Inf"} 3' in text
+    assert "batch_sum 11.0" in text
+    assert "batch_count 3" in text
+
+
+def test_metrics_endpoint_on_localhost():
+    monitor = EvaluationMonitor()
+    monitor.examples.inc(5, student="alice")
+    monitor.queue_depth.set(2)
+    server = MetricsServer(monitor.registry, port=0).start()
+    try:
+        with urllib.request.urlopen(server.url, timeout=10) as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"].startswith("text/plain")
+            text = response.read().decode("utf-8")
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(server.url.replace("/metrics", "/other"), timeout=10)
+        assert error.value.code == 404
+    finally:
+        server.stop()
+
+    assert 'llm_eval_examples_processed_total{student="alice"} 5.0' in text
+    assert "llm_eval_queue_depth 2.0" in text
+    assert "llm_eval_resident_memory_bytes " in text
@@ -0,0 +1,93 @@
+"""Prediction store round trip and its column queries"""
+
+import numpy as np
+import pytest
+
+from src.evaluation.prediction_store import PredictionStore, load_predictions
+from src.evaluation.results import StudentResult
+
+LABELS = [1, 0, 1, 0]
+
+
+def add_student(store, name, predictions, latencies, outputs, example_ids=None):
+    result = StudentResult.from_lists(name, LABELS, predictions, latencies, outputs)
+    store.add_result(result, example_ids)
+
+
+@pytest.fixture
+def table(tmp_path):
+    store = PredictionStore(split="sample")
+    add_student(store, "alice", [1, 0, 1, 0], [0.1, 0.1, 0.2, 0.2],
+                ["Positive", "Negative", "Positive", "Negative"])
+    add_student(store, "bob", [1, 0, 0, 1], [0.3, 0.3, 0.3, 0.3],
+                ["Positive", "Negative", "Negative", "Positive"])
+    add_student(store, "carol", [0, 0, 0, 1], [0.5, 0.5, 0.5, 0.5],
+                ["neg", "Negative", "Negative", "pos"])
+    assert len(store) == 12
+
+    path = store.save(tmp_path / "predictions.npz")
+    return load_predictions(path)
+
+
+def test_round_trip_keeps_names_split_and_outputs(table):
+    assert len(table) == 12
+    assert table.split == "sample"
+    assert table.student_names == ["alice", "bob", "carol"]
+    assert table.outputs_for(0) == {'alice': "Positive", 'bob': "Positive", 'carol': "neg"}
+
+
+def test_accuracy_by_student_best_first(table):
+    assert table.accuracy_by_student() == {'alice': 1.0, 'bob': 0.5, 'carol': 0.25}
+
+
+def test_example_accuracy_and_hardest_examples(table):
+    np.testing.assert_allclose(table.example_accuracy(), [2 / 3, 1.0, 1 / 3, 1 / 3])
+    hardest = table.hardest_examples(3)
+    assert sorted(example_id for example_id, _ in hardest[:2]) == [2, 3]
+    assert hardest[2] == (0, pytest.approx(2 / 3))
+
+
+def test_wrong_by_everyone(tmp_path):
+    store = PredictionStore()
+    add_student(store, "alice", [0, 0, 1, 0], [0.1] * 4, ["x"] * 4)
+    add_student(store, "bob", [0, 1, 1, 0], [0.1] * 4, ["x"] * 4)
+    table = load_predictions(store.save(tmp_path / "p.npz"))
+    assert table.wrong_by_everyone().tolist() == [0]
+
+
+def test_disagreements(table):
+    assert table.disagreements("alice", "bob").tolist() == [2, 3]
+    assert table.disagreements("alice", "alice").tolist() == []
+
+
+def test_top_outputs(table):
+    assert table.top_outputs(n=2) == [("Negative", 6), ("Positive", 4)]
+    assert table.top_outputs("carol") == [("Negative", 2), ("neg", 1), ("pos", 1)]
+
+
+def test_latency_by_student(table):
+    latency = table.latency_by_student()
+    assert latency['alice'][0] == pytest.approx(0.15)
+    assert latency['alice'][1] == pytest.approx(0.2)
+    assert latency['carol'] == (pytest.approx(0.5), pytest.approx(0.5))
+
+
+def test_example_ids_of_a_subset(tmp_path):
+    store = PredictionStore()
+    add_student(store, "alice", [1, 0, 1, 0], [0.1] * 4, ["x"] * 4, example_ids=[10, 20, 30, 40])
+    table = load_predictions(store.save(tmp_path / "p.npz"))
+    assert table.columns['example_id'].tolist() == [10, 20, 30, 40]
+    assert len(table.example_accuracy()) == 41
+
+
+def test_to_dataframe_decodes_names_and_outputs(table):
+    frame = table.to_dataframe()
+    assert frame.shape[0] == 12
+    assert frame.loc[8, 'student'] == "carol"
+    assert frame.loc[8, 'output'] == "neg"
+
+
+def test_empty_store_saves_empty_columns(tmp_path):
+    table = load_predictions(PredictionStore().save(tmp_path / "empty.npz"))
+    assert len(table) == 0
+    assert table.accuracy_by_student() == {}
@@ -0,0 +1,108 @@
+"""Stratified preview selection and the full-set accuracy estimate with its CI"""
+
+import numpy as np
+import pytest
+
+from src.evaluation.difficulty import stratified_sample
+from src.evaluation.preview import estimate_accuracy, preview_strata, select_preview
+
+
+def make_reviews(n, seed=0):
+    """n reviews with random labels and lengths"""
+    rng = np.random.default_rng(seed)
+    return [{'text': "x" * int(length), 'label': int(label)}
+            for label, length in zip(rng.integers(0, 2, n), rng.integers(10, 2000, n))]
+
+
+class FixedDifficulty:
+    """DifficultyIndex stand-in with a given difficulty bin per example"""
+
+    def __init__(self, bins):
+        self.bins = np.asarray(bins)
+
+    def __len__(self):
+        return len(self.bins)
+
+    def strata(self, bins=3, size=None):
+        return self.bins
+
+
+def test_strata_split_by_label_and_length_tercile():
+    reviews = [{'text': "x" * length, 'label': label}
+               for label in (0, 1) for length in (10, 20, 30, 40, 50, 60)]
+    assert preview_strata(reviews).tolist() == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+
+
+def test_strata_add_difficulty_bins():
+    reviews = [{'text': "x", 'label': 0}, {'text': "x", 'label': 1}]
+    strata = preview_strata(reviews, FixedDifficulty([2, 0]), length_bins=1)
+    assert strata.tolist() == [2, 3]
+
+
+def test_stratified_sample_keeps_proportions():
+    strata = np.array([0] * 60 + [1] * 30 + [2] * 10)
+    sample = stratified_sample(strata, 10)
+    assert len(sample) == len(set(sample.tolist())) == 10
+    assert np.bincount(strata[sample]).tolist() == [6, 3, 1]
+
+
+def test_select_preview_drops_strata_that_do_not_fit():
+    reviews = make_reviews(200)
+    sample_ids, strata, stratified_by = select_preview(reviews, size=4)
+    assert stratified_by == "label"
+    assert len(sample_ids) == 4
+    assert sorted(set(strata[sample_ids].tolist())) == [0, 1]
+
+    sample_ids, _, stratified_by = select_preview(
+        reviews, size=50, index=FixedDifficulty(np.arange(200) % 3)
+    )
+    assert stratified_by == "label, length and difficulty"
+    assert len(sample_ids) == 50
+
+
+def test_full_census_is_exact():
+    strata = np.array([0, 0, 1, 1, 1])
+    correct = [1, 0, 1, 1, 0]
+    estimate = estimate_accuracy(correct, np.arange(5), strata)
+    assert estimate['estimate'] == pytest.approx(0.6)
+    assert estimate['stderr'] == 0.0
+    assert estimate['ci_low'] == estimate['ci_high'] == pytest.approx(0.6)
+    assert estimate['coverage'] == 1.0
+
+
+def test_estimate_weights_strata_by_their_full_size():
+    # Stratum 0 holds 90 reviews, stratum 1 only 10, but both get 5 in the preview
+    strata = np.array([0] * 90 + [1] * 10)
+    sample_ids = np.array([0, 1, 2, 3, 4, 90, 91, 92, 93, 94])
+    correct = [1, 1, 1, 1, 1, 0, 0, 0, 0, 0]
+    estimate = estimate_accuracy(correct, sample_ids, strata)
+    assert estimate['subset_accuracy'] == pytest.approx(0.5)
+    assert estimate['estimate'] == pytest.approx(0.9)
+    assert estimate['ci_low'] < 0.9 < estimate['ci_high']
+
+
+def test_unsampled_strata_lower_the_coverage():
+    strata = np.array([0] * 50 + [1] * 50)
+    estimate = estimate_accuracy([1, 0], np.array([0, 1]), strata)
+    assert estimate['coverage'] == pytest.approx(0.5)
+    assert estimate['estimate'] == pytest.approx(0.5)
+
+
+def test_confidence_interval_covers_the_true_accuracy():
+    reviews = make_reviews(1000)
+    rng = np.random.default_rng(1)
+    # Long Negative reviews are hard, everything else is mostly right
+    hit_rate = np.array([0.55 if review['label'] == 0 and len(review['text']) > 1300 else 0.9
+                         for review in reviews])
+    correct = rng.random(1000) < hit_rate
+    true_accuracy = correct.mean()
+
+    covered = 0
+    trials = 200
+    for seed in range(trials):
+        sample_ids, strata, _ = select_preview(reviews, size=100, seed=seed)
+        estimate = estimate_accuracy(correct[sample_ids], sample_ids, strata)
+        covered += estimate['ci_low'] <= true_accuracy <= estimate['ci_high']
+
+    # Nominal 95%; allow for the normal approximation and sampling noise
+    assert covered / trials >= 0.88
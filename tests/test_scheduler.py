@@ -0,0 +1,67 @@
+"""Prompt deduplication and length-packed batches of the scheduler"""
+
+import types
+
+from conftest import make_examples
+from src.evaluation.scheduler import PromptIndex, evaluate_students_deduplicated, pack_batches
+
+
+def test_pack_batches_by_count_longest_first():
+    lengths = [3, 9, 1, 7, 5]
+    assert pack_batches(lengths, max_batch_size=2) == [[1, 3], [4, 0], [2]]
+
+
+def test_pack_batches_by_token_budget():
+    lengths = [10, 10, 4, 4, 4, 4, 4]
+    # Padded size = items x longest item: 2 x 10, then 5 x 4
+    batches = pack_batches(lengths, max_batch_size=1, max_batch_tokens=20)
+    assert batches == [[0, 1], [2, 3, 4, 5, 6]]
+
+
+def test_pack_batches_keeps_oversized_items_alone():
+    assert pack_batches([50, 2], max_batch_size=8, max_batch_tokens=10) == [[0], [1]]
+
+
+def test_pack_batches_empty():
+    assert pack_batches([], max_batch_size=4) == []
+
+
+def test_prompt_index_dedups_and_fans_out():
+    index = PromptIndex()
+    index.add_student("alice", ["a", "b", "a"])
+    index.add_student("bob", ["b", "c", "a"])
+
+    assert index.unique_prompts == ["a", "b", "c"]
+    assert index.summary() == {'students': 2, 'total_prompts': 6, 'unique_prompts': 3,
+                               'dedup_ratio': 2.0, 'saved_fraction': 0.5}
+    assert index.fan_out(["A", "B", "C"]) == {'alice': ["A", "B", "A"], 'bob': ["B", "C", "A"]}
+
+
+def test_deduplicated_evaluation_runs_each_prompt_once(evaluator):
+    evaluator.test_data = make_examples(10)
+    template = types.SimpleNamespace(get_prompt=lambda review: f"Review: {review}")
+    copy = types.SimpleNamespace(get_prompt=lambda review: f"Review: {review}")
+    inverted = types.SimpleNamespace(
+        get_prompt=lambda review: f"Review: {review}",
+        parse_output=lambda output: "Negative" if output == "Positive" else "Positive",
+    )
+
+    results = evaluate_students_deduplicated(
+        evaluator, [("alice", template), ("bob", copy), ("carol", inverted)]
+    )
+
+    assert len(evaluator.backend.prompts) == 10
+    assert results['alice']['accuracy'] == 1.0
+    assert results['bob']['accuracy'] == 1.0
+    assert results['carol']['accuracy'] == 0.0
+
+
+def test_deduplicated_evaluation_skips_broken_submissions(evaluator):
+    def broken(review):
+        raise ValueError("typo")
+
+    results = evaluate_students_deduplicated(evaluator, [
+        ("alice", types.SimpleNamespace(get_prompt=lambda review: review)),
+        ("bob", types.SimpleNamespace(get_prompt=broken)),
+    ])
+    assert list(results) == ["alice"]
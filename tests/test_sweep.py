@@ -0,0 +1,78 @@
+"""Prompt sweep: balanced review order, successive halving and the shared cache"""
+
+import pytest
+
+from conftest import make_examples
+from src.evaluation.sweep import balanced_order, sweep_prompt_variants
+
+
+def good(review):
+    return f"Review: {review}"
+
+
+def always_good(review):
+    return "good"
+
+
+def half_right(review):
+    # Half the prompts hide the review (answered Negative): 75% accuracy
+    return f"Review: {review}" if int(review.split()[-1]) % 4 < 2 else "unsure"
+
+
+def test_balanced_order_alternates_labels():
+    examples = make_examples(10) + [{'text': "extra", 'label': 1}] * 2
+    order = balanced_order(examples)
+    labels = [examples[i]['label'] for i in order]
+    assert sorted(order) == list(range(12))
+    for prefix in range(2, 11, 2):
+        assert sum(labels[:prefix]) == prefix // 2
+
+
+def test_balanced_order_of_no_examples():
+    assert balanced_order([]) == []
+
+
+def test_successive_halving_eliminates_losers_early(evaluator):
+    evaluator.test_data = make_examples(100)
+    table = sweep_prompt_variants(evaluator, [good, always_good, half_right]).set_index('Variant')
+
+    assert table.loc['good', 'Accuracy'] == 1.0
+    assert table.loc['good', 'Reviews'] == 100
+    assert table.loc['good', 'Eliminated in round'] == '-'
+    assert table.loc['always_good', 'Reviews'] == 25
+    assert table.loc['always_good', 'Eliminated in round'] == 0
+    assert table.loc['half_right', 'Reviews'] == 50
+    assert table.index[0] == 'good'
+
+
+def test_shared_prompts_run_once(evaluator):
+    evaluator.test_data = make_examples(25)
+    table = sweep_prompt_variants(evaluator, {'a': good, 'b': good, 'c': always_good},
+                                  min_examples=25).set_index('Variant')
+
+    # 25 review prompts shared by a and b, plus the single "good" prompt of c
+    assert len(evaluator.backend.prompts) == 26
+    assert table.loc['a', 'Prompts run'] == table.loc['b', 'Prompts run'] == 12
+    assert table.loc['c', 'Prompts run'] == 1
+
+
+def test_cache_is_reused_only_for_the_same_model(evaluator):
+    cache = {}
+    sweep_prompt_variants(evaluator, [good], cache=cache)
+    runs = len(evaluator.backend.prompts)
+    assert runs == 20
+
+    sweep_prompt_variants(evaluator, [good], cache=cache)
+    assert len(evaluator.backend.prompts) == runs
+
+    evaluator.model_name = "other"
+    sweep_prompt_variants(evaluator, [good], cache=cache)
+    assert len(evaluator.backend.prompts) == 2 * runs
+
+
+def test_empty_inputs_are_rejected(evaluator):
+    with pytest.raises(ValueError):
+        sweep_prompt_variants(evaluator, [])
+    evaluator.test_data = []
+    with pytest.raises(ValueError):
+        sweep_prompt_variants(evaluator, [good])